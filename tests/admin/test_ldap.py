@@ -129,3 +129,57 @@ def test_013_ldap_provider_delete():
     ldap_provider_delete(handle, name="test_ldap_prov")
     found = ldap_provider_exists(handle, name="test_ldap_prov")[0]
     assert_equal(found, False)
+
+
+def test_014_ldap_group_maps_sync():
+    locale_create(handle, name="test_sync_locale")
+    desired = {
+        "test_sync_grp1": {"roles": ["storage", "operations"],
+                           "locales": ["test_sync_locale"]},
+        "test_sync_grp2": {"roles": ["read-only"]},
+    }
+    changes = ldap_group_maps_sync(handle, desired)
+    assert_equal(len(changes), 6)
+    found = ldap_group_map_locale_exists(
+            handle,
+            ldap_group_map_name="test_sync_grp1",
+            name="test_sync_locale")[0]
+    assert_equal(found, True)
+    assert_equal(ldap_group_maps_sync(handle, desired), [])
+
+
+def test_015_ldap_group_maps_sync_diff():
+    desired = {
+        "test_sync_grp1": {"roles": ["storage", "admin"]},
+        "test_sync_grp2": {"roles": ["read-only"]},
+    }
+    changes = ldap_group_maps_sync(handle, desired)
+    assert_equal(sorted((action, mo.dn.rpartition("/")[2])
+                        for action, mo in changes),
+                 [("add", "role-admin"), ("delete", "locale-test_sync_locale"),
+                  ("delete", "role-operations")])
+    found = ldap_group_map_role_exists(
+            handle,
+            ldap_group_map_name="test_sync_grp1", name="operations")[0]
+    assert_equal(found, False)
+
+
+@raises(Exception)
+def test_016_ldap_group_maps_sync_missing_locale():
+    ldap_group_maps_sync(handle, {"test_sync_grp3": {
+        "locales": ["test_sync_missing"]}})
+
+
+@raises(Exception)
+def test_017_ldap_group_maps_sync_missing_role():
+    ldap_group_maps_sync(handle, {"test_sync_grp3": {
+        "roles": ["test_sync_missing"]}})
+
+
+def test_018_ldap_group_maps_sync_prune():
+    changes = ldap_group_maps_sync(handle, {}, prune=True)
+    assert_true(("delete", "ldapgroup-test_sync_grp1") in
+                [(action, mo.dn.rpartition("/")[2]) for action, mo in changes])
+    found = ldap_group_map_exists(handle, name="test_sync_grp2")[0]
+    assert_equal(found, False)
+    locale_delete(handle, name="test_sync_locale")
@@ -14,6 +14,7 @@
 from ..connection.info import custom_setup, custom_teardown
 from nose.tools import *
 from ucsc_apis.admin.locale import *
+from ucsc_apis.common.hooks import hook_register, hook_unregister
 
 handle = None
 
@@ -38,19 +39,35 @@ def test_002_locale_modify():
     assert_equal(mo.descr, "testing locale")
 
 
-def test_003_locale_org_assign():
+def test_003_locale_modify_unchanged():
+    events = []
+    hook_register(events.append)
+    try:
+        mo, changes = locale_modify(handle, name="test_locale",
+                                    descr="testing locale",
+                                    return_changes=True)
+    finally:
+        hook_unregister(events.append)
+    assert_equal(changes, {})
+    assert_equal(events[-1].counts["commit"], 0)
+    mo, changes = locale_modify(handle, name="test_locale",
+                                descr="testing locale 2", return_changes=True)
+    assert_equal(changes, {"descr": "testing locale 2"})
+
+
+def test_004_locale_org_assign():
     mo = locale_org_assign(handle, locale_name="test_locale",
                            name="test_org_assign", org_dn="org-root")
     assert_equal(mo.name, "test_org_assign")
 
 
-def test_004_locale_domaingroup_assign():
+def test_005_locale_domaingroup_assign():
     mo = locale_domaingroup_assign(handle, locale_name="test_locale",
                                    name="test_domgrp_asn")
     assert_equal(mo.name, "test_domgrp_asn")
 
 
-def test_005_locale_delete():
+def test_006_locale_delete():
     locale_delete(handle, name="test_locale")
     found = locale_exists(handle, name="test_locale")[0]
     assert_equal(found, False)
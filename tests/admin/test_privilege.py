@@ -0,0 +1,83 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from ..connection.info import custom_setup, custom_teardown
+from nose.tools import *
+from ucsc_apis.admin.privilege import *
+from ucsc_apis.admin.role import *
+from ucsc_apis.admin.locale import *
+from ucsc_apis.admin.user import *
+from ucsc_apis.admin.ldap import *
+
+handle = None
+
+group_dn = "CN=test_priv_grp,OU=groups,DC=example,DC=com"
+
+
+def setup():
+    global handle
+    handle = custom_setup()
+
+
+def teardown():
+    custom_teardown(handle)
+
+
+def test_001_privilege_bits():
+    bits = privilege_bits("ls-server,fault")
+    assert_equal(bits, privilege_bits(["fault", "ls-server"]))
+    assert_equal(privilege_bits("admin"), ALL_PRIVILEGES)
+    assert_equal(privilege_bits(""), 0)
+
+
+def test_002_privilege_model_user():
+    role_create(handle, name="test_priv_role", priv="ls-server,fault")
+    locale_create(handle, name="test_priv_locale")
+    locale_org_assign(handle, locale_name="test_priv_locale",
+                      name="test_priv_org", org_dn="org-root")
+    user_create(handle, name="test_priv_user", pwd="Nbv12345")
+    user_role_add(handle, user_name="test_priv_user", name="test_priv_role")
+    user_locale_add(handle, user_name="test_priv_user",
+                    name="test_priv_locale")
+
+    model = privilege_model(handle)
+    effective = model.user("test_priv_user")
+    assert_equal(effective.privileges, ["fault", "ls-server", "read-only"])
+    assert_equal(effective.orgs, frozenset(["org-root"]))
+    assert_true(effective.can("ls-server", org_dn="org-root/org-a"))
+    assert_false(effective.can("aaa", org_dn="org-root"))
+    assert_false(effective.can("fault",
+                               domain_group_dn="domaingroup-root"))
+    assert_equal(model.user("test_priv_missing"), None)
+
+
+def test_003_privilege_model_ldap_groups():
+    ldap_group_map_create(handle, name=group_dn)
+    ldap_group_map_role_add(handle, ldap_group_map_name=group_dn,
+                            name="test_priv_role")
+
+    model = privilege_model(handle)
+    effective = model.ldap([group_dn, "CN=unmapped,DC=example,DC=com"])
+    assert_true(effective.has("ls-server,fault"))
+    assert_true(effective.unrestricted)
+    assert_true(effective.can("fault", org_dn="org-root/org-other"))
+    assert_true(model.ldap([group_dn]) is
+                model.review()[("ldap_group", group_dn)])
+    assert_equal(model.ldap([]).bits, 0)
+
+
+def test_004_privilege_model_cleanup():
+    ldap_group_map_delete(handle, name=group_dn)
+    user_delete(handle, name="test_priv_user")
+    locale_delete(handle, name="test_priv_locale")
+    role_delete(handle, name="test_priv_role")
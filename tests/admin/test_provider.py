@@ -0,0 +1,115 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from ..connection.info import custom_setup, custom_teardown
+from nose.tools import *
+from ucsc_apis.admin.provider import *
+from ucsc_apis.admin.radius import *
+from ucsc_apis.admin.authdomain import *
+
+handle = None
+
+
+def setup():
+    global handle
+    handle = custom_setup()
+
+
+def teardown():
+    custom_teardown(handle)
+
+
+def test_001_aaa_provider_topology_apply():
+    auth_domain_create(handle, name="test_topo_dom")
+    aaa_provider_topology_apply(
+        handle, realm="radius",
+        providers=[{"name": "test_topo_prov1", "timeout": "10"},
+                   {"name": "test_topo_prov2"}],
+        groups=[{"name": "test_topo_grp",
+                 "providers": ["test_topo_prov2", "test_topo_prov1"],
+                 "auth_domains": ["test_topo_dom"]}])
+    found = radius_provider_exists(handle, name="test_topo_prov1",
+                                   timeout="10")[0]
+    assert_equal(found, True)
+    found = radius_provider_group_provider_exists(
+        handle, group_name="test_topo_grp", name="test_topo_prov2",
+        order="1")[0]
+    assert_equal(found, True)
+    mo = handle.query_dn(auth_domain_get(handle, "test_topo_dom").dn +
+                         "/domain-auth")
+    assert_equal((mo.realm, mo.provider_group), ("radius", "test_topo_grp"))
+
+
+def test_002_aaa_provider_topology_apply_members():
+    aaa_provider_topology_apply(
+        handle, realm="radius",
+        groups=[{"name": "test_topo_grp", "providers": ["test_topo_prov1"]}])
+    found = radius_provider_group_provider_exists(
+        handle, group_name="test_topo_grp", name="test_topo_prov1",
+        order="1")[0]
+    assert_equal(found, True)
+    found = radius_provider_group_provider_exists(
+        handle, group_name="test_topo_grp", name="test_topo_prov2")[0]
+    assert_equal(found, False)
+
+    aaa_provider_topology_apply(
+        handle, realm="radius",
+        groups=[{"name": "test_topo_grp", "descr": "test_topo_descr"}])
+    found = radius_provider_group_provider_exists(
+        handle, group_name="test_topo_grp", name="test_topo_prov1",
+        order="1")[0]
+    assert_equal(found, True)
+
+
+@raises(Exception)
+def test_003_aaa_provider_topology_apply_missing_provider():
+    aaa_provider_topology_apply(
+        handle, realm="radius",
+        groups=[{"name": "test_topo_grp2",
+                 "providers": ["test_topo_missing"]}])
+
+
+@raises(Exception)
+def test_004_aaa_provider_topology_apply_prune_group_in_use():
+    aaa_provider_topology_apply(handle, realm="radius", prune=True)
+
+
+def test_005_aaa_provider_topology_apply_prune():
+    auth_domain_delete(handle, name="test_topo_dom")
+    aaa_provider_topology_apply(handle, realm="radius", prune=True)
+    found = radius_provider_group_exists(handle, name="test_topo_grp")[0]
+    assert_equal(found, False)
+    found = radius_provider_exists(handle, name="test_topo_prov1")[0]
+    assert_equal(found, False)
+
+
+def test_006_aaa_provider_topology_apply_prune_rebound():
+    auth_domain_create(handle, name="test_topo_dom")
+    aaa_provider_topology_apply(
+        handle, realm="radius",
+        providers=[{"name": "test_topo_prov1"}],
+        groups=[{"name": "test_topo_old", "providers": ["test_topo_prov1"],
+                 "auth_domains": ["test_topo_dom"]}])
+    aaa_provider_topology_apply(
+        handle, realm="radius",
+        providers=[{"name": "test_topo_prov1"}],
+        groups=[{"name": "test_topo_new", "providers": ["test_topo_prov1"],
+                 "auth_domains": ["test_topo_dom"]}],
+        prune=True)
+    found = radius_provider_group_exists(handle, name="test_topo_old")[0]
+    assert_equal(found, False)
+    mo = handle.query_dn(auth_domain_get(handle, "test_topo_dom").dn +
+                         "/domain-auth")
+    assert_equal(mo.provider_group, "test_topo_new")
+    auth_domain_delete(handle, name="test_topo_dom")
+    aaa_provider_topology_apply(handle, realm="radius", prune=True)
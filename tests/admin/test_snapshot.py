@@ -0,0 +1,55 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from ..connection.info import custom_setup, custom_teardown
+from nose.tools import *
+from ucsc_apis.admin.snapshot import *
+from ucsc_apis.admin.dns import *
+from ucsc_apis.admin.locale import *
+
+handle = None
+
+
+def setup():
+    global handle
+    handle = custom_setup()
+
+
+def teardown():
+    custom_teardown(handle)
+
+
+def test_001_admin_snapshot():
+    dns_server_add(handle, name="10.10.10.20")
+    locale_create(handle, name="test_snap_locale")
+    snapshot = admin_snapshot(handle)
+    found = dns_server_exists(handle, name="10.10.10.20",
+                              snapshot=snapshot)[0]
+    assert_equal(found, True)
+    found = locale_exists(handle, name="test_snap_locale",
+                          snapshot=snapshot)[0]
+    assert_equal(found, True)
+    found = locale_exists(handle, name="test_snap_missing",
+                          snapshot=snapshot)[0]
+    assert_equal(found, False)
+
+
+def test_002_admin_snapshot_is_point_in_time():
+    snapshot = admin_snapshot(handle)
+    dns_server_remove(handle, name="10.10.10.20")
+    locale_delete(handle, name="test_snap_locale")
+    found = dns_server_exists(handle, name="10.10.10.20",
+                              snapshot=snapshot)[0]
+    assert_equal(found, True)
+    found = dns_server_exists(handle, name="10.10.10.20")[0]
+    assert_equal(found, False)
@@ -15,8 +15,11 @@ from ..connection.info import custom_setup, custom_teardown
 from nose.tools import *
 from ucsc_apis.admin.user import *
 from ucsc_apis.admin.locale import *
+from ucsc_apis.common.hooks import hook_register, hook_unregister, REDACTED
+import os
 import random
 import string
+import tempfile
 
 handle = None
 
@@ -101,3 +104,56 @@ def test_011_user_delete():
     user_delete(handle, name="test_user")
     found = user_exists(handle, name="test_user", first_name="testuser")[0]
     assert_equal(found, False)
+
+
+def test_012_users_bulk_apply():
+    locale_create(handle, name="test_bulk_locale")
+    events = []
+    hook_register(events.append)
+    try:
+        results = users_bulk_apply(
+            handle,
+            [{"name": "test_bulk_user%d" % i, "pwd": random_string(8),
+              "roles": ["read-only", "operations"],
+              "locales": "test_bulk_locale"}
+             for i in range(5)] +
+            [{"pwd": random_string(8)},
+             {"name": "test_bulk_bad", "unknown_prop": "1"},
+             {"name": "test_bulk_bad", "account_status": "bogus"},
+             {"name": "test_bulk_" + "x" * 32},
+             "test_bulk_bad"],
+            chunk_size=2)
+    finally:
+        hook_unregister(events.append)
+    assert_equal(events[-1].counts["commit"], 3)
+    assert_equal(events[-1].args["records"][0]["pwd"], REDACTED)
+    assert_equal([error is None for name, mo, error in results],
+                 [True] * 5 + [False] * 5)
+    assert_equal(results[-1][0], None)
+    found = user_role_exists(handle, user_name="test_bulk_user3",
+                             name="operations")[0]
+    assert_equal(found, True)
+    found = user_locale_exists(handle, user_name="test_bulk_user3",
+                               name="test_bulk_locale")[0]
+    assert_equal(found, True)
+
+
+def test_013_users_bulk_apply_csv():
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    with os.fdopen(fd, "w") as f:
+        f.write("name,first_name,roles\n"
+                "test_bulk_user0,Ada,admin;read-only\n"
+                "test_bulk_user1,Alan,\n")
+    try:
+        results = users_bulk_apply(handle, path)
+    finally:
+        os.remove(path)
+    assert_equal([error for name, mo, error in results], [None, None])
+    found = user_exists(handle, name="test_bulk_user0", first_name="Ada")[0]
+    assert_equal(found, True)
+    found = user_role_exists(handle, user_name="test_bulk_user0",
+                             name="admin")[0]
+    assert_equal(found, True)
+    for i in range(5):
+        user_delete(handle, name="test_bulk_user%d" % i)
+    locale_delete(handle, name="test_bulk_locale")
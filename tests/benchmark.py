@@ -0,0 +1,388 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Round-trip and latency benchmarks of the ucsc_apis, run against the
+emulator in tests/connection/emulator.py.
+
+Every step of every family records its wall time, the number of XML API
+requests and commits (configConfMos) it made and the bytes it sent and
+received. The report is written as JSON, and can be compared with the
+report of a previous version to catch round-trip regressions:
+
+    python -m tests.benchmark --latency 0.005 --output new.json
+    python -m tests.benchmark --latency 0.005 --compare old.json
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+
+from ucsc_apis.admin import authdomain, dns, keyring, ldap, locale, radius, \
+    role, snmp, tacacsplus, timezone, user
+from ucsc_apis.network import dynamic_vnic_conn_policy, ip_pool, \
+    lan_conn_policy, mac_pool, mcast_policy, nwctrl_policy, qos, \
+    usnic_conn_policy, vlan, vmq_conn_policy
+
+from .connection.emulator import UcscEmulatorHandle
+
+_LCP_DN = "org-root/lan-conn-pol-bench_lcp"
+
+# family: [(step, function, args, kwargs)], run in order with the handle as
+# first argument, each family leaving the tree as it found it
+FAMILIES = [
+    ("admin.locale", [
+        ("create", locale.locale_create, ("bench_locale",), {}),
+        ("get", locale.locale_get, ("bench_locale",), {}),
+        ("exists", locale.locale_exists, ("bench_locale",), {}),
+        ("modify", locale.locale_modify, ("bench_locale",),
+         {"descr": "bench"}),
+        ("modify_unchanged", locale.locale_modify, ("bench_locale",),
+         {"descr": "bench"}),
+        ("delete", locale.locale_delete, ("bench_locale",), {}),
+    ]),
+    ("admin.role", [
+        ("create", role.role_create, ("bench_role", "read-only"), {}),
+        ("get", role.role_get, ("bench_role",), {}),
+        ("exists", role.role_exists, ("bench_role",), {}),
+        ("modify", role.role_modify, ("bench_role",), {"descr": "bench"}),
+        ("delete", role.role_delete, ("bench_role",), {}),
+    ]),
+    ("admin.user", [
+        ("create", user.user_create, ("bench_user", "Bench1234"), {}),
+        ("get", user.user_get, ("bench_user",), {}),
+        ("exists", user.user_exists, ("bench_user",), {}),
+        ("modify", user.user_modify, ("bench_user",),
+         {"last_name": "bench"}),
+        ("role_add", user.user_role_add, ("bench_user", "read-only"), {}),
+        ("role_exists", user.user_role_exists, ("bench_user", "read-only"),
+         {}),
+        ("role_remove", user.user_role_remove, ("bench_user", "read-only"),
+         {}),
+        ("delete", user.user_delete, ("bench_user",), {}),
+    ]),
+    ("admin.auth_domain", [
+        ("create", authdomain.auth_domain_create, ("bench_domain",), {}),
+        ("get", authdomain.auth_domain_get, ("bench_domain",), {}),
+        ("exists", authdomain.auth_domain_exists, ("bench_domain",), {}),
+        ("modify", authdomain.auth_domain_modify, ("bench_domain",),
+         {"session_timeout": "1000"}),
+        ("delete", authdomain.auth_domain_delete, ("bench_domain",), {}),
+    ]),
+    ("admin.ldap_provider", [
+        ("create", ldap.ldap_provider_create, ("bench_ldap",), {}),
+        ("get", ldap.ldap_provider_get, ("bench_ldap",), {}),
+        ("exists", ldap.ldap_provider_exists, ("bench_ldap",), {}),
+        ("modify", ldap.ldap_provider_modify, ("bench_ldap",),
+         {"enable_ssl": "yes"}),
+        ("group_create", ldap.ldap_provider_group_create,
+         ("bench_ldap_group",), {}),
+        ("group_provider_add", ldap.ldap_provider_group_provider_add,
+         ("bench_ldap_group", "bench_ldap"), {}),
+        ("group_provider_exists", ldap.ldap_provider_group_provider_exists,
+         ("bench_ldap_group", "bench_ldap"), {}),
+        ("group_provider_remove", ldap.ldap_provider_group_provider_remove,
+         ("bench_ldap_group", "bench_ldap"), {}),
+        ("group_delete", ldap.ldap_provider_group_delete,
+         ("bench_ldap_group",), {}),
+        ("delete", ldap.ldap_provider_delete, ("bench_ldap",), {}),
+    ]),
+    ("admin.ldap_group_map", [
+        ("create", ldap.ldap_group_map_create, ("bench_map",), {}),
+        ("exists", ldap.ldap_group_map_exists, ("bench_map",), {}),
+        ("role_add", ldap.ldap_group_map_role_add,
+         ("bench_map", "read-only"), {}),
+        ("role_exists", ldap.ldap_group_map_role_exists,
+         ("bench_map", "read-only"), {}),
+        ("delete", ldap.ldap_group_map_delete, ("bench_map",), {}),
+    ]),
+    ("admin.radius_provider", [
+        ("create", radius.radius_provider_create, ("bench_radius",), {}),
+        ("get", radius.radius_provider_get, ("bench_radius",), {}),
+        ("exists", radius.radius_provider_exists, ("bench_radius",), {}),
+        ("modify", radius.radius_provider_modify, ("bench_radius",),
+         {"timeout": "10"}),
+        ("group_create", radius.radius_provider_group_create,
+         ("bench_radius_group",), {}),
+        ("group_provider_add", radius.radius_provider_group_add_provider,
+         ("bench_radius_group", "bench_radius"), {}),
+        ("group_provider_exists",
+         radius.radius_provider_group_provider_exists,
+         ("bench_radius_group", "bench_radius"), {}),
+        ("group_provider_remove",
+         radius.radius_provider_group_remove_provider,
+         ("bench_radius_group", "bench_radius"), {}),
+        ("group_delete", radius.radius_provider_group_delete,
+         ("bench_radius_group",), {}),
+        ("delete", radius.radius_provider_delete, ("bench_radius",), {}),
+    ]),
+    ("admin.tacacsplus_provider", [
+        ("create", tacacsplus.tacacsplus_provider_create, ("bench_tacacs",),
+         {}),
+        ("get", tacacsplus.tacacsplus_provider_get, ("bench_tacacs",), {}),
+        ("exists", tacacsplus.tacacsplus_provider_exists, ("bench_tacacs",),
+         {}),
+        ("modify", tacacsplus.tacacsplus_provider_modify, ("bench_tacacs",),
+         {"timeout": "10"}),
+        ("delete", tacacsplus.tacacsplus_provider_delete, ("bench_tacacs",),
+         {}),
+    ]),
+    ("admin.key_ring", [
+        ("create", keyring.key_ring_create, ("bench_kr",), {}),
+        ("get", keyring.key_ring_get, ("bench_kr",), {}),
+        ("exists", keyring.key_ring_exists, ("bench_kr",), {}),
+        ("modify", keyring.key_ring_modify, ("bench_kr",),
+         {"regen": "yes"}),
+        ("delete", keyring.key_ring_delete, ("bench_kr",), {}),
+    ]),
+    ("admin.snmp_trap", [
+        ("add", snmp.snmp_trap_add, ("3.3.3.3", "bench"), {}),
+        ("get", snmp.snmp_trap_get, ("3.3.3.3",), {}),
+        ("exists", snmp.snmp_trap_exists, ("3.3.3.3",), {}),
+        ("modify", snmp.snmp_trap_modify, ("3.3.3.3",), {"version": "v3"}),
+        ("remove", snmp.snmp_trap_remove, ("3.3.3.3",), {}),
+    ]),
+    ("admin.snmp_user", [
+        ("add", snmp.snmp_user_add, ("bench_snmp", "Bench1234",
+                                     "Bench1234"), {}),
+        ("exists", snmp.snmp_user_exists, ("bench_snmp",), {}),
+        ("modify", snmp.snmp_user_modify, ("bench_snmp",), {"auth": "sha"}),
+        ("remove", snmp.snmp_user_remove, ("bench_snmp",), {}),
+    ]),
+    ("admin.dns_server", [
+        ("add", dns.dns_server_add, ("4.4.4.4",), {}),
+        ("exists", dns.dns_server_exists, ("4.4.4.4",), {}),
+        ("remove", dns.dns_server_remove, ("4.4.4.4",), {}),
+    ]),
+    ("admin.ntp_server", [
+        ("add", timezone.ntp_server_add, ("5.5.5.5",), {}),
+        ("exists", timezone.ntp_server_exists, ("5.5.5.5",), {}),
+        ("remove", timezone.ntp_server_remove, ("5.5.5.5",), {}),
+    ]),
+    ("network.vlan", [
+        ("create", vlan.vlan_create, ("bench_vlan", "1234"), {}),
+        ("get", vlan.vlan_get, ("bench_vlan",), {}),
+        ("exists", vlan.vlan_exists, ("bench_vlan",), {"id": "1234"}),
+        ("modify", vlan.vlan_create, ("bench_vlan", "1234"),
+         {"compression_type": "excluded"}),
+        ("delete", vlan.vlan_delete, ("bench_vlan",), {}),
+    ]),
+    ("network.mac_pool", [
+        ("create", mac_pool.mac_pool_create,
+         ("bench_mac", "00:25:B5:00:00:00", "00:25:B5:00:00:FF"), {}),
+        ("get", mac_pool.mac_pool_get, ("bench_mac",), {}),
+        ("exists", mac_pool.mac_pool_exists, ("bench_mac",),
+         {"r_from": "00:25:B5:00:00:00", "to": "00:25:B5:00:00:FF"}),
+        ("remove", mac_pool.mac_pool_remove, ("bench_mac",), {}),
+    ]),
+    ("network.ip_pool", [
+        ("create", ip_pool.ip_pool_create, ("bench_ip",), {}),
+        ("block_add", ip_pool.ip_block_add,
+         ("bench_ip", "10.0.0.1", "10.0.0.100", "255.255.255.0",
+          "10.0.0.254"), {}),
+        ("get", ip_pool.ip_pool_get, ("bench_ip",), {}),
+        ("exists", ip_pool.ip_pool_exists, ("bench_ip",),
+         {"r_from": "10.0.0.1", "to": "10.0.0.100"}),
+        ("remove", ip_pool.ip_pool_remove, ("bench_ip",), {}),
+    ]),
+    ("network.qos_policy", [
+        ("create", qos.qos_policy_add, ("bench_qos",), {"prio": "gold"}),
+        ("get", qos.qos_policy_get, ("bench_qos",), {}),
+        ("exists", qos.qos_policy_exists, ("bench_qos",), {"prio": "gold"}),
+        ("remove", qos.qos_policy_remove, ("bench_qos",), {}),
+    ]),
+    ("network.nwctrl_policy", [
+        ("create", nwctrl_policy.nwctrl_policy_create, ("bench_nwctrl",),
+         {}),
+        ("get", nwctrl_policy.nwctrl_policy_get, ("bench_nwctrl",), {}),
+        ("exists", nwctrl_policy.nwctrl_policy_exists, ("bench_nwctrl",),
+         {}),
+        ("delete", nwctrl_policy.nwctrl_policy_delete, ("bench_nwctrl",),
+         {}),
+    ]),
+    ("network.mcast_policy", [
+        ("create", mcast_policy.mcast_policy_create, ("bench_mcast",), {}),
+        ("get", mcast_policy.mcast_policy_get, ("bench_mcast",), {}),
+        ("exists", mcast_policy.mcast_policy_exists, ("bench_mcast",), {}),
+        ("delete", mcast_policy.mcast_policy_delete, ("bench_mcast",), {}),
+    ]),
+    ("network.dynamic_vnic_conn_policy", [
+        ("create", dynamic_vnic_conn_policy.dynamic_vnic_conn_policy_create,
+         ("bench_dyn",), {}),
+        ("exists", dynamic_vnic_conn_policy.dynamic_vnic_conn_policy_exists,
+         ("bench_dyn",), {}),
+        ("delete", dynamic_vnic_conn_policy.dynamic_vnic_conn_policy_delete,
+         ("bench_dyn",), {}),
+    ]),
+    ("network.usnic_conn_policy", [
+        ("create", usnic_conn_policy.usnic_conn_policy_create,
+         ("bench_usnic",), {}),
+        ("exists", usnic_conn_policy.usnic_conn_policy_exists,
+         ("bench_usnic",), {}),
+        ("delete", usnic_conn_policy.usnic_conn_policy_delete,
+         ("bench_usnic",), {}),
+    ]),
+    ("network.vmq_conn_policy", [
+        ("create", vmq_conn_policy.vmq_conn_policy_create, ("bench_vmq",),
+         {}),
+        ("exists", vmq_conn_policy.vmq_conn_policy_exists, ("bench_vmq",),
+         {}),
+        ("delete", vmq_conn_policy.vmq_conn_policy_delete, ("bench_vmq",),
+         {}),
+    ]),
+    ("network.lan_conn_policy", [
+        ("create", lan_conn_policy.lan_conn_policy_create, ("bench_lcp",),
+         {}),
+        ("exists", lan_conn_policy.lan_conn_policy_exists, ("bench_lcp",),
+         {}),
+        ("vnic_add", lan_conn_policy.lcp_vnic_add,
+         ("bench_vnic", _LCP_DN), {}),
+        ("vnic_exists", lan_conn_policy.lcp_vnic_exists,
+         ("bench_vnic", _LCP_DN), {}),
+        ("iscsi_vnic_add", lan_conn_policy.lcp_iscsi_vnic_add,
+         ("bench_iscsi", _LCP_DN), {"vnic_name": "bench_vnic"}),
+        ("iscsi_vnic_delete", lan_conn_policy.lcp_iscsi_vnic_delete,
+         ("bench_iscsi", _LCP_DN), {}),
+        ("vnic_delete", lan_conn_policy.lcp_vnic_delete,
+         ("bench_vnic", _LCP_DN), {}),
+        ("delete", lan_conn_policy.lan_conn_policy_delete, ("bench_lcp",),
+         {}),
+    ]),
+]
+
+
+def _measure(handle, func, args, kwargs):
+    emulator = handle.emulator
+    emulator.reset_stats()
+    error = None
+    start = time.time()
+    try:
+        func(handle, *args, **kwargs)
+    except Exception as e:
+        error = "%s: %s" % (type(e).__name__, e)
+    wall_time = time.time() - start
+    return {"function": func.__name__,
+            "wall_time": wall_time,
+            "requests": sum(emulator.requests.values()),
+            "commits": emulator.requests["configConfMos"],
+            "bytes_sent": emulator.bytes_in,
+            "bytes_received": emulator.bytes_out,
+            "error": error}
+
+
+def run(latency=0.0, repeat=1, families=None):
+    """
+    Runs the benchmark families against a fresh emulator
+
+    Args:
+        latency (float): per-request latency of the emulator in seconds
+        repeat (int): number of runs of every family, the wall time
+                      reported is the best one
+        families (list): names of the families to run, all if None
+
+    Returns:
+        dict: report
+    """
+    import ucsc_apis
+
+    handle = UcscEmulatorHandle(latency=latency)
+    handle.login()
+    results = []
+    try:
+        for family, steps in FAMILIES:
+            if families and family not in families:
+                continue
+            runs = [[_measure(handle, func, args, kwargs)
+                     for step, func, args, kwargs in steps]
+                    for _ in range(repeat)]
+            for i, (step, func, args, kwargs) in enumerate(steps):
+                result = dict(runs[0][i], family=family, step=step)
+                result["wall_time"] = min(run_[i]["wall_time"]
+                                          for run_ in runs)
+                results.append(result)
+    finally:
+        handle.logout()
+
+    totals = {}
+    for key in ("wall_time", "requests", "commits", "bytes_sent",
+                "bytes_received"):
+        totals[key] = sum(result[key] for result in results)
+    return {"version": getattr(ucsc_apis, "__version__", None),
+            "python": platform.python_version(),
+            "latency": latency,
+            "repeat": repeat,
+            "totals": totals,
+            "results": results}
+
+
+def compare(old, new):
+    """
+    Lists the steps whose request or commit count grew between two reports
+
+    Returns:
+        List of (family, step, key, old value, new value)
+    """
+    old_results = dict(((result["family"], result["step"]), result)
+                       for result in old["results"])
+    regressions = []
+    for result in new["results"]:
+        previous = old_results.get((result["family"], result["step"]))
+        if previous is None:
+            continue
+        for key in ("requests", "commits"):
+            if result[key] > previous[key]:
+                regressions.append((result["family"], result["step"], key,
+                                    previous[key], result[key]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="per-request latency in seconds")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="runs of every family, best wall time is kept")
+    parser.add_argument("--family", action="append",
+                        help="family to run, e.g. network.vlan, repeatable")
+    parser.add_argument("--output", help="file to write the JSON report to")
+    parser.add_argument("--compare",
+                        help="previous JSON report to check for regressions")
+    args = parser.parse_args(argv)
+
+    report = run(latency=args.latency, repeat=args.repeat,
+                 families=args.family)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    for result in report["results"]:
+        print("%-34s %-22s %8.4fs %3d requests %3d commits%s"
+              % (result["family"], result["step"], result["wall_time"],
+                 result["requests"], result["commits"],
+                 "  " + result["error"] if result["error"] else ""))
+    print("total %.4fs %d requests %d commits"
+          % (report["totals"]["wall_time"], report["totals"]["requests"],
+             report["totals"]["commits"]))
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), report)
+        for regression in regressions:
+            print("REGRESSION %s %s %s: %s -> %s" % regression)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
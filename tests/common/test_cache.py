@@ -0,0 +1,59 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from ..connection.info import custom_setup, custom_teardown
+from nose.tools import *
+from ucsc_apis.common.cache import *
+from ucsc_apis.network.mac_pool import *
+
+handle = None
+cache = None
+
+
+def setup():
+    global handle, cache
+    handle = custom_setup()
+    cache = cache_enable(handle, ttl=300)
+
+
+def teardown():
+    cache_disable(handle)
+    custom_teardown(handle)
+
+
+def test_001_cache_read_through():
+    mac_pool_create(handle, name="test_cache_mac_pool",
+                    r_from="00:25:B5:00:00:20", to="00:25:B5:00:00:2F")
+    hits = cache.hits
+    mo = mac_pool_get(handle, name="test_cache_mac_pool")
+    assert_equal(mo.name, "test_cache_mac_pool")
+    mac_pool_get(handle, name="test_cache_mac_pool")
+    assert_equal(cache.hits, hits + 1)
+
+
+def test_002_cache_invalidate_on_write():
+    mac_pool_remove(handle, name="test_cache_mac_pool")
+    mo = mac_pool_get(handle, name="test_cache_mac_pool")
+    assert_equal(mo, None)
+
+
+def test_003_cache_lru():
+    lru = MoCache(ttl=300, max_size=2)
+    lru.put("org-root/a", None)
+    lru.put("org-root/b", None)
+    lru.get("org-root/a")
+    lru.put("org-root/c", None)
+    assert_equal(lru.get("org-root/b")[0], False)
+    assert_equal(lru.get("org-root/a")[0], True)
+    lru.invalidate("org-root")
+    assert_equal(len(lru), 0)
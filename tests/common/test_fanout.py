@@ -0,0 +1,82 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+
+from ..connection.info import custom_setup, custom_teardown
+from ..connection.emulator import UcscEmulator, UcscEmulatorHandle
+from nose.tools import *
+from ucsc_apis.common.fanout import *
+from ucsc_apis.network.mac_pool import *
+
+handle = None
+
+names = ["test_fanout_pool%d" % i for i in range(4)]
+
+
+def setup():
+    global handle
+    handle = custom_setup()
+
+
+def teardown():
+    custom_teardown(handle)
+
+
+def _create(fanout_handle, name):
+    return mac_pool_create(fanout_handle, name=name,
+                           r_from="00:25:B5:00:00:30",
+                           to="00:25:B5:00:00:3F")
+
+
+def test_001_fanout_create():
+    results = fanout(custom_setup, _create, names, workers=2)
+    assert_equal([target for target, result, e in results], names)
+    assert_equal([e for target, result, e in results], [None] * len(names))
+    for name in names:
+        assert_equal(mac_pool_exists(handle, name=name)[0], True)
+
+
+def test_002_fanout_errors():
+    results = fanout(custom_setup,
+                     lambda fanout_handle, name: mac_pool_remove(
+                         fanout_handle, name=name),
+                     names + ["test_fanout_missing"], workers=3)
+    assert_equal([e is None for target, result, e in results],
+                 [True] * len(names) + [False])
+    for name in names:
+        assert_equal(mac_pool_exists(handle, name=name)[0], False)
+
+
+def test_003_fanout_concurrency():
+    emulator = UcscEmulator(latency=0.05)
+
+    def factory():
+        fanout_handle = isolate_session(UcscEmulatorHandle(emulator=emulator))
+        fanout_handle.login()
+        return fanout_handle
+
+    def query(fanout_handle, target):
+        for _ in range(2):
+            fanout_handle.query_dn("org-root")
+
+    timings = {}
+    for workers in (1, 8):
+        start = time.time()
+        results = fanout(factory, query, range(16), workers=workers)
+        timings[workers] = time.time() - start
+        assert_equal([e for target, result, e in results], [None] * 16)
+    # 33 round trips in a row for one worker, 5 for each of eight
+    assert_true(timings[8] < timings[1] / 4,
+                "%.2fs with 8 workers, %.2fs with 1" % (timings[8],
+                                                        timings[1]))
@@ -0,0 +1,64 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from ..connection.info import custom_setup, custom_teardown
+from nose.tools import *
+from ucsc_apis.common.hooks import *
+from ucsc_apis.admin.user import user_create, user_delete
+from ucsc_apis.network.mac_pool import mac_pool_create, mac_pool_remove
+
+handle = None
+events = []
+
+
+def setup():
+    global handle
+    handle = custom_setup()
+    hook_register(events.append)
+
+
+def teardown():
+    hook_unregister(events.append)
+    custom_teardown(handle)
+
+
+def test_001_hook_counts():
+    del events[:]
+    mac_pool_create(handle, name="test_hook_mac_pool",
+                    r_from="00:25:B5:00:00:40", to="00:25:B5:00:00:4F")
+    assert_equal(len(events), 1)
+    event = events[0]
+    assert_equal(event.name, "mac_pool_create")
+    assert_equal(event.args["name"], "test_hook_mac_pool")
+    assert_equal(event.counts["commit"], 1)
+    assert_equal(event.counts["add_mo"], 1)
+    assert_equal(event.exception, None)
+    assert_true(event.end >= event.start)
+
+
+def test_002_hook_exception():
+    del events[:]
+    mac_pool_remove(handle, name="test_hook_mac_pool")
+    assert_raises(Exception, mac_pool_remove, handle,
+                  name="test_hook_mac_pool")
+    removes = [event for event in events if event.name == "mac_pool_remove"]
+    assert_equal(removes[0].exception, None)
+    assert_not_equal(removes[1].exception, None)
+
+
+def test_003_hook_redaction():
+    del events[:]
+    user_create(handle, "test_hook_user", "Secret123")
+    user_delete(handle, "test_hook_user")
+    creates = [event for event in events if event.name == "user_create"]
+    assert_equal(creates[0].args["pwd"], REDACTED)
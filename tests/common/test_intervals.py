@@ -0,0 +1,45 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from nose.tools import *
+from ucsc_apis.common.intervals import IntervalIndex, merge
+
+
+def test_001_interval_overlapping():
+    index = IntervalIndex([(30, 39, "c"), (10, 19, "a"), (20, 29, "b")])
+    assert_equal([i[2] for i in index.overlapping(15, 25)], ["a", "b"])
+    assert_equal(index.overlapping(40, 50), [])
+    index.add(5, 35, "d")
+    assert_equal([i[2] for i in index.containing(32)], ["d", "c"])
+
+
+def test_002_interval_conflicts():
+    index = IntervalIndex([(10, 19, "a"), (20, 29, "b")])
+    assert_equal(index.conflicts(), [])
+    index.add(19, 20, "c")
+    assert_equal([(a[2], b[2]) for a, b in index.conflicts()],
+                 [("a", "c"), ("c", "b")])
+
+
+def test_003_interval_free():
+    index = IntervalIndex([(10, 19, "a"), (25, 29, "b")])
+    assert_equal(list(index.free_ranges(0, 40)),
+                 [(0, 9), (20, 24), (30, 40)])
+    assert_equal(index.find_free(5, 10, 40), (20, 24))
+    assert_equal(index.find_free(6, 10, 40), (30, 35))
+    assert_equal(index.find_free(20, 10, 40), None)
+
+
+def test_004_interval_merge():
+    assert_equal(merge([(20, 29), (5, 9), (10, 12), (25, 40), (50, 60)]),
+                 [(5, 12), (20, 40), (50, 60)])
@@ -0,0 +1,72 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import tempfile
+
+from ..connection.info import custom_setup, custom_teardown
+from nose.tools import *
+from ucsc_apis.common.metrics import MetricsCollector
+from ucsc_apis.network.vlan import vlan_create, vlan_delete
+
+handle = None
+metrics = None
+
+
+def setup():
+    global handle, metrics
+    handle = custom_setup()
+    metrics = MetricsCollector().register()
+
+
+def teardown():
+    metrics.unregister()
+    custom_teardown(handle)
+
+
+def test_001_metrics_calls():
+    metrics.reset()
+    vlan_create(handle, name="test_metrics_vlan", id="3456")
+    text = metrics.text()
+    assert_in('ucsc_apis_calls_total{function="vlan_create"} 1', text)
+    assert_in('ucsc_apis_call_duration_seconds_count'
+              '{function="vlan_create"} 1', text)
+    assert_in('ucsc_apis_call_duration_seconds_bucket{function="vlan_create",'
+              'le="+Inf"} 1', text)
+    assert_in('ucsc_apis_handle_requests_total{function="vlan_create",'
+              'method="commit"} 1', text)
+    assert_in('ucsc_apis_mo_class_calls_total{class_id="FabricVlan"}', text)
+    assert_in('ucsc_apis_mo_operations_total{class_id="FabricVlan",'
+              'method="add_mo"} 1', text)
+    assert_in("ucsc_apis_commits_total 1\n", text)
+
+
+def test_002_metrics_failures():
+    metrics.reset()
+    vlan_delete(handle, name="test_metrics_vlan")
+    assert_raises(Exception, vlan_delete, handle, name="test_metrics_vlan")
+    text = metrics.text()
+    assert_in('ucsc_apis_calls_total{function="vlan_delete"} 2', text)
+    assert_in('ucsc_apis_call_failures_total{function="vlan_delete"} 1', text)
+    assert_in("ucsc_apis_commits_total 1\n", text)
+
+
+def test_003_metrics_dump():
+    fd, path = tempfile.mkstemp(suffix=".prom")
+    os.close(fd)
+    try:
+        metrics.dump(path)
+        with open(path) as f:
+            assert_equal(f.read(), metrics.text())
+    finally:
+        os.remove(path)
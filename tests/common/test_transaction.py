@@ -0,0 +1,91 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from ..connection.info import custom_setup, custom_teardown
+from nose.tools import *
+from ucsc_apis.common.transaction import *
+from ucsc_apis.network.ip_pool import *
+from ucsc_apis.network.mac_pool import *
+
+handle = None
+
+
+def setup():
+    global handle
+    handle = custom_setup()
+
+
+def teardown():
+    custom_teardown(handle)
+
+
+def test_001_transaction_commit():
+    with transaction(handle):
+        mac_pool_create(handle, name="test_txn_mac_pool",
+                        r_from="00:25:B5:00:00:10", to="00:25:B5:00:00:1F")
+        ip_pool_create(handle, name="test_txn_ip_pool")
+        ip_block_add(handle, ip_pool_name="test_txn_ip_pool",
+                     r_from="1.1.1.1", to="1.1.1.10",
+                     subnet="255.255.255.0", def_gw="1.1.1.254")
+        assert_equal(in_transaction(handle), True)
+        found = mac_pool_exists(handle, name="test_txn_mac_pool",
+                                r_from="00:25:B5:00:00:10",
+                                to="00:25:B5:00:00:1F")[0]
+        assert_equal(found, True)
+    assert_equal(in_transaction(handle), False)
+    found = mac_pool_exists(handle, name="test_txn_mac_pool")[0]
+    assert_equal(found, True)
+    found = ip_pool_exists(handle, name="test_txn_ip_pool",
+                           r_from="1.1.1.1", to="1.1.1.10")[0]
+    assert_equal(found, True)
+
+
+@raises(ValueError)
+def test_002_transaction_rollback():
+    try:
+        with transaction(handle):
+            mac_pool_remove(handle, name="test_txn_mac_pool")
+            raise ValueError("abort")
+    finally:
+        found = mac_pool_exists(handle, name="test_txn_mac_pool")[0]
+        assert_equal(found, True)
+
+
+def test_003_transaction_cleanup():
+    with transaction(handle):
+        mac_pool_remove(handle, name="test_txn_mac_pool")
+        ip_pool_remove(handle, name="test_txn_ip_pool")
+    found = mac_pool_exists(handle, name="test_txn_mac_pool")[0]
+    assert_equal(found, False)
+    found = ip_pool_exists(handle, name="test_txn_ip_pool")[0]
+    assert_equal(found, False)
+
+
+def test_004_transaction_hierarchical_query():
+    mac_pool_create(handle, "test_txn_merge_pool", "00:25:B5:00:00:01",
+                    "00:25:B5:00:00:0F")
+    dn = "org-root/mac-pool-test_txn_merge_pool"
+    with transaction(handle):
+        mac_pool_create(handle, "test_txn_merge_pool", "00:25:B5:00:00:20",
+                        "00:25:B5:00:00:2F")
+        dns = set(mo.dn for mo in handle.query_dn(dn, hierarchy=True))
+        assert_true(dn + "/block-00:25:B5:00:00:01-00:25:B5:00:00:0F" in dns)
+        assert_true(dn + "/block-00:25:B5:00:00:20-00:25:B5:00:00:2F" in dns)
+        found = mac_pool_exists(handle, "test_txn_merge_pool",
+                                r_from="00:25:B5:00:00:01",
+                                to="00:25:B5:00:00:0F")[0]
+        assert_equal(found, True)
+        mac_pool_remove(handle, "test_txn_merge_pool")
+        assert_equal(handle.query_dn(dn, hierarchy=True), [])
+    found = mac_pool_exists(handle, name="test_txn_merge_pool")[0]
+    assert_equal(found, False)
@@ -0,0 +1,373 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module provides an in-process emulator of the subset of the UCS Central
+XML API used by the ucsc_apis, so that the tests and benchmarks can run
+without a UCS Central.
+"""
+import re
+import threading
+import time
+import uuid
+import xml.etree.ElementTree as ET
+from collections import Counter, OrderedDict
+
+from ucscsdk.ucschandle import UcscHandle
+
+# (parent dn, class id, properties) of the managed objects UCS Central
+# always has
+_SEED = (
+    ("", "TopSystem", {}),
+    ("", "OrgOrg", {"name": "root"}),
+    ("", "OrgDomainGroup", {"name": "root"}),
+    ("domaingroup-root", "FabricEp", {}),
+    ("domaingroup-root/fabric", "FabricLanCloud", {}),
+    ("domaingroup-root/fabric", "FabricEthEstcCloud", {}),
+    ("org-root", "PolicyDeviceProfile", {"name": "default"}),
+    ("org-root/deviceprofile-default", "AaaAuthRealm", {}),
+    ("org-root/deviceprofile-default/auth-realm", "AaaConsoleAuth", {}),
+    ("org-root/deviceprofile-default/auth-realm", "AaaDefaultAuth", {}),
+    ("org-root/deviceprofile-default", "AaaLdapEp", {}),
+    ("org-root/deviceprofile-default", "AaaRadiusEp", {}),
+    ("org-root/deviceprofile-default", "AaaTacacsPlusEp", {}),
+    ("org-root/deviceprofile-default", "AaaPwdProfile", {}),
+    ("org-root/deviceprofile-default", "AaaRole",
+     {"name": "admin", "priv": "admin"}),
+    ("org-root/deviceprofile-default", "AaaRole",
+     {"name": "operations", "priv": "fault,operations"}),
+    ("org-root/deviceprofile-default", "AaaRole",
+     {"name": "read-only", "priv": "read-only"}),
+    ("org-root/deviceprofile-default", "AaaRole",
+     {"name": "storage", "priv": "ls-storage,ls-storage-policy"}),
+    ("org-root/deviceprofile-default", "PkiEp", {}),
+    ("org-root/deviceprofile-default", "CallhomeEp", {}),
+    ("org-root/deviceprofile-default/call-home", "SmartcallhomeSource", {}),
+    ("org-root/deviceprofile-default/call-home",
+     "SmartcallhomeTransportGateway", {}),
+    ("org-root/deviceprofile-default", "CommDateTime", {}),
+    ("org-root/deviceprofile-default", "CommDns", {}),
+    ("org-root/deviceprofile-default", "CommSnmp", {}),
+    ("org-root/deviceprofile-default", "CommSyslog", {}),
+    ("org-root/deviceprofile-default/syslog", "CommSyslogConsole", {}),
+    ("org-root/deviceprofile-default/syslog", "CommSyslogFile", {}),
+    ("org-root/deviceprofile-default/syslog", "CommSyslogMonitor", {}),
+    ("org-root/deviceprofile-default/syslog", "CommSyslogSource", {}),
+    ("org-root/deviceprofile-default/syslog", "CommSyslogClient",
+     {"name": "primary"}),
+    ("org-root/deviceprofile-default/syslog", "CommSyslogClient",
+     {"name": "secondary"}),
+    ("org-root/deviceprofile-default/syslog", "CommSyslogClient",
+     {"name": "tertiary"}),
+)
+
+# children UCS Central creates along with a managed object, by xml tag
+_IMPLICIT = {"aaaDomain": ("AaaDomainAuth",)}
+
+_IGNORED_ATTRS = ("status", "rn", "childAction")
+
+
+class UcscEmulator(object):
+    """
+    In-memory managed object tree answering the UCS Central XML API methods
+    aaaLogin, aaaLogout, aaaKeepAlive, configResolveDn, configResolveDns,
+    configResolveClass, configResolveChildren and configConfMos.
+
+    Every request is counted by method in requests, along with the bytes
+    received and sent, and is delayed by latency seconds.
+
+    Args:
+        latency (float): seconds to wait before answering each request
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.requests = Counter()
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._mos = OrderedDict()
+        self._children = {}
+        self._cookies = set()
+        self._lock = threading.Lock()
+        self._seed()
+
+    def _seed(self):
+        from ucscsdk import ucsccoreutils
+
+        for parent_dn, class_id, props in _SEED:
+            mo_class = ucsccoreutils.load_class(class_id)
+            if class_id == "TopSystem":
+                mo = mo_class(name="ucscentral", address="127.0.0.1")
+            else:
+                mo = mo_class(parent_mo_or_dn=parent_dn, **props)
+            self.add_mo(mo)
+
+    def add_mo(self, mo):
+        """
+        Adds a ucscsdk managed object, and its children, to the tree
+        """
+        self._conf(mo.to_xml(), None)
+
+    def get(self, dn):
+        """
+        Gets the (xml tag, attributes) of the managed object at dn
+        """
+        return self._mos.get(dn)
+
+    def __contains__(self, dn):
+        return dn in self._mos
+
+    def __len__(self):
+        return len(self._mos)
+
+    def reset_stats(self):
+        """
+        Resets the request and byte counters
+        """
+        self.requests.clear()
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def process(self, xml_str):
+        """
+        Answers an XML API request
+
+        Args:
+            xml_str (str or bytes): request
+
+        Returns:
+            bytes: response
+        """
+        if self.latency:
+            time.sleep(self.latency)
+        request = ET.fromstring(xml_str)
+        with self._lock:
+            self.requests[request.tag] += 1
+            self.bytes_in += len(xml_str)
+            response = self._dispatch(request)
+            response_str = ET.tostring(response)
+            self.bytes_out += len(response_str)
+        return response_str
+
+    def _dispatch(self, request):
+        method = request.tag
+        if method == "aaaLogin":
+            cookie = str(uuid.uuid4())
+            self._cookies.add(cookie)
+            return ET.Element(method, cookie="", response="yes",
+                              outCookie=cookie, outRefreshPeriod="600",
+                              outPriv="admin", outDomains="",
+                              outChannel="noencssl",
+                              outEvtChannel="noencssl", outSessionId="",
+                              outVersion="1.5(1a)",
+                              outName=request.get("inName", ""))
+        cookie = request.get("cookie") or request.get("inCookie")
+        if cookie not in self._cookies:
+            return self._error(method, "552", "Authorization required")
+        if method == "aaaLogout":
+            self._cookies.discard(cookie)
+            return ET.Element(method, cookie="", response="yes",
+                              outStatus="success")
+        if method == "aaaKeepAlive":
+            return ET.Element(method, cookie=cookie, response="yes")
+
+        response = ET.Element(method, cookie=cookie, response="yes")
+        hierarchy = request.get("inHierarchical") == "true"
+        if method == "configResolveDn":
+            out = ET.SubElement(response, "outConfig")
+            dn = request.get("dn")
+            if dn in self._mos:
+                out.append(self._element(dn, hierarchy))
+        elif method == "configResolveDns":
+            out = ET.SubElement(response, "outConfigs")
+            unresolved = ET.SubElement(response, "outUnresolved")
+            for dn_elem in request.iter("dn"):
+                dn = dn_elem.get("value")
+                if dn in self._mos:
+                    out.append(self._element(dn, hierarchy))
+                else:
+                    ET.SubElement(unresolved, "dn", value=dn)
+        elif method == "configResolveClass":
+            out = ET.SubElement(response, "outConfigs")
+            class_tag = request.get("classId")
+            for dn in self._select(self._mos, class_tag, request):
+                out.append(self._element(dn, hierarchy))
+        elif method == "configResolveChildren":
+            out = ET.SubElement(response, "outConfigs")
+            children = self._children.get(request.get("inDn"), {})
+            for dn in self._select(children, request.get("classId"),
+                                   request):
+                out.append(self._element(dn, hierarchy))
+        elif method == "configConfMos":
+            out = ET.SubElement(response, "outConfigs")
+            try:
+                for pair in request.iter("pair"):
+                    out_pair = ET.SubElement(out, "pair",
+                                             key=pair.get("key"))
+                    for elem in pair:
+                        self._conf(elem, None)
+                        out_pair.append(self._conf_result(elem))
+            except ValueError as e:
+                return self._error(method, "103", str(e))
+        else:
+            return self._error(method, "1", "Unsupported method %s" % method)
+        return response
+
+    @staticmethod
+    def _error(method, code, descr):
+        return ET.Element(method, cookie="", response="yes", errorCode=code,
+                          invocationResult="unidentified-fail",
+                          errorDescr=descr)
+
+    def _element(self, dn, hierarchy):
+        tag, attrs = self._mos[dn]
+        elem = ET.Element(tag, attrs)
+        if hierarchy:
+            for child_dn in self._children.get(dn, {}):
+                elem.append(self._element(child_dn, hierarchy))
+        return elem
+
+    def _conf_result(self, elem):
+        dn = elem.get("dn")
+        if dn in self._mos:
+            result = self._element(dn, False)
+            result.set("status", elem.get("status") or "modified")
+            return result
+        return ET.Element(elem.tag, dn=dn, status="deleted")
+
+    def _conf(self, elem, parent_dn):
+        """
+        Applies a managed object element of a configConfMos request
+        """
+        dn = elem.get("dn")
+        if dn is None:
+            dn = parent_dn + "/" + elem.get("rn")
+        status = elem.get("status") or ""
+        if "deleted" in status or "removed" in status:
+            if dn not in self._mos:
+                raise ValueError("%s does not exist" % dn)
+            self._remove(dn)
+            return
+
+        parent_dn = dn.rpartition("/")[0] if parent_dn is None else parent_dn
+        if parent_dn and parent_dn not in self._mos:
+            raise ValueError("parent %s of %s does not exist"
+                             % (parent_dn, dn))
+        exists = dn in self._mos
+        if exists and status == "created":
+            raise ValueError("%s already exists" % dn)
+        if not exists and status == "modified":
+            raise ValueError("%s does not exist" % dn)
+
+        attrs = dict((key, value) for key, value in elem.attrib.items()
+                     if key not in _IGNORED_ATTRS)
+        attrs["dn"] = dn
+        if exists:
+            self._mos[dn][1].update(attrs)
+        else:
+            self._mos[dn] = (elem.tag, attrs)
+            self._children.setdefault(parent_dn, OrderedDict())[dn] = None
+        for child in elem:
+            self._conf(child, dn)
+        if not exists:
+            self._create_implicit(elem.tag, dn)
+
+    def _create_implicit(self, tag, dn):
+        from ucscsdk import ucsccoreutils
+
+        for class_id in _IMPLICIT.get(tag, ()):
+            mo = ucsccoreutils.load_class(class_id)(parent_mo_or_dn=dn)
+            if mo.dn not in self._mos:
+                self._conf(mo.to_xml(), dn)
+
+    def _remove(self, dn):
+        for child_dn in list(self._children.pop(dn, {})):
+            self._remove(child_dn)
+        del self._mos[dn]
+        self._children.get(dn.rpartition("/")[0], {}).pop(dn, None)
+
+    def _select(self, dns, class_tag, request):
+        in_filter = request.find("inFilter")
+        condition = in_filter[0] if in_filter is not None and \
+            len(in_filter) else None
+        for dn in list(dns):
+            tag, attrs = self._mos[dn]
+            if class_tag and tag.lower() != class_tag.lower():
+                continue
+            if condition is None or _match(condition, attrs):
+                yield dn
+
+
+def _compare(value, other):
+    try:
+        return float(value) - float(other)
+    except (TypeError, ValueError):
+        return (value > other) - (value < other)
+
+
+def _match(condition, attrs):
+    """
+    Evaluates an inFilter condition against the attributes of a managed
+    object
+    """
+    op = condition.tag
+    if op == "and":
+        return all(_match(child, attrs) for child in condition)
+    if op == "or":
+        return any(_match(child, attrs) for child in condition)
+    if op == "not":
+        return not _match(condition[0], attrs)
+
+    value = attrs.get(condition.get("property"))
+    expected = condition.get("value")
+    if value is None:
+        return op == "ne"
+    if op == "wcard":
+        return re.search(expected, value) is not None
+    if op == "eq":
+        return value == expected or \
+            re.match("(?:%s)$" % expected, value) is not None
+    if op == "ne":
+        return value != expected
+    diff = _compare(value, expected)
+    return {"gt": diff > 0, "ge": diff >= 0,
+            "lt": diff < 0, "le": diff <= 0}.get(op, False)
+
+
+class UcscEmulatorHandle(UcscHandle):
+    """
+    UcscHandle whose requests are answered by a UcscEmulator instead of a
+    UCS Central
+
+    Args:
+        emulator (UcscEmulator): emulator to talk to, a new one with the
+                                 given latency if None
+        latency (float): seconds to wait before answering each request
+        username (string)
+        password (string)
+
+    Example:
+        handle = UcscEmulatorHandle(latency=0.005)
+        handle.login()
+        mac_pool_create(handle, "pool1", "00:25:B5:00:00:00",
+                        "00:25:B5:00:00:03")
+        print(handle.emulator.requests)
+    """
+
+    def __init__(self, emulator=None, latency=0.0, username="admin",
+                 password="password"):
+        UcscHandle.__init__(self, "127.0.0.1", username, password)
+        self.emulator = emulator or UcscEmulator(latency=latency)
+
+    def post_xml(self, xml_str, read=True, dme="central-mgr"):
+        return self.emulator.process(xml_str)
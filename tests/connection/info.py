@@ -13,6 +13,26 @@
 
 host = "ucscentral"
 
+_emulator = None
+
+
+def emulator_setup():
+    """
+    Logs in to the in-process emulator shared by all the tests. Used instead
+    of connection.cfg when the UCSC_APIS_EMULATOR environment variable is
+    set, UCSC_APIS_EMULATOR_LATENCY gives the per-request latency in seconds.
+    """
+    import os
+    from .emulator import UcscEmulator, UcscEmulatorHandle
+
+    global _emulator
+    if _emulator is None:
+        latency = float(os.environ.get("UCSC_APIS_EMULATOR_LATENCY", 0))
+        _emulator = UcscEmulator(latency=latency)
+    handle = UcscEmulatorHandle(emulator=_emulator)
+    handle.login()
+    return handle
+
 
 def custom_setup():
     try:
@@ -23,6 +43,9 @@ def custom_setup():
     import os
     from ucscsdk.ucschandle import UcscHandle
 
+    if os.environ.get("UCSC_APIS_EMULATOR"):
+        return emulator_setup()
+
     config = ConfigParser.RawConfigParser()
     config.read(os.path.join(os.path.dirname(__file__), '..', 'connection',
                              'connection.cfg'))
@@ -0,0 +1,77 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from ..connection.info import custom_setup, custom_teardown
+from nose.tools import *
+from ucsc_apis.network.desired_state import *
+from ucsc_apis.network.mac_pool import mac_pool_exists
+from ucsc_apis.network.qos import qos_policy_exists
+
+handle = None
+
+desired = {
+    "mac_pools": [{"name": "test_ds_mac_pool", "descr": "desired state",
+                   "blocks": [{"r_from": "00:25:B5:00:00:04",
+                               "to": "00:25:B5:00:00:06"}]}],
+    "qos_policies": [{"name": "test_ds_qos", "prio": "gold"}],
+}
+
+
+def setup():
+    global handle
+    handle = custom_setup()
+
+
+def teardown():
+    custom_teardown(handle)
+
+
+def test_001_network_apply():
+    changes = network_apply(handle, desired)
+    assert_equal(len(changes), 2)
+    found = mac_pool_exists(handle, name="test_ds_mac_pool",
+                            r_from="00:25:B5:00:00:04",
+                            to="00:25:B5:00:00:06")[0]
+    assert_equal(found, True)
+    found = qos_policy_exists(handle, name="test_ds_qos", prio="gold")[0]
+    assert_equal(found, True)
+
+
+def test_002_network_apply_unchanged():
+    changes = network_apply(handle, desired)
+    assert_equal(changes, [])
+
+
+def test_003_network_apply_modify():
+    desired["qos_policies"][0]["prio"] = "silver"
+    changes = network_diff(handle, desired)
+    assert_equal([(action, mo.dn) for action, mo in changes],
+                 [("modify", "org-root/ep-qos-test_ds_qos/egress")])
+    network_apply(handle, desired)
+    found = qos_policy_exists(handle, name="test_ds_qos", prio="silver")[0]
+    assert_equal(found, True)
+
+
+def test_004_network_apply_delete():
+    changes = network_apply(handle, {"mac_pools": [], "qos_policies": []},
+                            prune=True, dry_run=True)
+    dns = [mo.dn for action, mo in changes if action == "delete"]
+    assert_true("org-root/mac-pool-test_ds_mac_pool" in dns)
+    assert_true("org-root/ep-qos-test_ds_qos" in dns)
+    for action, mo in changes:
+        if mo.dn in ("org-root/mac-pool-test_ds_mac_pool",
+                     "org-root/ep-qos-test_ds_qos"):
+            handle.remove_mo(mo)
+    handle.commit()
+    found = mac_pool_exists(handle, name="test_ds_mac_pool")[0]
+    assert_equal(found, False)
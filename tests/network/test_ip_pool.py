@@ -14,6 +14,7 @@
 from ..connection.info import custom_setup, custom_teardown
 from nose.tools import *
 from ucsc_apis.network.ip_pool import *
+from ucscsdk.ucscexception import UcscOperationError
 
 handle = None
 
@@ -46,3 +47,72 @@ def test_003_ip_pool_remove():
     ip_pool_remove(handle, name="test_ip_pool")
     found = ip_pool_exists(handle, name="test_ip_pool")[0]
     assert_equal(found, False)
+
+
+def test_004_ip_block_index():
+    ip_pool_create(handle, name="test_ip_pool_a")
+    ip_block_add(handle, "test_ip_pool_a", "1.1.2.10", "1.1.2.19",
+                 "255.255.255.0", "1.1.2.1")
+    index = ip_block_index(handle)
+    assert_equal([mo.dn for mo in index.contains("1.1.2.15")],
+                 ["org-root/ip-pool-test_ip_pool_a/block-1.1.2.10-1.1.2.19"])
+    assert_equal(index.free_range(9, "1.1.2.0", "255.255.255.0",
+                                  def_gw="1.1.2.1"),
+                 ("1.1.2.20", "1.1.2.28"))
+    assert_equal(index.free_range(8, "1.1.2.0", "255.255.255.0",
+                                  def_gw="1.1.2.1"),
+                 ("1.1.2.2", "1.1.2.9"))
+    assert_equal(index.check("1.1.2.20", "1.1.2.29", "255.255.255.0",
+                             "1.1.2.1"), [])
+    assert_equal(len(index.check("1.1.2.200", "1.1.3.10", "255.255.255.0",
+                                 "1.1.5.1")), 2)
+    assert_equal(len(index.check("1.1.2.5", "1.1.2.10", "255.255.255.0",
+                                 "1.1.2.1")), 1)
+
+
+def test_005_ip_block_add_check():
+    index = ip_block_index(handle)
+    assert_raises(UcscOperationError, ip_block_add, handle, "test_ip_pool_a",
+                  "1.1.2.15", "1.1.2.25", "255.255.255.0", "1.1.2.1",
+                  check=True, index=index)
+    ip_block_add(handle, "test_ip_pool_a", "1.1.2.20", "1.1.2.29",
+                 "255.255.255.0", "1.1.2.1", check=True, index=index)
+    assert_equal(len(index.overlaps("1.1.2.15", "1.1.2.25")), 2)
+    assert_equal(index.problems(), [])
+    ip_pool_remove(handle, name="test_ip_pool_a")
+
+
+def test_006_ip_blocks_add():
+    ip_pool_create(handle, name="test_ip_pool_b")
+    blocks = [{"r_from": "1.1.3.%d" % (i * 10 + 1),
+               "to": "1.1.3.%d" % (i * 10 + 10),
+               "subnet": "255.255.255.0", "def_gw": "1.1.3.254"}
+              for i in range(5)]
+    blocks.append({"r_from": "1.1.4.1", "to": "1.1.4.10",
+                   "subnet": "255.255.255.0", "def_gw": "1.1.4.254",
+                   "prim_dns": "8.8.8.8"})
+    mos = ip_blocks_add(handle, "test_ip_pool_b", blocks)
+    assert_equal([(mo.r_from, mo.to) for mo in mos],
+                 [("1.1.3.1", "1.1.3.50"), ("1.1.4.1", "1.1.4.10")])
+    found = ip_pool_exists(handle, name="test_ip_pool_b", r_from="1.1.4.1",
+                           to="1.1.4.10", prim_dns="8.8.8.8")[0]
+    assert_equal(found, True)
+
+
+def test_007_ip_blocks_add_invalid():
+    assert_raises(UcscOperationError, ip_blocks_add, handle,
+                  "test_ip_pool_b", [{"r_from": "1.1.5.1", "to": "1.1.5.10",
+                                      "subnet": "255.255.255.0",
+                                      "def_gw": "1.1.6.254"}])
+    assert_raises(UcscOperationError, ip_blocks_add, handle,
+                  "test_ip_pool_b", [{"r_from": "1.1.5.1", "to": "1.1.5.10",
+                                      "subnet": "255.255.255.0",
+                                      "def_gw": "1.1.5.254"},
+                                     {"r_from": "1.1.5.5", "to": "1.1.5.20",
+                                      "subnet": "255.255.255.0",
+                                      "def_gw": "1.1.5.253"}])
+    assert_raises(UcscOperationError, ip_blocks_add, handle,
+                  "test_ip_pool_b", [{"r_from": "1.1.3.40", "to": "1.1.3.60",
+                                      "subnet": "255.255.255.0",
+                                      "def_gw": "1.1.3.254"}], check=True)
+    ip_pool_remove(handle, name="test_ip_pool_b")
@@ -14,6 +14,7 @@
 from ..connection.info import custom_setup, custom_teardown
 from nose.tools import *
 from ucsc_apis.network.lan_conn_policy import *
+from ucsc_apis.common.hooks import hook_register, hook_unregister
 
 handle = None
 
@@ -82,3 +83,34 @@ def test_003_lan_conn_policy_delete():
     lan_conn_policy_delete(handle, name="test_lan_con_pol")
     found = lan_conn_policy_exists(handle, name="test_lan_con_pol")[0]
     assert_equal(found, False)
+
+
+def test_005_lan_conn_policy_build():
+    events = []
+    hook_register(events.append)
+    try:
+        lan_conn_policy_build(
+            handle, "test_lcp_build",
+            vnics=[{"name": "eth0", "switch_id": "A", "mtu": "9000",
+                    "vlans": [{"name": "default", "default_net": "yes"},
+                              "test_vlan"]},
+                   {"name": "eth1", "switch_id": "B"}],
+            iscsi_vnics=[{"name": "iscsi0", "vnic_name": "eth0"}])
+    finally:
+        hook_unregister(events.append)
+    assert_equal(events[-1].counts["commit"], 1)
+    assert_equal(sum(events[-1].counts.values()), 2)
+
+    dn = "org-root/lan-conn-pol-test_lcp_build"
+    found = lcp_vnic_exists(handle, name="eth0", parent_dn=dn,
+                            mtu="9000")[0]
+    assert_equal(found, True)
+    found = lcp_vnic_exists(handle, name="eth1", parent_dn=dn,
+                            switch_id="B")[0]
+    assert_equal(found, True)
+    found = lcp_iscsi_vnic_exists(handle, name="iscsi0", parent_dn=dn,
+                                  vnic_name="eth0")[0]
+    assert_equal(found, True)
+    mo = handle.query_dn(dn + "/ether-eth0/if-test_vlan")
+    assert_not_equal(mo, None)
+    lan_conn_policy_delete(handle, name="test_lcp_build")
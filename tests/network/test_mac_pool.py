@@ -14,6 +14,9 @@
 from ..connection.info import custom_setup, custom_teardown
 from nose.tools import *
 from ucsc_apis.network.mac_pool import *
+from ucsc_apis.common.utils import mo_subtree_index
+from ucsc_apis.common.hooks import hook_register, hook_unregister
+from ucscsdk.ucscexception import UcscOperationError
 
 handle = None
 
@@ -30,13 +33,92 @@ def teardown():
 def test_001_mac_pool_create():
     mac_pool_create(handle, name="test_mac_pool", descr="testing macpool",
                     r_from="00:25:B5:00:00:04", to="00:25:B5:00:00:06")
+    events = []
+    hook_register(events.append)
+    try:
+        found = mac_pool_exists(handle, name="test_mac_pool",
+                                r_from="00:25:B5:00:00:04",
+                                to="00:25:B5:00:00:06")[0]
+    finally:
+        hook_unregister(events.append)
+    assert_equal(found, True)
+    assert_equal(events[-1].counts["query_dns"], 1)
+    assert_equal(events[-1].counts["query_dn"], 0)
+
+
+def test_002_mac_pool_exists_subtree():
+    subtree = mo_subtree_index(handle.query_dn("org-root", hierarchy=True))
     found = mac_pool_exists(handle, name="test_mac_pool",
                             r_from="00:25:B5:00:00:04",
-                            to="00:25:B5:00:00:06")[0]
+                            to="00:25:B5:00:00:06", subtree=subtree)[0]
     assert_equal(found, True)
+    found = mac_pool_exists(handle, name="test_mac_pool",
+                            r_from="00:25:B5:00:00:04",
+                            to="00:25:B5:00:00:07", subtree=subtree)[0]
+    assert_equal(found, False)
 
 
-def test_002_mac_pool_remove():
+def test_003_mac_pool_remove():
     mac_pool_remove(handle, name="test_mac_pool")
     found = mac_pool_exists(handle, name="test_mac_pool")[0]
     assert_equal(found, False)
+
+
+def test_004_mac_block_index():
+    mac_pool_create(handle, name="test_mac_pool_a",
+                    r_from="00:25:B5:00:01:00", to="00:25:B5:00:01:FF")
+    index = mac_block_index(handle)
+    assert_equal([mo.dn for mo in index.contains("00:25:B5:00:01:10")],
+                 ["org-root/mac-pool-test_mac_pool_a/"
+                  "block-00:25:B5:00:01:00-00:25:B5:00:01:FF"])
+    assert_equal(index.contains("00:25:B5:00:02:00"), [])
+    assert_equal(len(index.overlaps("00:25:B5:00:01:F0",
+                                    "00:25:B5:00:02:10")), 1)
+    assert_equal(index.free_range(16, r_from="00:25:B5:00:01:00"),
+                 ("00:25:B5:00:02:00", "00:25:B5:00:02:0F"))
+
+
+def test_005_mac_pool_create_overlap():
+    index = mac_block_index(handle)
+    assert_raises(UcscOperationError, mac_pool_create, handle,
+                  name="test_mac_pool_b", r_from="00:25:B5:00:01:80",
+                  to="00:25:B5:00:02:7F", check_overlap=True, index=index)
+    mac_pool_create(handle, name="test_mac_pool_b",
+                    r_from="00:25:B5:00:02:00", to="00:25:B5:00:02:7F",
+                    check_overlap=True, index=index)
+    assert_equal(len(index.overlaps("00:25:B5:00:01:80",
+                                    "00:25:B5:00:02:7F")), 2)
+    assert_equal(index.conflicts(), [])
+    mac_pool_remove(handle, name="test_mac_pool_a")
+    mac_pool_remove(handle, name="test_mac_pool_b")
+
+
+def test_006_mac_pool_create_blocks():
+    mo = mac_pool_create(handle, name="test_mac_pool_c",
+                         blocks=[("00:25:B5:00:03:10", "00:25:B5:00:03:1F"),
+                                 ("00:25:B5:00:03:00", "00:25:B5:00:03:0F"),
+                                 {"r_from": "00:25:B5:00:04:00",
+                                  "to": "00:25:B5:00:04:0F"}])
+    assert_equal(sorted(child.rn for child in mo.child),
+                 ["block-00:25:B5:00:03:00-00:25:B5:00:03:1F",
+                  "block-00:25:B5:00:04:00-00:25:B5:00:04:0F"])
+    found = mac_pool_exists(handle, name="test_mac_pool_c",
+                            r_from="00:25:B5:00:03:00",
+                            to="00:25:B5:00:03:1F")[0]
+    assert_equal(found, True)
+
+
+def test_007_mac_block_add_many():
+    blocks = mac_block_add_many(handle, "test_mac_pool_c",
+                                [("00:25:B5:00:05:00", "00:25:B5:00:05:0F"),
+                                 ("00:25:B5:00:05:08", "00:25:B5:00:05:1F")])
+    assert_equal(len(blocks), 1)
+    found = mac_pool_exists(handle, name="test_mac_pool_c",
+                            r_from="00:25:B5:00:05:00",
+                            to="00:25:B5:00:05:1F")[0]
+    assert_equal(found, True)
+    assert_raises(UcscOperationError, mac_block_add_many, handle,
+                  "test_mac_pool_c", [("00:25:B5:00:05:10",
+                                       "00:25:B5:00:05:2F")],
+                  check_overlap=True)
+    mac_pool_remove(handle, name="test_mac_pool_c")
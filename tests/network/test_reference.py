@@ -0,0 +1,146 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from ..connection.info import custom_setup, custom_teardown
+from nose.tools import *
+from ucscsdk.ucscexception import UcscOperationError
+from ucsc_apis.network.reference import *
+from ucsc_apis.network.mac_pool import mac_pool_create, mac_pool_remove
+from ucsc_apis.network.lan_conn_policy import lan_conn_policy_build, \
+    lan_conn_policy_delete
+
+handle = None
+org_dn = "org-root/org-test_ref_org"
+
+
+def setup():
+    from ucscsdk.mometa.org.OrgOrg import OrgOrg
+
+    global handle
+    handle = custom_setup()
+    handle.add_mo(OrgOrg(parent_mo_or_dn="org-root", name="test_ref_org"),
+                  modify_present=True)
+    handle.commit()
+    mac_pool_create(handle, name="test_ref_pool", r_from="00:25:B5:00:06:00",
+                    to="00:25:B5:00:06:0F")
+
+
+def teardown():
+    mac_pool_remove(handle, name="test_ref_pool")
+    handle.remove_mo(handle.query_dn(org_dn))
+    handle.commit()
+    custom_teardown(handle)
+
+
+def test_001_reference_resolve():
+    references = reference_index(handle)
+    mo = references.resolve("MacpoolPool", "test_ref_pool", org_dn)
+    assert_equal(mo.dn, "org-root/mac-pool-test_ref_pool")
+    assert_equal(references.resolve("MacpoolPool", "test_ref_pool",
+                                    "org-root"), mo)
+    assert_equal(references.resolve("MacpoolPool", "test_ref_missing",
+                                    org_dn), None)
+
+
+def test_002_reference_check_vnics():
+    references = reference_index(handle)
+    problems = references.check_vnics(
+        [{"name": "eth0", "ident_pool_name": "test_ref_pool",
+          "nw_ctrl_policy_name": "global-default"},
+         {"name": "eth1", "ident_pool_name": "test_ref_missing",
+          "qos_policy_name": "test_ref_missing"}],
+        org_dn=org_dn)
+    assert_equal(list(problems), ["eth1"])
+    assert_equal(len(problems["eth1"]), 2)
+
+
+def test_003_lan_conn_policy_build_references():
+    assert_raises(UcscOperationError, lan_conn_policy_build, handle,
+                  "test_ref_lcp", parent_dn=org_dn,
+                  vnics=[{"name": "eth0", "ident_pool_name": "test_ref_typo"}],
+                  check_references=True)
+    lan_conn_policy_build(handle, "test_ref_lcp", parent_dn=org_dn,
+                          vnics=[{"name": "eth0",
+                                  "ident_pool_name": "test_ref_pool"}],
+                          check_references=True)
+    lan_conn_policy_delete(handle, "test_ref_lcp", parent_dn=org_dn)
+
+
+def test_004_impact_index():
+    from ucsc_apis.network.vlan import vlan_create, vlan_delete
+
+    vlan_create(handle, name="test_ref_vlan", id="3001")
+    lan_conn_policy_build(handle, "test_ref_lcp", parent_dn=org_dn,
+                          vnics=[{"name": "eth0",
+                                  "ident_pool_name": "test_ref_pool",
+                                  "vlans": ["test_ref_vlan"]}])
+    impact = impact_index(handle)
+    referrers = impact.referrers("org-root/mac-pool-test_ref_pool")
+    assert_equal([(mo.dn, prop) for mo, prop in referrers],
+                 [(org_dn + "/lan-conn-pol-test_ref_lcp/ether-eth0",
+                   "ident_pool_name")])
+    referrers = impact.referrers("domaingroup-root/fabric/lan/"
+                                 "net-test_ref_vlan")
+    assert_equal([mo.get_class_id() for mo, prop in referrers],
+                 ["VnicEtherIf"])
+
+    assert_raises(UcscOperationError, mac_pool_remove, handle,
+                  name="test_ref_pool", check_impact=True, impact=impact)
+    assert_raises(UcscOperationError, vlan_delete, handle,
+                  name="test_ref_vlan", check_impact=True)
+    lan_conn_policy_delete(handle, "test_ref_lcp", parent_dn=org_dn)
+    vlan_delete(handle, name="test_ref_vlan", check_impact=True)
+
+
+def test_005_impact_index_duplicate_names():
+    from ucscsdk.mometa.org.OrgDomainGroup import OrgDomainGroup
+    from ucscsdk.mometa.fabric.FabricEp import FabricEp
+    from ucscsdk.mometa.fabric.FabricLanCloud import FabricLanCloud
+    from ucsc_apis.network.vlan import vlan_create, vlan_delete
+    from ucsc_apis.network.mcast_policy import mcast_policy_create, \
+        mcast_policy_delete
+
+    group = OrgDomainGroup(parent_mo_or_dn="domaingroup-root",
+                           name="test_ref_dg")
+    FabricLanCloud(parent_mo_or_dn=FabricEp(parent_mo_or_dn=group))
+    handle.add_mo(group, modify_present=True)
+    handle.commit()
+    mcast_policy_create(handle, name="test_ref_mcast")
+    mcast_policy_create(handle, name="test_ref_mcast", parent_dn=org_dn)
+    vlan_create(handle, name="test_ref_vlan", id="3002",
+                mcast_policy_name="test_ref_mcast")
+    vlan_create(handle, name="test_ref_vlan", id="3002",
+                domain_group="root/test_ref_dg")
+    lan_conn_policy_build(handle, "test_ref_lcp", parent_dn=org_dn,
+                          vnics=[{"name": "eth0",
+                                  "ident_pool_name": "test_ref_pool",
+                                  "vlans": ["test_ref_vlan"]}])
+
+    impact = impact_index(handle)
+    assert_raises(UcscOperationError, vlan_delete, handle,
+                  name="test_ref_vlan", domain_group="root/test_ref_dg",
+                  check_impact=True, impact=impact)
+    assert_raises(UcscOperationError, vlan_delete, handle,
+                  name="test_ref_vlan", check_impact=True, impact=impact)
+    assert_raises(UcscOperationError, mcast_policy_delete, handle,
+                  name="test_ref_mcast", check_impact=True, impact=impact)
+    mcast_policy_delete(handle, name="test_ref_mcast", parent_dn=org_dn,
+                        check_impact=True, impact=impact)
+
+    lan_conn_policy_delete(handle, "test_ref_lcp", parent_dn=org_dn)
+    vlan_delete(handle, name="test_ref_vlan",
+                domain_group="root/test_ref_dg", check_impact=True)
+    vlan_delete(handle, name="test_ref_vlan", check_impact=True)
+    mcast_policy_delete(handle, name="test_ref_mcast", check_impact=True)
+    handle.remove_mo(handle.query_dn(group.dn))
+    handle.commit()
@@ -14,6 +14,7 @@
 from ..connection.info import custom_setup, custom_teardown
 from nose.tools import *
 from ucsc_apis.network.vlan import *
+from ucscsdk.ucscexception import UcscOperationError
 
 handle = None
 
@@ -54,3 +55,60 @@ def test_003_vlan_delete():
     found = vlan_exists(handle, name="test_appl_vlan",
                         vlan_type="appliance")[0]
     assert_equal(found, False)
+
+
+def test_004_vlan_bulk_create():
+    vlans = vlan_bulk_create(handle, "test_bulk_{id}:700-709,720",
+                             chunk_size=4)
+    assert_equal(len(vlans), 11)
+    found = vlan_exists(handle, name="test_bulk_705", id="705")[0]
+    assert_equal(found, True)
+    found = vlan_exists(handle, name="test_bulk_720", id="720")[0]
+    assert_equal(found, True)
+
+
+def test_005_vlan_index():
+    index = vlan_index(handle, domain_group="root")
+    mo = index.get("test_bulk_701")
+    assert_equal(mo.id, "701")
+    assert_equal(len(index.get_by_id("720")), 1)
+    result = vlan_exists_many(handle, ["test_bulk_702", "test_bulk_799"],
+                              index=index)
+    assert_equal(result["test_bulk_702"][0], True)
+    assert_equal(result["test_bulk_799"][0], False)
+
+
+def test_006_vlan_index_ids():
+    index = vlan_index(handle)
+    assert_equal(index.id_used("705"), True)
+    assert_equal(index.id_free("705"), False)
+    assert_equal(index.id_free("710"), True)
+    assert_equal(index.id_free("4094"), False)
+    assert_equal(index.id_used("705", domain_group="root/unknown"), False)
+    assert_equal(index.ids_used(["root", "root/unknown"])[-11:],
+                 list(range(700, 710)) + [720])
+    assert_equal(index.free_ids(12, r_from=700), list(range(721, 733)))
+    assert_equal(index.free_ids(10, r_from=700), list(range(710, 720)))
+    assert_equal(index.free_ids(3, r_from=4092), [])
+
+
+def test_007_vlan_create_duplicate():
+    index = vlan_index(handle)
+    assert_raises(UcscOperationError, vlan_create, handle,
+                  name="test_vlan_dup", id="705", check_duplicate=True,
+                  index=index)
+    vlan_create(handle, name="test_bulk_705", id="705", check_duplicate=True,
+                index=index)
+    vlan_create(handle, name="test_vlan_dup", id="710", check_duplicate=True,
+                index=index)
+    assert_equal(index.id_used("710"), True)
+    assert_raises(UcscOperationError, vlan_create, handle,
+                  name="test_vlan_dup2", id="710", check_duplicate=True)
+    vlan_delete(handle, name="test_vlan_dup")
+
+
+def test_008_vlan_bulk_delete():
+    for vlan_id in list(range(700, 710)) + [720]:
+        vlan_delete(handle, name="test_bulk_%d" % vlan_id)
+    found = vlan_exists(handle, name="test_bulk_705")[0]
+    assert_equal(found, False)
@@ -15,10 +15,12 @@
 This module performs the operation related to Authentication management.
 """
 from ucscsdk.ucscexception import UcscOperationError
-from ..common.utils import get_device_profile_dn
+from ..common.utils import get_device_profile_dn, get_mo, set_mo_changes
+from ..common.hooks import instrument
 ucsc_base_dn = get_device_profile_dn(name="default")
 
 
+@instrument
 def auth_domain_create(handle, name, refresh_period="600",
                        session_timeout="7200", descr=None, **kwargs):
     """
@@ -54,13 +56,16 @@ def auth_domain_create(handle, name, refresh_period="600",
     return mo
 
 
-def auth_domain_get(handle, name):
+@instrument
+def auth_domain_get(handle, name, snapshot=None):
     """
     Gets the auth domain
 
     Args:
         handle (UcscHandle)
         name (string): name of auth domain
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
 
     Returns:
         AaaDomain Managed Object OR None
@@ -70,16 +75,19 @@ def auth_domain_get(handle, name):
     """
 
     dn = ucsc_base_dn + "/auth-realm/domain-" + name
-    return handle.query_dn(dn)
+    return get_mo(handle, dn, snapshot)
 
 
-def auth_domain_exists(handle, name, **kwargs):
+@instrument
+def auth_domain_exists(handle, name, snapshot=None, **kwargs):
     """
     checks if auth domain exists
 
     Args:
         handle (UcscHandle)
         name (string): name of auth domain
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
@@ -91,26 +99,30 @@ def auth_domain_exists(handle, name, **kwargs):
         auth_domain_exists(handle, name="ciscoucscentral")
     """
 
-    mo = auth_domain_get(handle, name)
+    mo = auth_domain_get(handle, name, snapshot=snapshot)
     if not mo:
         return (False, None)
     mo_exists = mo.check_prop_match(**kwargs)
     return (mo_exists, mo if mo_exists else None)
 
 
-def auth_domain_modify(handle, name, **kwargs):
+@instrument
+def auth_domain_modify(handle, name, return_changes=False, **kwargs):
     """
     Modifies a domain
 
     Args:
         handle (UcscHandle)
         name (string): name of domain
+        return_changes (bool): also return the dict of the properties
+                               written, empty if nothing was written
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
 
     Returns:
         AaaDomain : Managed Object
+        OR (Managed Object, dict) if return_changes is True
 
     Raises:
         UcscOperationError: If AaaDomain is not present
@@ -125,12 +137,15 @@ def auth_domain_modify(handle, name, **kwargs):
         raise UcscOperationError("auth_domain_modify",
                                  "Auth Domain '%s' does not exist." % name)
 
-    mo.set_prop_multiple(**kwargs)
-    handle.set_mo(mo)
-    handle.commit()
+    changes = set_mo_changes(handle, mo, **kwargs)
+    if changes:
+        handle.commit()
+    if return_changes:
+        return (mo, changes)
     return mo
 
 
+@instrument
 def auth_domain_delete(handle, name):
     """
     deletes a auth domain.
@@ -158,6 +173,7 @@ def auth_domain_delete(handle, name):
     handle.commit()
 
 
+@instrument
 def auth_domain_realm_configure(handle, domain_name, realm="local",
                                 provider_group=None, name=None, descr=None,
                                 **kwargs):
@@ -204,6 +220,7 @@ def auth_domain_realm_configure(handle, domain_name, realm="local",
     return mo
 
 
+@instrument
 def native_auth_configure(handle, def_role_policy=None,
                           def_login=None, con_login=None,
                           descr=None, **kwargs):
@@ -249,6 +266,7 @@ def native_auth_configure(handle, def_role_policy=None,
     return mo
 
 
+@instrument
 def native_auth_default(handle, realm=None, session_timeout=None,
                         refresh_period=None, provider_group=None,
                         name=None, descr=None, **kwargs):
@@ -299,6 +317,7 @@ def native_auth_default(handle, realm=None, session_timeout=None,
     return mo
 
 
+@instrument
 def native_auth_console(handle, realm=None, provider_group=None,
                         name=None, descr=None, **kwargs):
     """
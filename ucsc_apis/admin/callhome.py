@@ -16,9 +16,11 @@ This module performs the operation related to callhome.
 """
 from ucscsdk.ucscexception import UcscOperationError
 from ..common.utils import get_device_profile_dn
+from ..common.hooks import instrument
 ucsc_base_dn = get_device_profile_dn(name="default")
 
 
+@instrument
 def call_home_enable(handle, alert_throttling_admin_state=None, name=None,
                      descr=None, **kwargs):
     """
@@ -59,6 +61,7 @@ def call_home_enable(handle, alert_throttling_admin_state=None, name=None,
     return mo
 
 
+@instrument
 def call_home_config(handle, contact=None, phone=None, email=None,
                      addr=None, customer=None, contract=None, site=None,
                      r_from=None, reply_to=None, urgency=None, **kwargs):
@@ -132,6 +135,7 @@ def call_home_config(handle, contact=None, phone=None, email=None,
     return mo
 
 
+@instrument
 def call_home_disable(handle):
     """
     Disables call home alert.
@@ -161,6 +165,7 @@ def call_home_disable(handle):
     return mo
 
 
+@instrument
 def call_home_proxy_config(handle, url, port="80", **kwargs):
     """
     Configures HTTP proxy for callhome
@@ -203,6 +208,7 @@ def call_home_proxy_config(handle, url, port="80", **kwargs):
     return mo
 
 
+@instrument
 def call_home_transport_gw_config(handle, enabled, url, cert_chain=None,
                                   **kwargs):
     """
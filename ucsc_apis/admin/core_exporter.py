@@ -15,9 +15,11 @@
 This module performs the operation related to TFTP core Expoerter.
 """
 from ..common.utils import get_device_profile_dn
+from ..common.hooks import instrument
 ucsc_base_dn = get_device_profile_dn(name="default")
 
 
+@instrument
 def core_exporter_enable(handle,
                          hostname,
                          path,
@@ -62,6 +64,7 @@ def core_exporter_enable(handle,
     return mo
 
 
+@instrument
 def core_exporter_disable(handle):
     """
     This method disables UCS Central tftp core exporter.
@@ -15,10 +15,12 @@
 This module performs the operation related to dns server management.
 """
 from ucscsdk.ucscexception import UcscOperationError
-from ..common.utils import get_device_profile_dn
+from ..common.utils import get_device_profile_dn, get_mo
+from ..common.hooks import instrument
 ucsc_base_dn = get_device_profile_dn(name="default")
 
 
+@instrument
 def dns_server_add(handle, name, descr=None, **kwargs):
     """
     Adds a dns server
@@ -51,13 +53,16 @@ def dns_server_add(handle, name, descr=None, **kwargs):
     return mo
 
 
-def dns_server_get(handle, name):
+@instrument
+def dns_server_get(handle, name, snapshot=None):
     """
     Gets the dns entry
 
     Args:
         handle (UcscHandle)
         name (string): IP address of the dns server
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
 
     Returns:
         CommDnsProvider: Managed object OR None
@@ -67,16 +72,19 @@ def dns_server_get(handle, name):
     """
 
     dn = ucsc_base_dn + "/dns-svc/dns-" + name
-    return handle.query_dn(dn)
+    return get_mo(handle, dn, snapshot)
 
 
-def dns_server_exists(handle, name, **kwargs):
+@instrument
+def dns_server_exists(handle, name, snapshot=None, **kwargs):
     """
     Checks if the dns entry already exists
 
     Args:
         handle (UcscHandle)
         name (string): IP address of the dns server
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
@@ -88,13 +96,14 @@ def dns_server_exists(handle, name, **kwargs):
         bool_var = dns_server_exists(handle, "10.10.10.10")
     """
 
-    mo = dns_server_get(handle, name)
+    mo = dns_server_get(handle, name, snapshot=snapshot)
     if not mo:
         return (False, None)
     mo_exists = mo.check_prop_match(**kwargs)
     return (mo_exists, mo if mo_exists else None)
 
 
+@instrument
 def dns_server_remove(handle, name):
     """
     Removes a dns server
@@ -122,6 +131,7 @@ def dns_server_remove(handle, name):
     handle.commit()
 
 
+@instrument
 def dns_set_domain_name(handle, domain, **kwargs):
     """
     Sets the Ucs Central domain name for dns
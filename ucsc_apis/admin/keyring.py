@@ -15,10 +15,12 @@
 This module performs the operation related to key management.
 """
 from ucscsdk.ucscexception import UcscOperationError
-from ..common.utils import get_device_profile_dn
+from ..common.utils import get_device_profile_dn, get_mo, set_mo_changes
+from ..common.hooks import instrument
 ucsc_base_dn = get_device_profile_dn(name="default")
 
 
+@instrument
 def key_ring_create(handle, name, descr=None, tp=None,
                     cert=None, regen="no", modulus="mod2048", **kwargs):
     """
@@ -57,13 +59,16 @@ def key_ring_create(handle, name, descr=None, tp=None,
     return mo
 
 
-def key_ring_get(handle, name):
+@instrument
+def key_ring_get(handle, name, snapshot=None):
     """
     Gets the key ring
 
     Args:
         handle (UcscHandle)
         name (string): name
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
 
     Returns:
         PkiKeyRing: managed object OR None
@@ -73,16 +78,19 @@ def key_ring_get(handle, name):
     """
 
     dn = ucsc_base_dn + "/pki-ext/keyring-" + name
-    return handle.query_dn(dn)
+    return get_mo(handle, dn, snapshot)
 
 
-def key_ring_exists(handle, name, **kwargs):
+@instrument
+def key_ring_exists(handle, name, snapshot=None, **kwargs):
     """
     Checks if a key ring exists
 
     Args:
         handle (UcscHandle)
         name (string): name
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
@@ -94,26 +102,30 @@ def key_ring_exists(handle, name, **kwargs):
         key_ring = key_ring_exists(handle, name="mykeyring")
     """
 
-    mo = key_ring_get(handle, name)
+    mo = key_ring_get(handle, name, snapshot=snapshot)
     if not mo:
         return (False, None)
     mo_exists = mo.check_prop_match(**kwargs)
     return (mo_exists, mo if mo_exists else None)
 
 
-def key_ring_modify(handle, name, **kwargs):
+@instrument
+def key_ring_modify(handle, name, return_changes=False, **kwargs):
     """
     Modifies a key ring
 
     Args:
         handle (UcscHandle)
         name (string): name
+        return_changes (bool): also return the dict of the properties
+                               written, empty if nothing was written
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
 
     Returns:
         PkiKeyRing : Managed object
+        OR (Managed Object, dict) if return_changes is True
 
     Raises:
         UcscOperationError: if PkiKeyRing is not present
@@ -127,12 +139,15 @@ def key_ring_modify(handle, name, **kwargs):
         raise UcscOperationError("key_ring_modify",
                                  "keyring '%s' does not exist" % name)
 
-    mo.set_prop_multiple(**kwargs)
-    handle.set_mo(mo)
-    handle.commit()
+    changes = set_mo_changes(handle, mo, **kwargs)
+    if changes:
+        handle.commit()
+    if return_changes:
+        return (mo, changes)
     return mo
 
 
+@instrument
 def key_ring_delete(handle, name):
     """
     Deletes a key ring
@@ -160,6 +175,7 @@ def key_ring_delete(handle, name):
     handle.commit()
 
 
+@instrument
 def certificate_request_add(handle, name, dns=None, locality=None, state=None,
                             country=None, org_name=None, org_unit_name=None,
                             email=None, pwd=None, subj_name=None, ip="0.0.0.0",
@@ -232,13 +248,16 @@ def certificate_request_add(handle, name, dns=None, locality=None, state=None,
     return mo
 
 
-def certificate_request_get(handle, name):
+@instrument
+def certificate_request_get(handle, name, snapshot=None):
     """
     Checks if a certificate request exists
 
     Args:
         handle (UcscHandle)
         name (string): KeyRing name
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
 
     Returns:
         PkiCertReq: Managed object OR None
@@ -250,16 +269,19 @@ def certificate_request_get(handle, name):
     """
 
     dn = ucsc_base_dn + "/pki-ext/keyring-" + name + "/certreq"
-    return handle.query_dn(dn)
+    return get_mo(handle, dn, snapshot)
 
 
-def certificate_request_exists(handle, name, **kwargs):
+@instrument
+def certificate_request_exists(handle, name, snapshot=None, **kwargs):
     """
     Checks if a certificate request exists
 
     Args:
         handle (UcscHandle)
         name (string): KeyRing name
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
@@ -273,7 +295,7 @@ def certificate_request_exists(handle, name, **kwargs):
         certificate_request_exists(handle, key_ring="keyring")
     """
 
-    mo = certificate_request_get(handle, name)
+    mo = certificate_request_get(handle, name, snapshot=snapshot)
     if not mo:
         return (False, None)
     mo_exists = mo.check_prop_match(**kwargs)
@@ -285,6 +307,7 @@ Note: certificate_request_modify is not possible
 '''
 
 
+@instrument
 def certificate_request_remove(handle, name):
     """
     Removes a certificate request from keyring
@@ -316,6 +339,7 @@ def certificate_request_remove(handle, name):
     handle.commit()
 
 
+@instrument
 def trusted_point_create(handle, name, descr=None, cert_chain=None, **kwargs):
     """
     Creates a trusted point
@@ -349,13 +373,16 @@ def trusted_point_create(handle, name, descr=None, cert_chain=None, **kwargs):
     return mo
 
 
-def trusted_point_get(handle, name):
+@instrument
+def trusted_point_get(handle, name, snapshot=None):
     """
     Checks if a trusted point exists
 
     Args:
         handle (ucschandle)
         name (string): name
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
 
     Returns:
         PkiTP: managed object OR None
@@ -365,16 +392,19 @@ def trusted_point_get(handle, name):
     """
 
     dn = ucsc_base_dn + "/pki-ext/tp-" + name
-    return handle.query_dn(dn)
+    return get_mo(handle, dn, snapshot)
 
 
-def trusted_point_exists(handle, name, **kwargs):
+@instrument
+def trusted_point_exists(handle, name, snapshot=None, **kwargs):
     """
     Checks if a trusted point exists
 
     Args:
         handle (ucschandle)
         name (string): name
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
@@ -386,26 +416,30 @@ def trusted_point_exists(handle, name, **kwargs):
         key_ring = trusted_point_exists(handle, name="mytrustedpoint")
     """
 
-    mo = trusted_point_get(handle, name)
+    mo = trusted_point_get(handle, name, snapshot=snapshot)
     if not mo:
         return (False, None)
     mo_exists = mo.check_prop_match(**kwargs)
     return (mo_exists, mo if mo_exists else None)
 
 
-def trusted_point_modify(handle, name, **kwargs):
+@instrument
+def trusted_point_modify(handle, name, return_changes=False, **kwargs):
     """
     Modifies a trusted point
 
     Args:
         handle (ucschandle)
         name (string): name
+        return_changes (bool): also return the dict of the properties
+                               written, empty if nothing was written
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
 
     Returns:
         PkiTP object
+        OR (Managed Object, dict) if return_changes is True
 
     Raises:
         UcscOperationError: if PkiTP not present
@@ -420,12 +454,15 @@ def trusted_point_modify(handle, name, **kwargs):
         raise UcscOperationError("trusted_point_modify",
                                  "trusted point '%s' does not exist" % name)
 
-    mo.set_prop_multiple(**kwargs)
-    handle.set_mo(mo)
-    handle.commit()
+    changes = set_mo_changes(handle, mo, **kwargs)
+    if changes:
+        handle.commit()
+    if return_changes:
+        return (mo, changes)
     return mo
 
 
+@instrument
 def trusted_point_delete(handle, name):
     """
     Deletes a truted point
@@ -16,10 +16,12 @@ This module performs the operation related to ldap.
 """
 from ucscsdk.ucscexception import UcscOperationError
 from ..admin.locale import locale_exists
-from ..common.utils import get_device_profile_dn
+from ..common.utils import get_device_profile_dn, get_mo, set_mo_changes
+from ..common.hooks import instrument
 ucsc_base_dn = get_device_profile_dn(name="default")
 
 
+@instrument
 def ldap_provider_create(handle, name, order="lowest-available", rootdn=None,
                          basedn="", port="389", enable_ssl="no", filter=None,
                          attribute=None, key=None, timeout="30",
@@ -84,13 +86,16 @@ def ldap_provider_create(handle, name, order="lowest-available", rootdn=None,
     return mo
 
 
-def ldap_provider_get(handle, name):
+@instrument
+def ldap_provider_get(handle, name, snapshot=None):
     """
     Gets the ldap provider
 
     Args:
         handle (UcscHandle)
         name (string): name of ldap provider
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
 
     Returns:
         AaaLdapProvider : Managed Object OR None
@@ -100,16 +105,19 @@ def ldap_provider_get(handle, name):
     """
 
     dn = ucsc_base_dn + "/ldap-ext/provider-" + name
-    return handle.query_dn(dn)
+    return get_mo(handle, dn, snapshot)
 
 
-def ldap_provider_exists(handle, name, **kwargs):
+@instrument
+def ldap_provider_exists(handle, name, snapshot=None, **kwargs):
     """
     checks if ldap provider exists
 
     Args:
         handle (UcscHandle)
         name (string): name of ldap provider
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
@@ -121,26 +129,30 @@ def ldap_provider_exists(handle, name, **kwargs):
         ldap_provider_exists(handle, name="test_ldap_provider")
     """
 
-    mo = ldap_provider_get(handle, name)
+    mo = ldap_provider_get(handle, name, snapshot=snapshot)
     if not mo:
         return (False, None)
     mo_exists = mo.check_prop_match(**kwargs)
     return (mo_exists, mo if mo_exists else None)
 
 
-def ldap_provider_modify(handle, name, **kwargs):
+@instrument
+def ldap_provider_modify(handle, name, return_changes=False, **kwargs):
     """
     modifies a ldap provider
 
     Args:
         handle (UcscHandle)
         name (string): name of ldap provider
+        return_changes (bool): also return the dict of the properties
+                               written, empty if nothing was written
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
 
     Returns:
         AaaLdapProvider : Managed Object
+        OR (Managed Object, dict) if return_changes is True
 
     Raises:
         UcscOperationError: If AaaLdapProvider is not present
@@ -154,12 +166,15 @@ def ldap_provider_modify(handle, name, **kwargs):
         raise UcscOperationError("ldap_provider_modify",
                                  "Ldap Provider does not exist")
 
-    mo.set_prop_multiple(**kwargs)
-    handle.set_mo(mo)
-    handle.commit()
+    changes = set_mo_changes(handle, mo, **kwargs)
+    if changes:
+        handle.commit()
+    if return_changes:
+        return (mo, changes)
     return mo
 
 
+@instrument
 def ldap_provider_delete(handle, name):
     """
     deletes a ldap provider
@@ -187,6 +202,7 @@ def ldap_provider_delete(handle, name):
     handle.commit()
 
 
+@instrument
 def ldap_provider_group_rules_configure(handle, ldap_provider_name,
                                         authorization=None, traversal=None,
                                         target_attr=None, name=None,
@@ -239,6 +255,7 @@ def ldap_provider_group_rules_configure(handle, ldap_provider_name,
     return mo
 
 
+@instrument
 def ldap_group_map_create(handle, name, descr=None, **kwargs):
     """
     creates ldap group map
@@ -269,13 +286,16 @@ def ldap_group_map_create(handle, name, descr=None, **kwargs):
     return mo
 
 
-def ldap_group_map_get(handle, name):
+@instrument
+def ldap_group_map_get(handle, name, snapshot=None):
     """
     Gets ldap group map
 
     Args:
         handle (UcscHandle)
         name (string): name
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
 
     Returns:
         AaaLdapGroup : Managed Object OR None
@@ -285,16 +305,19 @@ def ldap_group_map_get(handle, name):
     """
 
     dn = ucsc_base_dn + "/ldap-ext/ldapgroup-" + name
-    return handle.query_dn(dn)
+    return get_mo(handle, dn, snapshot)
 
 
-def ldap_group_map_exists(handle, name, **kwargs):
+@instrument
+def ldap_group_map_exists(handle, name, snapshot=None, **kwargs):
     """
     checks if ldap group map exists
 
     Args:
         handle (UcscHandle)
         name (string): name
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
@@ -306,13 +329,14 @@ def ldap_group_map_exists(handle, name, **kwargs):
         ldap_group_map_exists(handle, name="test_ldap_group_map")
     """
 
-    mo = ldap_group_map_get(handle, name)
+    mo = ldap_group_map_get(handle, name, snapshot=snapshot)
     if not mo:
         return (False, None)
     mo_exists = mo.check_prop_match(**kwargs)
     return (mo_exists, mo if mo_exists else None)
 
 
+@instrument
 def ldap_group_map_delete(handle, name):
     """
     removes ldap group map
@@ -340,6 +364,7 @@ def ldap_group_map_delete(handle, name):
     handle.commit()
 
 
+@instrument
 def ldap_group_map_role_add(handle, ldap_group_map_name, name, descr=None,
                             **kwargs):
     """
@@ -378,7 +403,8 @@ def ldap_group_map_role_add(handle, ldap_group_map_name, name, descr=None,
     return mo
 
 
-def ldap_group_map_role_get(handle, ldap_group_map_name, name):
+@instrument
+def ldap_group_map_role_get(handle, ldap_group_map_name, name, snapshot=None):
     """
     Gets the role  for the respective ldap group map
 
@@ -386,6 +412,8 @@ def ldap_group_map_role_get(handle, ldap_group_map_name, name):
         handle (UcscHandle)
         ldap_group_map_name (string): name of ldap group
         name (string):  role name
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
 
     Returns:
         AaaUserRole : Managed Object OR None
@@ -398,10 +426,12 @@ def ldap_group_map_role_get(handle, ldap_group_map_name, name):
 
     ldap_dn = ucsc_base_dn + "/ldap-ext/ldapgroup-" + ldap_group_map_name
     dn = ldap_dn + "/role-" + name
-    return handle.query_dn(dn)
+    return get_mo(handle, dn, snapshot)
 
 
-def ldap_group_map_role_exists(handle, ldap_group_map_name, name, **kwargs):
+@instrument
+def ldap_group_map_role_exists(handle, ldap_group_map_name, name,
+                               snapshot=None, **kwargs):
     """
     checks if role exists for the respective ldap group map
 
@@ -409,6 +439,8 @@ def ldap_group_map_role_exists(handle, ldap_group_map_name, name, **kwargs):
         handle (UcscHandle)
         ldap_group_map_name (string): name of ldap group
         name (string):  role name
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
@@ -422,13 +454,15 @@ def ldap_group_map_role_exists(handle, ldap_group_map_name, name, **kwargs):
                                    name="test_role")
     """
 
-    mo = ldap_group_map_role_get(handle, ldap_group_map_name, name)
+    mo = ldap_group_map_role_get(handle, ldap_group_map_name, name,
+                                 snapshot=snapshot)
     if not mo:
         return (False, None)
     mo_exists = mo.check_prop_match(**kwargs)
     return (mo_exists, mo if mo_exists else None)
 
 
+@instrument
 def ldap_group_map_role_remove(handle, ldap_group_map_name, name):
     """
     removes role from the respective ldap group map
@@ -459,6 +493,7 @@ def ldap_group_map_role_remove(handle, ldap_group_map_name, name):
     handle.commit()
 
 
+@instrument
 def ldap_group_map_locale_add(handle, ldap_group_map_name, name, descr=None,
                             **kwargs):
     """
@@ -501,7 +536,9 @@ def ldap_group_map_locale_add(handle, ldap_group_map_name, name, descr=None,
     return mo
 
 
-def ldap_group_map_locale_get(handle, ldap_group_map_name, name):
+@instrument
+def ldap_group_map_locale_get(handle, ldap_group_map_name, name,
+                              snapshot=None):
     """
     Gets the locale for the respective ldap group map
 
@@ -509,6 +546,8 @@ def ldap_group_map_locale_get(handle, ldap_group_map_name, name):
         handle (UcscHandle)
         ldap_group_map_name (string): name of ldap group
         name (string):  locale name
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
 
     Returns:
         AaaUserLocale : Managed Object OR None
@@ -521,10 +560,12 @@ def ldap_group_map_locale_get(handle, ldap_group_map_name, name):
 
     ldap_dn = ucsc_base_dn + "/ldap-ext/ldapgroup-" + ldap_group_map_name
     dn = ldap_dn + "/locale-" + name
-    return handle.query_dn(dn)
+    return get_mo(handle, dn, snapshot)
 
 
-def ldap_group_map_locale_exists(handle, ldap_group_map_name, name, **kwargs):
+@instrument
+def ldap_group_map_locale_exists(handle, ldap_group_map_name, name,
+                                 snapshot=None, **kwargs):
     """
     checks if locale exists for the respective ldap group map
 
@@ -532,6 +573,8 @@ def ldap_group_map_locale_exists(handle, ldap_group_map_name, name, **kwargs):
         handle (UcscHandle)
         ldap_group_map_name (string): name of ldap group
         name (string):  locale name
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
@@ -545,13 +588,15 @@ def ldap_group_map_locale_exists(handle, ldap_group_map_name, name, **kwargs):
                                    name="locale1")
     """
 
-    mo = ldap_group_map_locale_get(handle, ldap_group_map_name, name)
+    mo = ldap_group_map_locale_get(handle, ldap_group_map_name, name,
+                                   snapshot=snapshot)
     if not mo:
         return (False, None)
     mo_exists = mo.check_prop_match(**kwargs)
     return (mo_exists, mo if mo_exists else None)
 
 
+@instrument
 def ldap_group_map_locale_remove(handle, ldap_group_map_name, name):
     """
     removes locale from the respective ldap group map
@@ -584,6 +629,127 @@ def ldap_group_map_locale_remove(handle, ldap_group_map_name, name):
     handle.remove_mo(mo)
     handle.commit()
 
+
+@instrument
+def ldap_group_maps_sync(handle, desired, prune=False, dry_run=False,
+                         snapshot=None):
+    """
+    Brings the ldap group maps, and their roles and locales, to the desired
+    mapping.
+
+    The current group maps are read from one snapshot of the default device
+    profile, the diff is computed in memory and only the adds and removes
+    it finds are written, in one commit. Re-syncing an unchanged mapping
+    makes no commit at all.
+
+    The roles and locales of a group map given in desired are
+    authoritative: those missing from it are removed. Group maps absent
+    from desired are only deleted when prune is True.
+
+    Args:
+        handle (UcscHandle)
+        desired (dict): ldap group dn to a dict of "roles" and "locales",
+                        lists of names, and optionally "descr"
+        prune (bool): delete the group maps absent from desired
+        dry_run (bool): compute the changes without writing them
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), taken if
+                               not given
+
+    Returns:
+        List of ("add"/"modify"/"delete", ManagedObject): changes applied,
+        or to be applied when dry_run is True
+
+    Raises:
+        UcscOperationError: If a role or a locale does not exist
+
+    Example:
+        changes = ldap_group_maps_sync(handle, {
+            "CN=ucs-admins,OU=groups,DC=example,DC=com": {
+                "roles": ["admin"]},
+            "CN=ucs-ops,OU=groups,DC=example,DC=com": {
+                "roles": ["operations", "read-only"],
+                "locales": ["emea"]},
+        })
+    """
+
+    from ucscsdk.mometa.aaa.AaaLdapGroup import AaaLdapGroup
+    from ucscsdk.mometa.aaa.AaaUserRole import AaaUserRole
+    from ucscsdk.mometa.aaa.AaaUserLocale import AaaUserLocale
+    from .snapshot import admin_snapshot
+
+    if snapshot is None:
+        snapshot = admin_snapshot(handle)
+
+    for class_id, key, label in (("AaaRole", "roles", "Role"),
+                                 ("AaaLocale", "locales", "Locale")):
+        names = set(mo.name for mo in snapshot.by_class(class_id))
+        missing = set()
+        for entry in desired.values():
+            missing.update(set(entry.get(key) or []) - names)
+        if missing:
+            raise UcscOperationError("ldap_group_maps_sync",
+                                     "%s '%s' does not exist"
+                                     % (label, "', '".join(sorted(missing))))
+
+    ldap_dn = ucsc_base_dn + "/ldap-ext"
+    changes = []
+    writes = []
+    for name in sorted(desired):
+        entry = desired[name]
+        group = AaaLdapGroup(parent_mo_or_dn=ldap_dn, name=name)
+        current = snapshot.get(group.dn)
+        descr = entry.get("descr")
+        if current is None:
+            # the roles and locales are added along with the group map
+            if descr is not None:
+                group.descr = descr
+            changes.append(("add", group))
+            writes.append(("add", group))
+        elif descr is not None and current.descr != descr:
+            group.descr = descr
+            changes.append(("modify", group))
+            writes.append(("modify", group))
+
+        for mo_class, key in ((AaaUserRole, "roles"),
+                              (AaaUserLocale, "locales")):
+            wanted = set(entry.get(key) or [])
+            have = set()
+            if current is not None:
+                for mo in snapshot.children(group.dn, mo_class.__name__):
+                    if mo.name in wanted:
+                        have.add(mo.name)
+                    else:
+                        changes.append(("delete", mo))
+                        writes.append(("delete", mo))
+            for child_name in sorted(wanted - have):
+                if current is None:
+                    mo = mo_class(parent_mo_or_dn=group, name=child_name)
+                else:
+                    mo = mo_class(parent_mo_or_dn=group.dn, name=child_name)
+                    writes.append(("add", mo))
+                changes.append(("add", mo))
+
+    if prune:
+        for mo in snapshot.children(ldap_dn, "AaaLdapGroup"):
+            if mo.name not in desired:
+                changes.append(("delete", mo))
+                writes.append(("delete", mo))
+
+    if dry_run or not writes:
+        return changes
+
+    for action, mo in writes:
+        if action == "add":
+            handle.add_mo(mo, True)
+        elif action == "modify":
+            handle.set_mo(mo)
+        else:
+            handle.remove_mo(mo)
+    handle.commit()
+    return changes
+
+
+@instrument
 def ldap_provider_group_create(handle, name, descr=None, **kwargs):
     """
     creates ldap provider group
@@ -615,13 +781,16 @@ def ldap_provider_group_create(handle, name, descr=None, **kwargs):
     return mo
 
 
-def ldap_provider_group_get(handle, name):
+@instrument
+def ldap_provider_group_get(handle, name, snapshot=None):
     """
     Gets ldap provider group
 
     Args:
         handle (UcscHandle)
         name (string): name
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
 
     Returns:
         AaaProviderGroup : Managed Object OR None
@@ -631,16 +800,19 @@ def ldap_provider_group_get(handle, name):
     """
 
     dn = ucsc_base_dn + "/ldap-ext/providergroup-" + name
-    return handle.query_dn(dn)
+    return get_mo(handle, dn, snapshot)
 
 
-def ldap_provider_group_exists(handle, name, **kwargs):
+@instrument
+def ldap_provider_group_exists(handle, name, snapshot=None, **kwargs):
     """
     checks if ldap provider group exists
 
     Args:
         handle (UcscHandle)
         name (string): name
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
@@ -652,13 +824,14 @@ def ldap_provider_group_exists(handle, name, **kwargs):
         ldap_provider_group_exists(handle, name="test_ldap_group_map")
     """
 
-    mo = ldap_provider_group_get(handle, name)
+    mo = ldap_provider_group_get(handle, name, snapshot=snapshot)
     if not mo:
         return (False, None)
     mo_exists = mo.check_prop_match(**kwargs)
     return (mo_exists, mo if mo_exists else None)
 
 
+@instrument
 def ldap_provider_group_delete(handle, name):
     """
     deletes ldap provider group
@@ -687,6 +860,7 @@ def ldap_provider_group_delete(handle, name):
     handle.commit()
 
 
+@instrument
 def ldap_provider_group_provider_add(handle, group_name, name,
                                      order="lowest-available",
                                      descr=None, **kwargs):
@@ -741,7 +915,8 @@ def ldap_provider_group_provider_add(handle, group_name, name,
     return mo
 
 
-def ldap_provider_group_provider_get(handle, group_name, name):
+@instrument
+def ldap_provider_group_provider_get(handle, group_name, name, snapshot=None):
     """
     Gets provider for ldap provider group
 
@@ -749,6 +924,8 @@ def ldap_provider_group_provider_get(handle, group_name, name):
         handle (UcscHandle)
         group_name (string): ldap provider group name
         name (string): name
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
 
     Returns:
         AaaProviderRef : Managed Object OR None
@@ -762,10 +939,12 @@ def ldap_provider_group_provider_get(handle, group_name, name):
 
     group_dn = ucsc_base_dn + "/ldap-ext/providergroup-" + group_name
     provider_dn = group_dn + "/provider-ref-" + name
-    return handle.query_dn(provider_dn)
+    return get_mo(handle, provider_dn, snapshot)
 
 
-def ldap_provider_group_provider_exists(handle, group_name, name, **kwargs):
+@instrument
+def ldap_provider_group_provider_exists(handle, group_name, name,
+                                        snapshot=None, **kwargs):
     """
     checks if provider added ldap provider group
 
@@ -773,6 +952,8 @@ def ldap_provider_group_provider_exists(handle, group_name, name, **kwargs):
         handle (UcscHandle)
         group_name (string): ldap provider group name
         name (string): name
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
@@ -787,14 +968,17 @@ def ldap_provider_group_provider_exists(handle, group_name, name, **kwargs):
                                             order="1")
     """
 
-    mo = ldap_provider_group_provider_get(handle, group_name, name)
+    mo = ldap_provider_group_provider_get(handle, group_name, name,
+                                          snapshot=snapshot)
     if not mo:
         return (False, None)
     mo_exists = mo.check_prop_match(**kwargs)
     return (mo_exists, mo if mo_exists else None)
 
 
-def ldap_provider_group_provider_modify(handle, group_name, name, **kwargs):
+@instrument
+def ldap_provider_group_provider_modify(handle, group_name, name,
+                                        return_changes=False, **kwargs):
     """
     modify provider of ldap provider group
 
@@ -802,15 +986,18 @@ def ldap_provider_group_provider_modify(handle, group_name, name, **kwargs):
         handle (UcscHandle)
         group_name (string): ldap provider group name
         name (string): name
+        return_changes (bool): also return the dict of the properties
+                               written, empty if nothing was written
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
 
     Returns:
-        True/False
+        AaaProviderRef : Managed Object
+        OR (Managed Object, dict) if return_changes is True
 
     Raises:
-        AaaProviderRef : Managed Object
+        UcscOperationError: If AaaProviderRef is not present
 
     Example:
         ldap_provider_group_provider_modify(handle,
@@ -824,12 +1011,15 @@ def ldap_provider_group_provider_modify(handle, group_name, name, **kwargs):
         raise UcscOperationError("ldap_provider_group_provider_modify",
                                  "Provider not available under group.")
 
-    mo.set_prop_multiple(**kwargs)
-    handle.set_mo(mo)
-    handle.commit()
+    changes = set_mo_changes(handle, mo, **kwargs)
+    if changes:
+        handle.commit()
+    if return_changes:
+        return (mo, changes)
     return mo
 
 
+@instrument
 def ldap_provider_group_provider_remove(handle, group_name, name):
     """
     removes provider from ldap provider group
@@ -15,10 +15,12 @@
 This module performs the operation related to dns server management.
 """
 from ucscsdk.ucscexception import UcscOperationError
-from ..common.utils import get_device_profile_dn
+from ..common.utils import get_device_profile_dn, get_mo, set_mo_changes
+from ..common.hooks import instrument
 ucsc_base_dn = get_device_profile_dn(name="default")
 
 
+@instrument
 def locale_create(handle, name, descr=None, **kwargs):
     """
     creates a locale
@@ -50,13 +52,16 @@ def locale_create(handle, name, descr=None, **kwargs):
     return mo
 
 
-def locale_get(handle, name):
+@instrument
+def locale_get(handle, name, snapshot=None):
     """
     Gets the locale
 
     Args:
         handle (UcscHandle)
         name (string): name of ldap provider
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
 
     Returns:
         AaaLocale : Managed Object OR None
@@ -66,16 +71,19 @@ def locale_get(handle, name):
     """
 
     dn = ucsc_base_dn + "/locale-" + name
-    return handle.query_dn(dn)
+    return get_mo(handle, dn, snapshot)
 
 
-def locale_exists(handle, name, **kwargs):
+@instrument
+def locale_exists(handle, name, snapshot=None, **kwargs):
     """
     checks if locale exists
 
     Args:
         handle (UcscHandle)
         name (string): name of ldap provider
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
@@ -87,26 +95,30 @@ def locale_exists(handle, name, **kwargs):
         locale_exists(handle, name="test_locale")
     """
 
-    mo = locale_get(handle, name)
+    mo = locale_get(handle, name, snapshot=snapshot)
     if not mo:
         return (False, None)
     mo_exists = mo.check_prop_match(**kwargs)
     return (mo_exists, mo if mo_exists else None)
 
 
-def locale_modify(handle, name, **kwargs):
+@instrument
+def locale_modify(handle, name, return_changes=False, **kwargs):
     """
     modifies a locale
 
     Args:
         handle (UcscHandle)
         name (string): name of locale
+        return_changes (bool): also return the dict of the properties
+                               written, empty if nothing was written
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
 
     Returns:
         AaaLocale : Managed Object
+        OR (Managed Object, dict) if return_changes is True
 
     Raises:
         UcscOperationError: If AaaLocale is not present
@@ -120,12 +132,15 @@ def locale_modify(handle, name, **kwargs):
         raise UcscOperationError("locale_modify",
                                  "Locale does not exist")
 
-    mo.set_prop_multiple(**kwargs)
-    handle.set_mo(mo)
-    handle.commit()
+    changes = set_mo_changes(handle, mo, **kwargs)
+    if changes:
+        handle.commit()
+    if return_changes:
+        return (mo, changes)
     return mo
 
 
+@instrument
 def locale_delete(handle, name):
     """
     deletes locale
@@ -153,6 +168,7 @@ def locale_delete(handle, name):
     handle.commit()
 
 
+@instrument
 def locale_org_assign(handle, locale_name, name, org_dn="org-root", descr=None,
                       **kwargs):
     """
@@ -197,6 +213,7 @@ def locale_org_assign(handle, locale_name, name, org_dn="org-root", descr=None,
     return mo
 
 
+@instrument
 def locale_org_unassign(handle, locale_name, name):
     """
     unassigns a locale from org
@@ -228,6 +245,7 @@ def locale_org_unassign(handle, locale_name, name):
     handle.commit()
 
 
+@instrument
 def locale_domaingroup_assign(handle, locale_name, name,
                               domaingroup_dn="domaingroup-root", descr=None,
                               **kwargs):
@@ -274,6 +292,7 @@ def locale_domaingroup_assign(handle, locale_name, name,
     return mo
 
 
+@instrument
 def locale_domaingroup_unassign(handle, locale_name, name):
     """
     unassigns a locale
@@ -0,0 +1,282 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module computes the effective privileges of users and LDAP groups
+offline, from a snapshot of the admin configuration.
+"""
+from ..common.hooks import instrument
+
+# Privileges of AaaRole.priv, each given a bit of the privilege bitsets
+PRIVILEGES = (
+    "aaa", "admin", "domain-group-management", "ext-lan-config",
+    "ext-lan-policy", "ext-lan-qos", "ext-lan-security", "ext-san-config",
+    "ext-san-policy", "ext-san-qos", "ext-san-security", "fault", "kvm",
+    "ls-compute", "ls-config", "ls-config-policy", "ls-ext-access",
+    "ls-network", "ls-network-policy", "ls-qos", "ls-qos-policy",
+    "ls-security", "ls-security-policy", "ls-server", "ls-server-oper",
+    "ls-server-policy", "ls-storage", "ls-storage-policy", "operations",
+    "org-management", "pn-equipment", "pn-maintenance", "pn-policy",
+    "pn-security", "pod-config", "pod-policy", "pod-qos", "pod-security",
+    "power-mgmt", "read-only", "stats-management", "tag",
+)
+
+_BITS = dict((priv, 1 << i) for i, priv in enumerate(PRIVILEGES))
+
+ALL_PRIVILEGES = (1 << len(PRIVILEGES)) - 1
+
+
+def privilege_bits(privs):
+    """
+    Converts privileges, as a list or a comma separated string as in
+    AaaRole.priv, to a bitset. "admin" implies all the privileges.
+
+    Returns:
+        int
+    """
+    if not isinstance(privs, (list, tuple, set, frozenset)):
+        privs = str(privs or "").split(",")
+    bits = 0
+    for priv in privs:
+        bits |= _BITS.get(priv.strip(), 0)
+    if bits & _BITS["admin"]:
+        bits = ALL_PRIVILEGES
+    return bits
+
+
+def _under(dn, scope_dns):
+    return any(dn == scope_dn or dn.startswith(scope_dn + "/")
+               for scope_dn in scope_dns)
+
+
+class EffectivePrivileges(object):
+    """
+    Effective privileges of a user or a set of LDAP groups
+
+    Attributes:
+        bits (int): privilege bitset, see PRIVILEGES
+        roles (frozenset): names of the roles granted
+        locales (frozenset): names of the locales granted
+        orgs (frozenset): dns of the orgs of the locales, the privileges
+                          also apply to their sub-orgs
+        domain_groups (frozenset): dns of the domain groups of the locales,
+                                   and their sub-groups
+        unknown (frozenset): names of the roles and locales granted which
+                             do not exist
+    """
+
+    def __init__(self, bits, roles, locales, orgs, domain_groups, unknown):
+        self.bits = bits
+        self.roles = roles
+        self.locales = locales
+        self.orgs = orgs
+        self.domain_groups = domain_groups
+        self.unknown = unknown
+
+    @property
+    def privileges(self):
+        """
+        Names of the privileges, in the order of PRIVILEGES
+        """
+        return [priv for priv in PRIVILEGES if self.bits & _BITS[priv]]
+
+    @property
+    def unrestricted(self):
+        """
+        True when no locale is granted, the privileges then apply to every
+        org and domain group
+        """
+        return not self.locales
+
+    def has(self, privs):
+        """
+        Checks that all the given privileges are granted
+
+        Args:
+            privs (list or comma separated string): privileges
+
+        Returns:
+            True/False
+        """
+        bits = privilege_bits(privs)
+        return self.bits & bits == bits
+
+    def can(self, privs, org_dn=None, domain_group_dn=None):
+        """
+        Checks that all the given privileges are granted in an org or a
+        domain group
+
+        Args:
+            privs (list or comma separated string): privileges
+            org_dn (string): e.g. "org-root/org-demo"
+            domain_group_dn (string): e.g. "domaingroup-root/domaingroup-a"
+
+        Returns:
+            True/False
+        """
+        if not self.has(privs):
+            return False
+        if self.unrestricted:
+            return True
+        if org_dn is not None and not _under(org_dn, self.orgs):
+            return False
+        if domain_group_dn is not None and \
+                not _under(domain_group_dn, self.domain_groups):
+            return False
+        return True
+
+
+class PrivilegeModel(object):
+    """
+    Roles, locales, users and LDAP group maps of a snapshot of the admin
+    configuration, with the privileges of each role and the scope of each
+    locale precomputed as bitsets and sets. The effective privileges of a
+    combination of roles and locales are computed once and shared by all
+    the identities having it.
+
+    Use privilege_model() to build it from UCS Central.
+
+    Args:
+        snapshot (MoSnapshot): snapshot of the default device profile, see
+                               admin_snapshot()
+    """
+
+    def __init__(self, snapshot):
+        self.role_bits = {}
+        for mo in snapshot.by_class("AaaRole"):
+            self.role_bits[mo.name] = privilege_bits(mo.priv)
+
+        self.locale_scopes = {}
+        for mo in snapshot.by_class("AaaLocale"):
+            orgs = frozenset(child.org_dn for child in
+                             snapshot.children(mo.dn, "AaaOrg"))
+            domain_groups = frozenset(
+                child.domaingroup_dn for child in
+                snapshot.children(mo.dn, "AaaDomainGroup"))
+            self.locale_scopes[mo.name] = (orgs, domain_groups)
+
+        self.users = {}
+        for mo in snapshot.by_class("AaaUser"):
+            self.users[mo.name] = self._grants(snapshot, mo.dn)
+        self.ldap_groups = {}
+        for mo in snapshot.by_class("AaaLdapGroup"):
+            self.ldap_groups[mo.name] = self._grants(snapshot, mo.dn)
+        self._cache = {}
+
+    @staticmethod
+    def _grants(snapshot, dn):
+        return (frozenset(mo.name for mo in
+                          snapshot.children(dn, "AaaUserRole")),
+                frozenset(mo.name for mo in
+                          snapshot.children(dn, "AaaUserLocale")))
+
+    def _effective(self, roles, locales):
+        key = (roles, locales)
+        found = self._cache.get(key)
+        if found is not None:
+            return found
+        bits = 0
+        unknown = set()
+        for role in roles:
+            if role in self.role_bits:
+                bits |= self.role_bits[role]
+            else:
+                unknown.add(role)
+        orgs = set()
+        domain_groups = set()
+        for locale in locales:
+            if locale in self.locale_scopes:
+                orgs.update(self.locale_scopes[locale][0])
+                domain_groups.update(self.locale_scopes[locale][1])
+            else:
+                unknown.add(locale)
+        found = EffectivePrivileges(bits, roles, locales, frozenset(orgs),
+                                    frozenset(domain_groups),
+                                    frozenset(unknown))
+        self._cache[key] = found
+        return found
+
+    def user(self, name):
+        """
+        Computes the effective privileges of a local user
+
+        Returns:
+            EffectivePrivileges OR None if the user does not exist
+        """
+        grants = self.users.get(name)
+        if grants is None:
+            return None
+        return self._effective(*grants)
+
+    def ldap(self, groups):
+        """
+        Computes the effective privileges granted by a set of LDAP groups,
+        e.g. those of a remote user. Groups without a group map grant
+        nothing.
+
+        Args:
+            groups (list): LDAP group dns, as named in the group maps
+
+        Returns:
+            EffectivePrivileges
+        """
+        roles = set()
+        locales = set()
+        for group in groups:
+            group_roles, group_locales = self.ldap_groups.get(
+                group, (frozenset(), frozenset()))
+            roles.update(group_roles)
+            locales.update(group_locales)
+        return self._effective(frozenset(roles), frozenset(locales))
+
+    def review(self):
+        """
+        Computes the effective privileges of every local user and LDAP
+        group map
+
+        Returns:
+            dict: ("user" or "ldap_group", name) to EffectivePrivileges
+        """
+        review = {}
+        for name in self.users:
+            review[("user", name)] = self.user(name)
+        for name in self.ldap_groups:
+            review[("ldap_group", name)] = self.ldap([name])
+        return review
+
+
+@instrument
+def privilege_model(handle, snapshot=None):
+    """
+    Builds the privilege model of the default device profile, downloaded
+    with one hierarchical query unless a snapshot is given
+
+    Args:
+        handle (UcscHandle)
+        snapshot (MoSnapshot): snapshot from admin_snapshot()
+
+    Returns:
+        PrivilegeModel
+
+    Example:
+        model = privilege_model(handle)
+        model.user("jdoe").privileges
+        model.user("jdoe").can("ls-server", org_dn="org-root/org-emea")
+        model.ldap(["CN=ucs-admins,OU=groups,DC=example,DC=com"]).bits
+        review = model.review()
+    """
+    if snapshot is None:
+        from .snapshot import admin_snapshot
+
+        snapshot = admin_snapshot(handle)
+    return PrivilegeModel(snapshot)
@@ -0,0 +1,215 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module applies the provider and provider group topology of an
+authentication realm (ldap, radius or tacacs) in one commit.
+"""
+from ucscsdk.ucscexception import UcscOperationError
+from ..common.utils import get_device_profile_dn
+from ..common.hooks import instrument
+ucsc_base_dn = get_device_profile_dn(name="default")
+
+# realm, as in AaaDomainAuth.realm, to the rn of its container and the class
+# of its providers
+_REALMS = {
+    "ldap": ("ldap-ext", "AaaLdapProvider"),
+    "radius": ("radius-ext", "AaaRadiusProvider"),
+    "tacacs": ("tacacs-ext", "AaaTacacsPlusProvider"),
+}
+
+# AaaProviderRef.order ranges from 0 to 16
+_MAX_GROUP_PROVIDERS = 16
+
+
+def _mo_class(class_id):
+    from ucscsdk import ucsccoreutils
+
+    return ucsccoreutils.load_class(class_id)
+
+
+def _props(entry, exclude):
+    return dict((prop, str(value)) for prop, value in entry.items()
+                if prop not in exclude and value is not None)
+
+
+@instrument
+def aaa_provider_topology_apply(handle, realm, providers=None, groups=None,
+                                prune=False, snapshot=None):
+    """
+    Applies the providers and provider groups of an authentication realm,
+    along with the auth domains bound to the groups, in one commit.
+
+    The current configuration is read from one snapshot of the default
+    device profile, and every reference is checked against it and the
+    document before anything is written: the members of each group must be
+    providers of the realm, given in providers or already present, and the
+    auth domains bound must exist.
+
+    Providers and groups are created, or modified when present. The
+    members of a group are authoritative when its "providers" are given:
+    their order follows the list, and members missing from it are
+    removed. Without "providers", the members of a group are kept.
+    Providers and groups of the realm absent from the document are only
+    deleted when prune is True.
+
+    Args:
+        handle (UcscHandle)
+        realm (string): "ldap", "radius" or "tacacs"
+        providers (list): dicts of the properties of the providers, named
+                          as in the *_provider_create function of the realm
+        groups (list): dicts with "name", and optionally "providers", the
+                       names of the members in order, "descr" and
+                       "auth_domains", the names of the auth domains to
+                       authenticate against the group
+        prune (bool): delete the providers and groups absent from the
+                      document
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), taken if
+                               not given
+
+    Returns:
+        List of ("add"/"modify"/"delete", ManagedObject): changes applied
+
+    Raises:
+        UcscOperationError: If the realm is unknown, a reference does not
+                            resolve, or prune would delete a group still
+                            bound to an authentication once the document
+                            is applied
+
+    Example:
+        aaa_provider_topology_apply(
+            handle, realm="radius",
+            providers=[{"name": "10.1.1.10", "key": "secret"},
+                       {"name": "10.1.1.11", "key": "secret"}],
+            groups=[{"name": "radius_grp",
+                     "providers": ["10.1.1.10", "10.1.1.11"],
+                     "auth_domains": ["corp"]}])
+    """
+
+    from ucscsdk.mometa.aaa.AaaProviderGroup import AaaProviderGroup
+    from ucscsdk.mometa.aaa.AaaProviderRef import AaaProviderRef
+    from ucscsdk.mometa.aaa.AaaDomainAuth import AaaDomainAuth
+    from .snapshot import admin_snapshot
+
+    api = "aaa_provider_topology_apply"
+    if realm not in _REALMS:
+        raise UcscOperationError(api, "Realm '%s' is not one of %s"
+                                 % (realm, ", ".join(sorted(_REALMS))))
+    providers = providers or []
+    groups = groups or []
+    if snapshot is None:
+        snapshot = admin_snapshot(handle)
+
+    ext_rn, provider_class_id = _REALMS[realm]
+    ext_dn = ucsc_base_dn + "/" + ext_rn
+    realm_dn = ucsc_base_dn + "/auth-realm"
+
+    # validate the whole document before building anything
+    problems = []
+    provider_names = set()
+    for entry in providers:
+        if "name" not in entry:
+            problems.append("provider %s is missing 'name'" % entry)
+        elif entry["name"] in provider_names:
+            problems.append("provider '%s' is given twice" % entry["name"])
+        else:
+            provider_names.add(entry["name"])
+    known = set(provider_names)
+    if not prune:
+        known.update(mo.name for mo in
+                     snapshot.children(ext_dn, provider_class_id))
+    group_names = set()
+    for entry in groups:
+        name = entry.get("name")
+        if name is None:
+            problems.append("group %s is missing 'name'" % entry)
+            continue
+        if name in group_names:
+            problems.append("group '%s' is given twice" % name)
+        group_names.add(name)
+        members = list(entry.get("providers") or [])
+        if len(members) > _MAX_GROUP_PROVIDERS:
+            problems.append("group '%s' has more than %d providers"
+                            % (name, _MAX_GROUP_PROVIDERS))
+        if len(set(members)) != len(members):
+            problems.append("group '%s' lists a provider twice" % name)
+        for member in members:
+            if member not in known:
+                problems.append("provider '%s' of group '%s' does not exist"
+                                % (member, name))
+        for domain in entry.get("auth_domains") or []:
+            if snapshot.get(realm_dn + "/domain-" + domain) is None:
+                problems.append("auth domain '%s' of group '%s' does not "
+                                "exist" % (domain, name))
+    if prune:
+        # auth domains the document binds to one of its groups no longer
+        # use the group they are bound to now
+        rebound = set(realm_dn + "/domain-" + domain + "/domain-auth"
+                      for entry in groups
+                      for domain in entry.get("auth_domains") or [])
+        for mo in snapshot.by_class("AaaDomainAuth") + \
+                snapshot.by_class("AaaDefaultAuth") + \
+                snapshot.by_class("AaaConsoleAuth"):
+            if mo.dn in rebound:
+                continue
+            if mo.realm == realm and mo.provider_group and \
+                    mo.provider_group not in group_names:
+                problems.append("group '%s' is used by %s"
+                                % (mo.provider_group, mo.dn))
+    if problems:
+        raise UcscOperationError(api, "; ".join(problems))
+
+    changes = []
+    provider_class = _mo_class(provider_class_id)
+    for entry in providers:
+        mo = provider_class(parent_mo_or_dn=ext_dn, name=entry["name"])
+        mo.set_prop_multiple(**_props(entry, ("name",)))
+        action = "modify" if mo.dn in snapshot else "add"
+        changes.append((action, mo))
+
+    for entry in groups:
+        group = AaaProviderGroup(parent_mo_or_dn=ext_dn, name=entry["name"])
+        group.set_prop_multiple(**_props(entry, ("name", "providers",
+                                                 "auth_domains")))
+        members = list(entry.get("providers") or [])
+        for order, member in enumerate(members, 1):
+            AaaProviderRef(parent_mo_or_dn=group, name=member,
+                           order=str(order))
+        changes.append(("modify" if group.dn in snapshot else "add", group))
+        if "providers" in entry:
+            for mo in snapshot.children(group.dn, "AaaProviderRef"):
+                if mo.name not in members:
+                    changes.append(("delete", mo))
+        for domain in entry.get("auth_domains") or []:
+            mo = AaaDomainAuth(parent_mo_or_dn=realm_dn + "/domain-" + domain,
+                               realm=realm, provider_group=entry["name"])
+            changes.append(("modify", mo))
+
+    if prune:
+        for mo in snapshot.children(ext_dn, "AaaProviderGroup"):
+            if mo.name not in group_names:
+                changes.append(("delete", mo))
+        for mo in snapshot.children(ext_dn, provider_class_id):
+            if mo.name not in provider_names:
+                changes.append(("delete", mo))
+
+    for action, mo in changes:
+        if action == "delete":
+            handle.remove_mo(mo)
+        elif mo.get_class_id() == "AaaDomainAuth":
+            handle.set_mo(mo)
+        else:
+            handle.add_mo(mo, True)
+    if changes:
+        handle.commit()
+    return changes
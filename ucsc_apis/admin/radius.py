@@ -15,10 +15,13 @@
 This module performs the operation related to radius configuration.
 """
 from ucscsdk.ucscexception import UcscOperationError
-from ..common.utils import get_device_profile_dn
+from ..common.utils import get_device_profile_dn, get_mo, query_subtree, \
+    set_mo_changes
+from ..common.hooks import instrument
 ucsc_base_dn = get_device_profile_dn(name="default")
 
 
+@instrument
 def radius_provider_create(handle, name, order="lowest-available", key=None,
                            auth_port="1812", timeout="5", retries="1",
                            enc_key=None, descr=None, **kwargs):
@@ -66,13 +69,16 @@ def radius_provider_create(handle, name, order="lowest-available", key=None,
     return mo
 
 
-def radius_provider_get(handle, name):
+@instrument
+def radius_provider_get(handle, name, snapshot=None):
     """
     Gets radius provider
 
     Args:
         handle (UcscHandle)
         name (string): name
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
 
     Returns:
         AaaRadiusProvider: Managed Object OR None
@@ -82,16 +88,19 @@ def radius_provider_get(handle, name):
     """
 
     dn = ucsc_base_dn + "/radius-ext/provider-" + name
-    return handle.query_dn(dn)
+    return get_mo(handle, dn, snapshot)
 
 
-def radius_provider_exists(handle, name, **kwargs):
+@instrument
+def radius_provider_exists(handle, name, snapshot=None, **kwargs):
     """
     checks if radius provider exists
 
     Args:
         handle (UcscHandle)
         name (string): name
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
@@ -103,26 +112,30 @@ def radius_provider_exists(handle, name, **kwargs):
         radius_provider_exists(handle, name="test_radius_provider")
     """
 
-    mo = radius_provider_get(handle, name)
+    mo = radius_provider_get(handle, name, snapshot=snapshot)
     if not mo:
         return (False, None)
     mo_exists = mo.check_prop_match(**kwargs)
     return (mo_exists, mo if mo_exists else None)
 
 
-def radius_provider_modify(handle, name, **kwargs):
+@instrument
+def radius_provider_modify(handle, name, return_changes=False, **kwargs):
     """
     modifies a radius provider
 
     Args:
         handle (UcscHandle)
         name (string): name
+        return_changes (bool): also return the dict of the properties
+                               written, empty if nothing was written
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
 
     Returns:
         AaaRadiusProvider: Managed Object
+        OR (Managed Object, dict) if return_changes is True
 
     Raises:
         UcscOperationError: If AaaRadiusProvider is not present
@@ -136,12 +149,15 @@ def radius_provider_modify(handle, name, **kwargs):
         raise UcscOperationError("radius_provider_modify",
                                  "Radius Provider does not exist %s" % name)
 
-    mo.set_prop_multiple(**kwargs)
-    handle.set_mo(mo)
-    handle.commit()
+    changes = set_mo_changes(handle, mo, **kwargs)
+    if changes:
+        handle.commit()
+    if return_changes:
+        return (mo, changes)
     return mo
 
 
+@instrument
 def radius_provider_delete(handle, name):
     """
     deletes a radius provider
@@ -169,6 +185,7 @@ def radius_provider_delete(handle, name):
     handle.commit()
 
 
+@instrument
 def radius_provider_group_create(handle, name, descr=None, **kwargs):
     """
     Creates a radius provider group
@@ -200,13 +217,16 @@ def radius_provider_group_create(handle, name, descr=None, **kwargs):
     return mo
 
 
-def radius_provider_group_get(handle, name):
+@instrument
+def radius_provider_group_get(handle, name, snapshot=None):
     """
     Get radius provider group
 
     Args:
         handle (UcscHandle)
         name (string): name
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
 
     Returns:
         AaaProviderGroup: Managed Object OR None
@@ -216,16 +236,19 @@ def radius_provider_group_get(handle, name):
     """
 
     dn = ucsc_base_dn + "/radius-ext/providergroup-" + name
-    return handle.query_dn(dn)
+    return get_mo(handle, dn, snapshot)
 
 
-def radius_provider_group_exists(handle, name, **kwargs):
+@instrument
+def radius_provider_group_exists(handle, name, snapshot=None, **kwargs):
     """
     checks if radius provider group exists
 
     Args:
         handle (UcscHandle)
         name (string): name
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
@@ -237,13 +260,14 @@ def radius_provider_group_exists(handle, name, **kwargs):
         radius_provider_group_exists(handle, name="test_prov_grp")
     """
 
-    mo = radius_provider_group_get(handle, name)
+    mo = radius_provider_group_get(handle, name, snapshot=snapshot)
     if not mo:
         return (False, None)
     mo_exists = mo.check_prop_match(**kwargs)
     return (mo_exists, mo if mo_exists else None)
 
 
+@instrument
 def radius_provider_group_delete(handle, name):
     """
     deletes a radius provider group
@@ -271,6 +295,7 @@ def radius_provider_group_delete(handle, name):
     handle.commit()
 
 
+@instrument
 def radius_provider_group_add_provider(handle, group_name, name,
                                        order="lowest-available", descr=None,
                                        **kwargs):
@@ -323,7 +348,9 @@ def radius_provider_group_add_provider(handle, group_name, name,
     return mo
 
 
-def radius_provider_group_provider_get(handle, group_name, name):
+@instrument
+def radius_provider_group_provider_get(handle, group_name, name,
+                                       snapshot=None):
     """
     Gets provider  under a radius provider group
 
@@ -331,6 +358,8 @@ def radius_provider_group_provider_get(handle, group_name, name):
         handle (UcscHandle)
         group_name (string): group_name
         name (string): name
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
 
     Returns:
         AaaProviderRef: Managed Object OR None
@@ -345,16 +374,18 @@ def radius_provider_group_provider_get(handle, group_name, name):
     """
 
     group_dn = ucsc_base_dn + "/radius-ext/providergroup-" + group_name
-    group_mo = handle.query_dn(group_dn)
-    if not group_mo:
+    mos = query_subtree(handle, group_dn, snapshot)
+    if group_dn not in mos:
         raise UcscOperationError("radius_provider_group_provider_get",
                                  "Radius Provider Group does not exist.")
 
     provider_dn = group_dn + "/provider-ref-" + name
-    return handle.query_dn(provider_dn)
+    return mos.get(provider_dn)
 
 
-def radius_provider_group_provider_exists(handle, group_name, name, **kwargs):
+@instrument
+def radius_provider_group_provider_exists(handle, group_name, name,
+                                          snapshot=None, **kwargs):
     """
     checks if a provider exists under a radius provider group
 
@@ -362,6 +393,8 @@ def radius_provider_group_provider_exists(handle, group_name, name, **kwargs):
         handle (UcscHandle)
         group_name (string): group_name
         name (string): name
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
@@ -378,14 +411,17 @@ def radius_provider_group_provider_exists(handle, group_name, name, **kwargs):
                                     name="test_radius_provider")
     """
 
-    mo = radius_provider_group_provider_get(handle, group_name, name)
+    mo = radius_provider_group_provider_get(handle, group_name, name,
+                                            snapshot=snapshot)
     if not mo:
         return (False, None)
     mo_exists = mo.check_prop_match(**kwargs)
     return (mo_exists, mo if mo_exists else None)
 
 
-def radius_provider_group_modify_provider(handle, group_name, name, **kwargs):
+@instrument
+def radius_provider_group_modify_provider(handle, group_name, name,
+                                          return_changes=False, **kwargs):
     """
     modifies a provider to a radius provider group
 
@@ -393,12 +429,15 @@ def radius_provider_group_modify_provider(handle, group_name, name, **kwargs):
         handle (UcscHandle)
         group_name (string): group_name
         name (string): name
+        return_changes (bool): also return the dict of the properties
+                               written, empty if nothing was written
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
 
     Returns:
         AaaProviderRef: Managed Object
+        OR (Managed Object, dict) if return_changes is True
 
     Raises:
         UcscOperationError: If AaaProviderRef is not present
@@ -414,12 +453,15 @@ def radius_provider_group_modify_provider(handle, group_name, name, **kwargs):
         raise UcscOperationError("radius_provider_group_modify_provider",
                                  "Provider not available under group.")
 
-    mo.set_prop_multiple(**kwargs)
-    handle.set_mo(mo)
-    handle.commit()
+    changes = set_mo_changes(handle, mo, **kwargs)
+    if changes:
+        handle.commit()
+    if return_changes:
+        return (mo, changes)
     return mo
 
 
+@instrument
 def radius_provider_group_remove_provider(handle, group_name, name):
     """
     removes a provider from a radius provider group
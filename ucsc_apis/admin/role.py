@@ -15,10 +15,12 @@
 This module performs the operation related to role.
 """
 from ucscsdk.ucscexception import UcscOperationError
-from ..common.utils import get_device_profile_dn
+from ..common.utils import get_device_profile_dn, get_mo, set_mo_changes
+from ..common.hooks import instrument
 ucsc_base_dn = get_device_profile_dn(name="default")
 
 
+@instrument
 def role_create(handle, name, priv, descr=None, **kwargs):
     """
     creates a role
@@ -53,13 +55,16 @@ def role_create(handle, name, priv, descr=None, **kwargs):
     return mo
 
 
-def role_get(handle, name):
+@instrument
+def role_get(handle, name, snapshot=None):
     """
     Gets a role
 
     Args:
         handle (UcscHandle)
         name (string): role name
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
 
     Returns:
         AaaRole: Managed Object OR None
@@ -69,16 +74,19 @@ def role_get(handle, name):
     """
 
     dn = ucsc_base_dn + "/role-" + name
-    return handle.query_dn(dn)
+    return get_mo(handle, dn, snapshot)
 
 
-def role_exists(handle, name, **kwargs):
+@instrument
+def role_exists(handle, name, snapshot=None, **kwargs):
     """
     checks if a role exists
 
     Args:
         handle (UcscHandle)
         name (string): role name
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
@@ -90,26 +98,30 @@ def role_exists(handle, name, **kwargs):
         role_exists(handle, name="test_role", priv="read-only")
     """
 
-    mo = role_get(handle, name)
+    mo = role_get(handle, name, snapshot=snapshot)
     if not mo:
         return (False, None)
     mo_exists = mo.check_prop_match(**kwargs)
     return (mo_exists, mo if mo_exists else None)
 
 
-def role_modify(handle, name, **kwargs):
+@instrument
+def role_modify(handle, name, return_changes=False, **kwargs):
     """
     modifies role
 
     Args:
         handle (UcscHandle)
         name (string): role name
+        return_changes (bool): also return the dict of the properties
+                               written, empty if nothing was written
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
 
     Returns:
         AaaRole: Managed Object
+        OR (Managed Object, dict) if return_changes is True
 
     Raises:
         UcscOperationError: If AaaRole is not present
@@ -123,12 +135,15 @@ def role_modify(handle, name, **kwargs):
         raise UcscOperationError("role_modify",
                                  "Role does not exist")
 
-    mo.set_prop_multiple(**kwargs)
-    handle.set_mo(mo)
-    handle.commit()
+    changes = set_mo_changes(handle, mo, **kwargs)
+    if changes:
+        handle.commit()
+    if return_changes:
+        return (mo, changes)
     return mo
 
 
+@instrument
 def role_delete(handle, name):
     """
     deletes role
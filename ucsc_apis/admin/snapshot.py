@@ -0,0 +1,43 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module takes a snapshot of the admin configuration.
+"""
+from ..common.snapshot import mo_snapshot
+from ..common.utils import get_device_profile_dn
+from ..common.hooks import instrument
+ucsc_base_dn = get_device_profile_dn(name="default")
+
+
+@instrument
+def admin_snapshot(handle):
+    """
+    Downloads the whole default device profile in one hierarchical query.
+
+    The result can be passed as snapshot= to the *_get and *_exists
+    functions of ucsc_apis.admin, which then answer without a round trip.
+
+    Args:
+        handle (UcscHandle)
+
+    Returns:
+        MoSnapshot
+
+    Example:
+        snapshot = admin_snapshot(handle)
+        dns_server_exists(handle, "8.8.8.8", snapshot=snapshot)
+        user_role_exists(handle, user_name="test", name="admin",
+                         snapshot=snapshot)
+    """
+    return mo_snapshot(handle, ucsc_base_dn)
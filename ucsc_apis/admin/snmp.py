@@ -15,10 +15,12 @@
 This module performs the operation related to snmp server, user and traps.
 """
 from ucscsdk.ucscexception import UcscOperationError
-from ..common.utils import get_device_profile_dn
+from ..common.utils import get_device_profile_dn, get_mo, set_mo_changes
+from ..common.hooks import instrument
 ucsc_base_dn = get_device_profile_dn(name="default")
 
 
+@instrument
 def snmp_enable(handle, community=None, sys_contact=None, sys_location=None,
                 descr=None, **kwargs):
     """
@@ -72,6 +74,7 @@ def snmp_enable(handle, community=None, sys_contact=None, sys_location=None,
     return mo
 
 
+@instrument
 def snmp_disable(handle):
     """
     Disables SNMP.
@@ -103,6 +106,7 @@ def snmp_disable(handle):
     return mo
 
 
+@instrument
 def snmp_trap_add(handle, hostname, community, port="162", version="v2c",
                   notification_type="traps", v3_privilege="noauth", **kwargs):
     """
@@ -149,13 +153,16 @@ def snmp_trap_add(handle, hostname, community, port="162", version="v2c",
     return mo
 
 
-def snmp_trap_get(handle, hostname):
+@instrument
+def snmp_trap_get(handle, hostname, snapshot=None):
     """
     Gets snmp trap
 
     Args:
         handle (UcscHandle)
         hostname (string): ip address
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
 
     Returns:
         CommSnmpTrap: Managed Object OR None
@@ -166,16 +173,19 @@ def snmp_trap_get(handle, hostname):
     """
 
     dn = ucsc_base_dn + "/snmp-svc/snmp-trap" + hostname
-    return handle.query_dn(dn)
+    return get_mo(handle, dn, snapshot)
 
 
-def snmp_trap_exists(handle, hostname, **kwargs):
+@instrument
+def snmp_trap_exists(handle, hostname, snapshot=None, **kwargs):
     """
     checks if snmp trap exists
 
     Args:
         handle (UcscHandle)
         hostname (string): ip address
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
@@ -191,26 +201,30 @@ def snmp_trap_exists(handle, hostname, **kwargs):
 
     """
 
-    mo = snmp_trap_get(handle, hostname)
+    mo = snmp_trap_get(handle, hostname, snapshot=snapshot)
     if not mo:
         return (False, None)
     mo_exists = mo.check_prop_match(**kwargs)
     return (mo_exists, mo if mo_exists else None)
 
 
-def snmp_trap_modify(handle, hostname, **kwargs):
+@instrument
+def snmp_trap_modify(handle, hostname, return_changes=False, **kwargs):
     """
     Modifies snmp trap.
 
     Args:
         handle (UcscHandle)
         hostname (string): ip address
+        return_changes (bool): also return the dict of the properties
+                               written, empty if nothing was written
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
 
     Returns:
         CommSnmpTrap: Managed Object
+        OR (Managed Object, dict) if return_changes is True
 
     Raises:
         UcscOperationError: If CommSnmpTrap Mo is not present
@@ -229,12 +243,15 @@ def snmp_trap_modify(handle, hostname, **kwargs):
         raise UcscOperationError("snmp_trap_modify",
                                  "snmp trap MO is not available")
 
-    mo.set_prop_multiple(**kwargs)
-    handle.set_mo(mo)
-    handle.commit()
+    changes = set_mo_changes(handle, mo, **kwargs)
+    if changes:
+        handle.commit()
+    if return_changes:
+        return (mo, changes)
     return mo
 
 
+@instrument
 def snmp_trap_remove(handle, hostname):
     """
     Modifies snmp trap.
@@ -263,6 +280,7 @@ def snmp_trap_remove(handle, hostname):
     handle.commit()
 
 
+@instrument
 def snmp_user_add(handle, name, pwd, privpwd, auth="md5",
                   use_aes="no", descr=None, **kwargs):
     """
@@ -306,13 +324,16 @@ def snmp_user_add(handle, name, pwd, privpwd, auth="md5",
     return mo
 
 
-def snmp_user_get(handle, name):
+@instrument
+def snmp_user_get(handle, name, snapshot=None):
     """
     Gets snmp user.
 
     Args:
         handle (UcscHandle)
         name (string): snmp username
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
 
     Returns:
         CommSnmpUser: Managed Object OR None
@@ -323,16 +344,19 @@ def snmp_user_get(handle, name):
     """
 
     dn = ucsc_base_dn + "/snmp-svc/snmpv3-user-" + name
-    return handle.query_dn(dn)
+    return get_mo(handle, dn, snapshot)
 
 
-def snmp_user_exists(handle, name, **kwargs):
+@instrument
+def snmp_user_exists(handle, name, snapshot=None, **kwargs):
     """
     checks if snmp user exists.
 
     Args:
         handle (UcscHandle)
         name (string): snmp username
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
@@ -346,26 +370,30 @@ def snmp_user_exists(handle, name, **kwargs):
 
     """
 
-    mo = snmp_user_get(handle, name)
+    mo = snmp_user_get(handle, name, snapshot=snapshot)
     if not mo:
         return (False, None)
     mo_exists = mo.check_prop_match(**kwargs)
     return (mo_exists, mo if mo_exists else None)
 
 
-def snmp_user_modify(handle, name, **kwargs):
+@instrument
+def snmp_user_modify(handle, name, return_changes=False, **kwargs):
     """
     Modifies snmp user.
 
     Args:
         handle (UcscHandle)
         name (string): snmp username
+        return_changes (bool): also return the dict of the properties
+                               written, empty if nothing was written
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
 
     Returns:
         CommSnmpUser: Managed Object
+        OR (Managed Object, dict) if return_changes is True
 
     Raises:
         UcscOperationError: If CommSnmpUser Mo is not present
@@ -382,12 +410,15 @@ def snmp_user_modify(handle, name, **kwargs):
         raise UcscOperationError("snmp_user_modify",
                                  "snmp user MO is not available")
 
-    mo.set_prop_multiple(**kwargs)
-    handle.set_mo(mo)
-    handle.commit()
+    changes = set_mo_changes(handle, mo, **kwargs)
+    if changes:
+        handle.commit()
+    if return_changes:
+        return (mo, changes)
     return mo
 
 
+@instrument
 def snmp_user_remove(handle, name):
     """
     removes snmp user.
@@ -15,9 +15,11 @@ This module performs the operation related to syslog.
 """
 from ucscsdk.ucscexception import UcscOperationError
 from ..common.utils import get_device_profile_dn
+from ..common.hooks import instrument
 ucsc_base_dn = get_device_profile_dn(name="default")
 
 
+@instrument
 def syslog_local_console_enable(handle, severity="emergencies", **kwargs):
     """
     This method enables system logs on local console.
@@ -58,6 +60,7 @@ def syslog_local_console_enable(handle, severity="emergencies", **kwargs):
     return mo
 
 
+@instrument
 def syslog_local_console_disable(handle):
     """
     This method disables system logs on local console.
@@ -90,6 +93,7 @@ def syslog_local_console_disable(handle):
     return mo
 
 
+@instrument
 def syslog_local_monitor_enable(handle, severity="emergencies", **kwargs):
     """
     This method enables logs on local monitor.
@@ -131,6 +135,7 @@ def syslog_local_monitor_enable(handle, severity="emergencies", **kwargs):
     return mo
 
 
+@instrument
 def syslog_local_monitor_disable(handle):
     """
     This method disables logs on local monitor.
@@ -164,6 +169,7 @@ def syslog_local_monitor_disable(handle):
     return mo
 
 
+@instrument
 def syslog_local_file_enable(handle, name=None, severity="emergencies",
                              size="40000", **kwargs):
     """
@@ -212,6 +218,7 @@ def syslog_local_file_enable(handle, name=None, severity="emergencies",
     return mo
 
 
+@instrument
 def syslog_local_file_disable(handle):
     """
     This method disables System Logs on local file storage.
@@ -243,6 +250,7 @@ def syslog_local_file_disable(handle):
     return mo
 
 
+@instrument
 def syslog_remote_enable(handle, name, hostname="none",
                          severity="emergencies", forwarding_facility="local0",
                          **kwargs):
@@ -294,6 +302,7 @@ def syslog_remote_enable(handle, name, hostname="none",
     return mo
 
 
+@instrument
 def syslog_remote_disable(handle, name):
     """
     This method enables System Logs on remote server.
@@ -329,6 +338,7 @@ def syslog_remote_disable(handle, name):
     return mo
 
 
+@instrument
 def syslog_source(handle, faults=None, audits=None, events=None, **kwargs):
     """
     This method configures Type of System Logs.
@@ -15,10 +15,13 @@
 This module performs the operation related to dns server management.
 """
 from ucscsdk.ucscexception import UcscOperationError
-from ..common.utils import get_device_profile_dn
+from ..common.utils import get_device_profile_dn, get_mo, query_subtree, \
+    set_mo_changes
+from ..common.hooks import instrument
 ucsc_base_dn = get_device_profile_dn(name="default")
 
 
+@instrument
 def tacacsplus_provider_create(handle, name, order="lowest-available",
                                key=None, port="49", timeout="5", retries="1",
                                enc_key=None, descr=None, **kwargs):
@@ -67,13 +70,16 @@ def tacacsplus_provider_create(handle, name, order="lowest-available",
     return mo
 
 
-def tacacsplus_provider_get(handle, name):
+@instrument
+def tacacsplus_provider_get(handle, name, snapshot=None):
     """
     Gets tacacsplus provider
 
     Args:
         handle (UcscHandle)
         name (string): name of tacacsplus provider
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
 
     Returns:
         AaaTacacsPlusProvider: Managed Object OR None
@@ -83,16 +89,19 @@ def tacacsplus_provider_get(handle, name):
     """
 
     dn = ucsc_base_dn + "/tacacs-ext/provider-" + name
-    return handle.query_dn(dn)
+    return get_mo(handle, dn, snapshot)
 
 
-def tacacsplus_provider_exists(handle, name, **kwargs):
+@instrument
+def tacacsplus_provider_exists(handle, name, snapshot=None, **kwargs):
     """
     checks if a tacacsplus provider exists
 
     Args:
         handle (UcscHandle)
         name (string): name of tacacsplus provider
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
@@ -103,26 +112,30 @@ def tacacsplus_provider_exists(handle, name, **kwargs):
         tacacsplus_provider_exists(handle, name="test_tacac_prov", port="320")
     """
 
-    mo = tacacsplus_provider_get(handle, name)
+    mo = tacacsplus_provider_get(handle, name, snapshot=snapshot)
     if not mo:
         return (False, None)
     mo_exists = mo.check_prop_match(**kwargs)
     return (mo_exists, mo if mo_exists else None)
 
 
-def tacacsplus_provider_modify(handle, name, **kwargs):
+@instrument
+def tacacsplus_provider_modify(handle, name, return_changes=False, **kwargs):
     """
     modifies a tacacsplus provider
 
     Args:
         handle (UcscHandle)
         name (string): name of tacacsplus provider
+        return_changes (bool): also return the dict of the properties
+                               written, empty if nothing was written
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
 
     Returns:
         AaaTacacsPlusProvider: Managed Object
+        OR (Managed Object, dict) if return_changes is True
 
     Raises:
         UcscOperationError: If AaaTacacsPlusProvider is not present
@@ -137,12 +150,15 @@ def tacacsplus_provider_modify(handle, name, **kwargs):
                 "tacacsplus_provider_modify",
                 "TacacsPlus Provider '%s' does not exist" % name)
 
-    mo.set_prop_multiple(**kwargs)
-    handle.set_mo(mo)
-    handle.commit()
+    changes = set_mo_changes(handle, mo, **kwargs)
+    if changes:
+        handle.commit()
+    if return_changes:
+        return (mo, changes)
     return mo
 
 
+@instrument
 def tacacsplus_provider_delete(handle, name):
     """
     deletes a tacacsplus provider
@@ -170,6 +186,7 @@ def tacacsplus_provider_delete(handle, name):
     handle.commit()
 
 
+@instrument
 def tacacsplus_provider_group_create(handle, name, descr=None, **kwargs):
     """
     Creates a tacacsplus provider group
@@ -201,13 +218,16 @@ def tacacsplus_provider_group_create(handle, name, descr=None, **kwargs):
     return mo
 
 
-def tacacsplus_provider_group_get(handle, name):
+@instrument
+def tacacsplus_provider_group_get(handle, name, snapshot=None):
     """
     Gets tacacsplus provider group
 
     Args:
         handle (UcscHandle)
         name (string): name of tacacsplus provider group
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
 
     Returns:
         AaaTacacsPlusProvider: Managed Object OR None
@@ -217,16 +237,19 @@ def tacacsplus_provider_group_get(handle, name):
     """
 
     dn = ucsc_base_dn + "/tacacs-ext/providergroup-" + name
-    return handle.query_dn(dn)
+    return get_mo(handle, dn, snapshot)
 
 
-def tacacsplus_provider_group_exists(handle, name, **kwargs):
+@instrument
+def tacacsplus_provider_group_exists(handle, name, snapshot=None, **kwargs):
     """
     checks if a tacacsplus provider group exists
 
     Args:
         handle (UcscHandle)
         name (string): name of tacacsplus provider group
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
@@ -238,13 +261,14 @@ def tacacsplus_provider_group_exists(handle, name, **kwargs):
         tacacsplus_provider_group_exists(handle, name="test_prov_grp")
     """
 
-    mo = tacacsplus_provider_group_get(handle, name)
+    mo = tacacsplus_provider_group_get(handle, name, snapshot=snapshot)
     if not mo:
         return (False, None)
     mo_exists = mo.check_prop_match(**kwargs)
     return (mo_exists, mo if mo_exists else None)
 
 
+@instrument
 def tacacsplus_provider_group_delete(handle, name):
     """
     deletes a tacacsplus provider group
@@ -272,6 +296,7 @@ def tacacsplus_provider_group_delete(handle, name):
     handle.commit()
 
 
+@instrument
 def tacacsplus_provider_group_provider_add(handle, group_name, name,
                                            order="lowest-available",
                                            descr=None, **kwargs):
@@ -325,7 +350,9 @@ def tacacsplus_provider_group_provider_add(handle, group_name, name,
     return mo
 
 
-def tacacsplus_provider_group_provider_get(handle, group_name, name):
+@instrument
+def tacacsplus_provider_group_provider_get(handle, group_name, name,
+                                           snapshot=None):
     """
     checks if a tacacsplus provider added to a tacacsplus provider  group
 
@@ -333,6 +360,8 @@ def tacacsplus_provider_group_provider_get(handle, group_name, name):
         handle (UcscHandle)
         group_name (string): name of tacacsplus provider group
         name (string): name of tacacsplus provider
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
 
     Returns:
         AaaProviderRef: Managed Object OR None
@@ -347,17 +376,18 @@ def tacacsplus_provider_group_provider_get(handle, group_name, name):
     """
 
     group_dn = ucsc_base_dn + "/tacacs-ext/providergroup-" + group_name
-    group_mo = handle.query_dn(group_dn)
-    if not group_mo:
+    mos = query_subtree(handle, group_dn, snapshot)
+    if group_dn not in mos:
         raise UcscOperationError("tacacsplus_provider_group_provider_get",
                                  "TacacsPlus Provider Group does not exist.")
 
     provider_dn = group_dn + "/provider-ref-" + name
-    return handle.query_dn(provider_dn)
+    return mos.get(provider_dn)
 
 
+@instrument
 def tacacsplus_provider_group_provider_exists(handle, group_name, name,
-                                              **kwargs):
+                                              snapshot=None, **kwargs):
     """
     checks if a tacacsplus provider added to a tacacsplus provider  group
 
@@ -365,6 +395,8 @@ def tacacsplus_provider_group_provider_exists(handle, group_name, name,
         handle (UcscHandle)
         group_name (string): name of tacacsplus provider group
         name (string): name of tacacsplus provider
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
@@ -381,15 +413,17 @@ def tacacsplus_provider_group_provider_exists(handle, group_name, name,
                                     name="test_tacac_prov")
     """
 
-    mo = tacacsplus_provider_group_provider_get(handle, group_name, name)
+    mo = tacacsplus_provider_group_provider_get(handle, group_name, name,
+                                                snapshot=snapshot)
     if not mo:
         return (False, None)
     mo_exists = mo.check_prop_match(**kwargs)
     return (mo_exists, mo if mo_exists else None)
 
 
+@instrument
 def tacacsplus_provider_group_provider_modify(handle, group_name, name,
-                                              **kwargs):
+                                              return_changes=False, **kwargs):
     """
     modifies a tacacsplus provider added to a tacacsplus provider  group
 
@@ -397,12 +431,15 @@ def tacacsplus_provider_group_provider_modify(handle, group_name, name,
         handle (UcscHandle)
         group_name (string): name of tacacsplus provider group
         name (string): name of tacacsplus provider
+        return_changes (bool): also return the dict of the properties
+                               written, empty if nothing was written
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
 
     Returns:
         AaaProviderRef: Managed Object
+        OR (Managed Object, dict) if return_changes is True
 
     Raises:
         UcscOperationError: If AaaProviderRef is not present
@@ -418,12 +455,15 @@ def tacacsplus_provider_group_provider_modify(handle, group_name, name,
         raise UcscOperationError("tacacsplus_provider_group_provider_modify",
                                  "Provider not available under group.")
 
-    mo.set_prop_multiple(**kwargs)
-    handle.set_mo(mo)
-    handle.commit()
+    changes = set_mo_changes(handle, mo, **kwargs)
+    if changes:
+        handle.commit()
+    if return_changes:
+        return (mo, changes)
     return mo
 
 
+@instrument
 def tacacsplus_provider_group_provider_remove(handle, group_name, name):
     """
     removes a tacacsplus provider from a tacacsplus provider  group
@@ -11,10 +11,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 from ucscsdk.ucscexception import UcscOperationError
-from ..common.utils import get_device_profile_dn
+from ..common.utils import get_device_profile_dn, get_mo
+from ..common.hooks import instrument
 ucsc_base_dn = get_device_profile_dn(name="default")
 
 
+@instrument
 def time_zone_set(handle, timezone, **kwargs):
     """
     This method sets the timezone of the UCS Central.
@@ -55,6 +57,7 @@ def time_zone_set(handle, timezone, **kwargs):
     return mo
 
 
+@instrument
 def ntp_server_add(handle, name, descr=None, **kwargs):
     """
     Adds NTP server using IP address.
@@ -87,13 +90,16 @@ def ntp_server_add(handle, name, descr=None, **kwargs):
     return mo
 
 
-def ntp_server_get(handle, name):
+@instrument
+def ntp_server_get(handle, name, snapshot=None):
     """
     Gets ntp server
 
     Args:
         handle (UcscHandle)
         name (string): NTP server IP address or Name
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
 
     Returns:
         CommNtpProvider: Managed object OR None
@@ -103,16 +109,19 @@ def ntp_server_get(handle, name):
     """
 
     dn = ucsc_base_dn + "/datetime-svc/ntp-" + name
-    return handle.query_dn(dn)
+    return get_mo(handle, dn, snapshot)
 
 
-def ntp_server_exists(handle, name, **kwargs):
+@instrument
+def ntp_server_exists(handle, name, snapshot=None, **kwargs):
     """
     checks if ntp server exists.
 
     Args:
         handle (UcscHandle)
         name (string): NTP server IP address or Name
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
@@ -124,13 +133,14 @@ def ntp_server_exists(handle, name, **kwargs):
         ntp_server_exists(handle, "72.163.128.140", descr="Default NTP")
     """
 
-    mo = ntp_server_get(handle, name)
+    mo = ntp_server_get(handle, name, snapshot=snapshot)
     if not mo:
         return (False, None)
     mo_exists = mo.check_prop_match(**kwargs)
     return (mo_exists, mo if mo_exists else None)
 
 
+@instrument
 def ntp_server_remove(handle, name):
     """
     Removes the NTP server.
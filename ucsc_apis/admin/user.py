@@ -14,11 +14,16 @@
 """
 This module performs the operation related to user.
 """
+import csv
+import json
+
 from ucscsdk.ucscexception import UcscOperationError
-from ..common.utils import get_device_profile_dn
+from ..common.utils import get_device_profile_dn, get_mo, set_mo_changes
+from ..common.hooks import instrument
 ucsc_base_dn = get_device_profile_dn(name="default")
 
 
+@instrument
 def user_create(handle, name, pwd, first_name=None, last_name=None, descr=None,
                 clear_pwd_history="no", phone=None, email=None, expires="no",
                 pwd_life_time="no-password-expire", expiration="never",
@@ -86,13 +91,16 @@ def user_create(handle, name, pwd, first_name=None, last_name=None, descr=None,
     return user_mo
 
 
-def user_get(handle, name):
+@instrument
+def user_get(handle, name, snapshot=None):
     """
     Gets user
 
     Args:
         handle (UcscHandle)
         name (string): name
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
 
     Returns:
         AaaUser: Managed Object OR None
@@ -102,16 +110,19 @@ def user_get(handle, name):
     """
 
     dn = ucsc_base_dn + "/user-" + name
-    return handle.query_dn(dn)
+    return get_mo(handle, dn, snapshot)
 
 
-def user_exists(handle, name, **kwargs):
+@instrument
+def user_exists(handle, name, snapshot=None, **kwargs):
     """
     checks if user exists
 
     Args:
         handle (UcscHandle)
         name (string): name
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
@@ -129,26 +140,30 @@ def user_exists(handle, name, **kwargs):
                   account_status="active")
     """
 
-    mo = user_get(handle, name)
+    mo = user_get(handle, name, snapshot=snapshot)
     if not mo:
         return (False, None)
     mo_exists = mo.check_prop_match(**kwargs)
     return (mo_exists, mo if mo_exists else None)
 
 
-def user_modify(handle, name, **kwargs):
+@instrument
+def user_modify(handle, name, return_changes=False, **kwargs):
     """
     modifies user
 
     Args:
         handle (UcscHandle)
         name (string): name
+        return_changes (bool): also return the dict of the properties
+                               written, empty if nothing was written
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
 
     Returns:
         AaaUser: Managed Object
+        OR (Managed Object, dict) if return_changes is True
 
     Raises:
         UcscOperationError: If AaaUser is not present
@@ -168,12 +183,15 @@ def user_modify(handle, name, **kwargs):
         raise UcscOperationError("user_modify",
                                  "User does not exist.")
 
-    mo.set_prop_multiple(**kwargs)
-    handle.set_mo(mo)
-    handle.commit()
+    changes = set_mo_changes(handle, mo, **kwargs)
+    if changes:
+        handle.commit()
+    if return_changes:
+        return (mo, changes)
     return mo
 
 
+@instrument
 def user_delete(handle, name):
     """
     deletes user
@@ -202,6 +220,7 @@ def user_delete(handle, name):
     handle.commit()
 
 
+@instrument
 def user_role_add(handle, user_name, name, descr=None, **kwargs):
     """
     Adds role to an user
@@ -241,7 +260,8 @@ def user_role_add(handle, user_name, name, descr=None, **kwargs):
     return mo
 
 
-def user_role_get(handle, user_name, name):
+@instrument
+def user_role_get(handle, user_name, name, snapshot=None):
     """
     Gets role for the user
 
@@ -249,6 +269,8 @@ def user_role_get(handle, user_name, name):
         handle (UcscHandle)
         user_name (string): username
         name (string): rolename
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
 
     Returns:
         AaaUserRole: Managed object OR None
@@ -259,10 +281,11 @@ def user_role_get(handle, user_name, name):
 
     user_dn = ucsc_base_dn + "/user-" + user_name
     dn = user_dn + "/role-" + name
-    return handle.query_dn(dn)
+    return get_mo(handle, dn, snapshot)
 
 
-def user_role_exists(handle, user_name, name, **kwargs):
+@instrument
+def user_role_exists(handle, user_name, name, snapshot=None, **kwargs):
     """
     check if role is already added to user
 
@@ -270,6 +293,8 @@ def user_role_exists(handle, user_name, name, **kwargs):
         handle (UcscHandle)
         user_name (string): username
         name (string): rolename
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
@@ -281,13 +306,14 @@ def user_role_exists(handle, user_name, name, **kwargs):
         user_role_exists(handle, user_name="test", name="admin")
     """
 
-    mo = user_role_get(handle, user_name, name)
+    mo = user_role_get(handle, user_name, name, snapshot=snapshot)
     if not mo:
         return (False, None)
     mo_exists = mo.check_prop_match(**kwargs)
     return (mo_exists, mo if mo_exists else None)
 
 
+@instrument
 def user_role_remove(handle, user_name, name):
     """
     Remove role from user
@@ -316,6 +342,7 @@ def user_role_remove(handle, user_name, name):
     handle.commit()
 
 
+@instrument
 def user_locale_add(handle, user_name, name, descr=None, **kwargs):
     """
     Adds locale to user
@@ -355,7 +382,8 @@ def user_locale_add(handle, user_name, name, descr=None, **kwargs):
     return mo
 
 
-def user_locale_get(handle, user_name, name):
+@instrument
+def user_locale_get(handle, user_name, name, snapshot=None):
     """
     Gets locale for the user
 
@@ -363,6 +391,8 @@ def user_locale_get(handle, user_name, name):
         handle (UcscHandle)
         user_name (string): username
         name (string): locale name
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
 
     Returns:
         AaaUserLocale: Managed Object OR None
@@ -373,10 +403,11 @@ def user_locale_get(handle, user_name, name):
 
     user_dn = ucsc_base_dn + "/user-" + user_name
     dn = user_dn + "/locale-" + name
-    return handle.query_dn(dn)
+    return get_mo(handle, dn, snapshot)
 
 
-def user_locale_exists(handle, user_name, name, **kwargs):
+@instrument
+def user_locale_exists(handle, user_name, name, snapshot=None, **kwargs):
     """
     check if locale already added to user
 
@@ -384,6 +415,8 @@ def user_locale_exists(handle, user_name, name, **kwargs):
         handle (UcscHandle)
         user_name (string): username
         name (string): locale name
+        snapshot (MoSnapshot): snapshot from admin_snapshot(), answers
+                               without a round trip when given
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
@@ -395,13 +428,14 @@ def user_locale_exists(handle, user_name, name, **kwargs):
         user_locale_exists(handle, user_name="test", name="testlocale")
     """
 
-    mo = user_locale_get(handle, user_name, name)
+    mo = user_locale_get(handle, user_name, name, snapshot=snapshot)
     if not mo:
         return (False, None)
     mo_exists = mo.check_prop_match(**kwargs)
     return (mo_exists, mo if mo_exists else None)
 
 
+@instrument
 def user_locale_remove(handle, user_name, name):
     """
     Remove locale from user
@@ -430,6 +464,7 @@ def user_locale_remove(handle, user_name, name):
     handle.commit()
 
 
+@instrument
 def password_strength_check(handle, descr=None, **kwargs):
     """
     Check password strength for locally authenticated user
@@ -458,6 +493,7 @@ def password_strength_check(handle, descr=None, **kwargs):
     return mo
 
 
+@instrument
 def password_strength_uncheck(handle):
     """
     check or un-check password strength for locally authenticated user
@@ -479,11 +515,12 @@ def password_strength_uncheck(handle):
     return mo
 
 
+@instrument
 def password_profile_modify(handle, change_interval=None,
                             no_change_interval=None,
                             change_during_interval=None, change_count=None,
                             history_count=None, expiration_warn_time=None,
-                            descr=None, **kwargs):
+                            descr=None, return_changes=False, **kwargs):
     """
     Modify password profile of locally authenticated user
 
@@ -496,11 +533,14 @@ def password_profile_modify(handle, change_interval=None,
         history_count (string): history count
         expiration_warn_time(string): expiration warn time
         descr (string): description
+        return_changes (bool): also return the dict of the properties
+                               written, empty if nothing was written
         **kwargs: Any additional key-value pair of managed object(MO)'s
                   property and value, which are not part of regular args.
                   This should be used for future version compatibility.
     Returns:
         AaaPwdProfile: Managed Object
+        OR (Managed Object, dict) if return_changes is True
 
     Raises:
         UcscOperationError: If AaaPwdProfile is not present
@@ -524,9 +564,198 @@ def password_profile_modify(handle, change_interval=None,
             'descr': descr
             }
 
-    mo.set_prop_multiple(**args)
-    mo.set_prop_multiple(**kwargs)
-
-    handle.set_mo(mo)
-    handle.commit()
+    args.update(kwargs)
+    changes = set_mo_changes(handle, mo, **args)
+    if changes:
+        handle.commit()
+    if return_changes:
+        return (mo, changes)
     return mo
+
+
+def _split_names(value):
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(name) for name in value if name]
+    return [name.strip() for name in str(value).replace(";", ",").split(",")
+            if name.strip()]
+
+
+def _json_records(f):
+    """
+    Reads a JSON list of records, or one JSON record per line
+    """
+    head = f.read(1)
+    while head and head.isspace():
+        head = f.read(1)
+    if head == "[":
+        for record in json.loads(head + f.read()):
+            yield record
+        return
+    line = head + f.readline()
+    while line:
+        if line.strip():
+            yield json.loads(line)
+        line = f.readline()
+
+
+def users_load(source, fmt=None):
+    """
+    Streams user records from a CSV or JSON file
+
+    CSV files have a header row naming the AaaUser properties, e.g.
+    "name,pwd,first_name,email,roles,locales". JSON files hold either a
+    list of records or one record per line. The "roles" and "locales" of
+    a record are lists, or strings separated by "," or ";".
+
+    Args:
+        source (string or file): path or open file
+        fmt (string): "csv" or "json", guessed from the file extension if
+                      not given
+
+    Returns:
+        Generator of dict
+    """
+    if fmt is None:
+        path = source if isinstance(source, str) else \
+            getattr(source, "name", "")
+        fmt = "csv" if str(path).lower().endswith(".csv") else "json"
+    if fmt not in ("csv", "json"):
+        raise UcscOperationError("users_load",
+                                 "Unknown record format '%s'" % fmt)
+
+    f = open(source) if isinstance(source, str) else source
+    try:
+        if fmt == "csv":
+            for row in csv.DictReader(f):
+                yield dict((key.strip(), value) for key, value in row.items()
+                           if key and value not in (None, ""))
+        else:
+            for record in _json_records(f):
+                yield record
+    finally:
+        if f is not source:
+            f.close()
+
+
+def _user_build(record):
+    """
+    Builds an AaaUser along with its AaaUserRole and AaaUserLocale children
+    """
+    from ucscsdk.mometa.aaa.AaaUser import AaaUser
+    from ucscsdk.mometa.aaa.AaaUserRole import AaaUserRole
+    from ucscsdk.mometa.aaa.AaaUserLocale import AaaUserLocale
+
+    if not isinstance(record, dict):
+        raise UcscOperationError("users_bulk_apply",
+                                 "User record %r is not a dict" % (record,))
+    props = dict(record)
+    name = props.pop("name", None)
+    if not name:
+        raise UcscOperationError("users_bulk_apply",
+                                 "User record is missing 'name'")
+    roles = _split_names(props.pop("roles", "read-only"))
+    locales = _split_names(props.pop("locales", None))
+    unknown = sorted(prop for prop in props
+                     if prop not in AaaUser.prop_meta)
+    if unknown:
+        raise UcscOperationError("users_bulk_apply",
+                                 "Unknown user properties: %s"
+                                 % ", ".join(unknown))
+
+    user_mo = AaaUser(parent_mo_or_dn=ucsc_base_dn, name=name)
+    user_mo.set_prop_multiple(**dict((prop, str(value))
+                                     for prop, value in props.items()))
+    for role in roles:
+        AaaUserRole(parent_mo_or_dn=user_mo, name=role)
+    for locale in locales:
+        AaaUserLocale(parent_mo_or_dn=user_mo, name=locale)
+    return user_mo
+
+
+def _users_commit(handle, chunk, results):
+    """
+    Commits a chunk of (result index, AaaUser), falling back to one commit
+    per user when the chunk fails, and records the failures in results
+    """
+    for index, mo in chunk:
+        handle.add_mo(mo, modify_present=True)
+    try:
+        handle.commit()
+        return
+    except Exception as e:
+        if len(chunk) == 1:
+            index, mo = chunk[0]
+            results[index] = (mo.name, None, e)
+            return
+
+    for index, mo in chunk:
+        handle.add_mo(mo, modify_present=True)
+        try:
+            handle.commit()
+        except Exception as e:
+            results[index] = (mo.name, None, e)
+
+
+@instrument
+def users_bulk_apply(handle, records, fmt=None, chunk_size=100):
+    """
+    Creates or updates users, along with their roles and locales, in
+    commits of at most chunk_size users each
+
+    Each record is a dict of AaaUser properties, e.g. "name", "pwd",
+    "first_name" or "email", plus "roles" (read-only by default) and
+    "locales". Every user is built locally with all its AaaUserRole and
+    AaaUserLocale children under deviceprofile-default, without any query.
+    Roles and locales the user already has are kept.
+
+    A record which cannot be built, e.g. not a dict or with a property
+    value AaaUser rejects, is reported and skipped. When the commit of a
+    chunk fails, its users are committed one by one, so that only the
+    failing records are reported and the others applied.
+
+    Args:
+        handle (UcscHandle)
+        records (iterable, string or file): dicts, or the path or open
+                  file of a CSV or JSON file of records, see users_load()
+        fmt (string): "csv" or "json", format of a records file
+        chunk_size (int): maximum number of users per commit
+
+    Returns:
+        List of (name, AaaUser or None, Exception or None), in record order
+
+    Raises:
+        UcscOperationError: If chunk_size is not a positive integer
+
+    Example:
+        results = users_bulk_apply(handle, "operators.csv")
+        failed = [(name, error) for name, mo, error in results if error]
+
+        users_bulk_apply(handle, [{"name": "jdoe", "pwd": "p@ssw0rd",
+                                   "roles": ["operations", "read-only"],
+                                   "locales": "emea"}])
+    """
+    if chunk_size < 1:
+        raise UcscOperationError("users_bulk_apply",
+                                 "chunk_size must be a positive integer")
+    if isinstance(records, str) or hasattr(records, "read"):
+        records = users_load(records, fmt)
+
+    results = []
+    chunk = []
+    for record in records:
+        try:
+            mo = _user_build(record)
+        except (UcscOperationError, ValueError, TypeError) as e:
+            name = record.get("name") if isinstance(record, dict) else None
+            results.append((name, None, e))
+            continue
+        results.append((mo.name, mo, None))
+        chunk.append((len(results) - 1, mo))
+        if len(chunk) == chunk_size:
+            _users_commit(handle, chunk, results)
+            chunk = []
+    if chunk:
+        _users_commit(handle, chunk, results)
+    return results
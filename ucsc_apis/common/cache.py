@@ -0,0 +1,204 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module provides an opt-in, per-handle read-through cache of managed
+objects for the ucsc_apis.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+_patched = ("query_dn", "add_mo", "set_mo", "remove_mo")
+
+
+class MoCache(object):
+    """
+    LRU cache of managed objects keyed by dn, with a time to live.
+
+    Misses are cached as well, so that repeated exists checks of an absent
+    object do not go to the server either.
+
+    Args:
+        ttl (int or float): seconds after which an entry expires
+        max_size (int): maximum number of entries, least recently used
+                        entries are evicted first
+    """
+
+    def __init__(self, ttl=60, max_size=1024):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, dn):
+        """
+        Looks up a dn
+
+        Returns:
+            (True/False, MO/None): whether the dn is cached and the cached MO
+        """
+        with self._lock:
+            entry = self._entries.pop(dn, None)
+            if entry is None or entry[0] < time.time():
+                self.misses += 1
+                return (False, None)
+            self._entries[dn] = entry
+            self.hits += 1
+            return (True, entry[1])
+
+    def put(self, dn, mo):
+        """
+        Caches the MO, or the absence of an MO if mo is None, for dn
+        """
+        with self._lock:
+            self._entries.pop(dn, None)
+            self._entries[dn] = (time.time() + self.ttl, mo)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, dn):
+        """
+        Drops the entries for dn and its descendants
+        """
+        prefix = dn + "/"
+        with self._lock:
+            for cached_dn in list(self._entries):
+                if cached_dn == dn or cached_dn.startswith(prefix):
+                    del self._entries[cached_dn]
+
+    def clear(self):
+        """
+        Drops all the entries
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+def cache_get(handle):
+    """
+    Gets the cache attached to the handle
+
+    Args:
+        handle (UcscHandle)
+
+    Returns:
+        MoCache OR None
+    """
+    return getattr(handle, "_ucsc_apis_cache", None)
+
+
+def cache_enable(handle, ttl=60, max_size=1024):
+    """
+    Attaches a read-through cache of managed objects to the handle.
+
+    Non-hierarchical query_dn calls are served from the cache while the
+    entry is fresh, and the objects returned by hierarchical query_dn calls
+    are cached as they pass through. Every add_mo, set_mo and remove_mo on
+    the handle invalidates the cached entries for the dn and everything
+    below it, so the ucsc_apis functions never read back their own stale
+    writes while parents such as org-root stay cached. Changes made by
+    other clients are only seen once the entry expires.
+
+    Enable the cache outside of any transaction() scope on the handle.
+
+    Args:
+        handle (UcscHandle)
+        ttl (int or float): seconds after which an entry expires
+        max_size (int): maximum number of entries
+
+    Returns:
+        MoCache
+
+    Example:
+        cache = cache_enable(handle, ttl=300)
+        ldap_provider_create(handle, name="ldap1")
+        ldap_provider_create(handle, name="ldap2")
+        print(cache.hits, cache.misses)
+    """
+    if cache_get(handle) is not None:
+        cache_disable(handle)
+
+    cache = MoCache(ttl=ttl, max_size=max_size)
+    saved = dict((attr, handle.__dict__[attr])
+                 for attr in _patched if attr in handle.__dict__)
+    real_query_dn = handle.query_dn
+    real_add_mo = handle.add_mo
+    real_set_mo = handle.set_mo
+    real_remove_mo = handle.remove_mo
+
+    def query_dn(dn, hierarchy=False, need_response=False,
+                 dme="central-mgr"):
+        if need_response:
+            return real_query_dn(dn, hierarchy=hierarchy,
+                                 need_response=need_response, dme=dme)
+        if hierarchy:
+            mos = real_query_dn(dn, hierarchy=hierarchy, dme=dme)
+            for mo in mos or []:
+                cache.put(mo.dn, mo)
+            return mos
+
+        cached, mo = cache.get(dn)
+        if cached:
+            return mo
+        mo = real_query_dn(dn, dme=dme)
+        cache.put(dn, mo)
+        return mo
+
+    def add_mo(mo, modify_present=False, tag=None):
+        cache.invalidate(mo.dn)
+        return real_add_mo(mo, modify_present=modify_present, tag=tag)
+
+    def set_mo(mo, tag=None):
+        cache.invalidate(mo.dn)
+        return real_set_mo(mo, tag=tag)
+
+    def remove_mo(mo, tag=None):
+        cache.invalidate(mo.dn)
+        return real_remove_mo(mo, tag=tag)
+
+    handle.query_dn = query_dn
+    handle.add_mo = add_mo
+    handle.set_mo = set_mo
+    handle.remove_mo = remove_mo
+    handle._ucsc_apis_cache = cache
+    handle._ucsc_apis_cache_saved = saved
+    return cache
+
+
+def cache_disable(handle):
+    """
+    Detaches the cache from the handle
+
+    Args:
+        handle (UcscHandle)
+
+    Returns:
+        None
+    """
+    if cache_get(handle) is None:
+        return
+
+    saved = handle._ucsc_apis_cache_saved
+    for attr in _patched:
+        if attr in saved:
+            handle.__dict__[attr] = saved[attr]
+        else:
+            handle.__dict__.pop(attr, None)
+    del handle._ucsc_apis_cache
+    del handle._ucsc_apis_cache_saved
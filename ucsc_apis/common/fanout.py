@@ -0,0 +1,140 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module runs one ucsc_apis operation across many domain groups or orgs
+on a bounded pool of worker threads.
+"""
+import threading
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+
+def isolate_session(handle):
+    """
+    Gives the handle a request lock of its own.
+
+    ucscsdk holds a process-wide lock for the whole round trip of every
+    request, so the requests of all the handles of a process are
+    serialized. The requests of an isolated handle only wait for those of
+    the same handle, and overlap those of other handles. Isolate a handle
+    before its login to have the login overlap as well.
+
+    Args:
+        handle (UcscHandle)
+
+    Returns:
+        UcscHandle
+
+    Example:
+        handle = isolate_session(UcscHandle("10.10.10.10", "admin",
+                                            "password"))
+        handle.login()
+    """
+    lock = threading.Lock()
+
+    def acquire(elem):
+        if elem.tag != "aaaLogout":
+            lock.acquire()
+
+    def release(elem):
+        if elem.tag != "aaaLogout":
+            lock.release()
+
+    handle._tx_lock_acquire_conditional = acquire
+    handle._tx_lock_release_conditional = release
+    return handle
+
+
+def fanout(handle_factory, operation, targets, workers=8):
+    """
+    Runs operation(handle, target) for every target on a pool of worker
+    threads.
+
+    Every worker thread gets its own handle from handle_factory, made on
+    its first target and logged out once the targets are exhausted, so the
+    commit buffers of the workers never mix. A failing target does not stop
+    the others; its exception is returned in place of a result. A worker
+    whose handle could not be made retries on its next target.
+
+    Every handle is isolated with isolate_session(), so the requests of
+    the workers run concurrently and a rollout bound by round trips
+    scales with the number of workers. Handles the factory isolates
+    before logging in also log in concurrently.
+
+    Args:
+        handle_factory (callable): returns a logged in UcscHandle, called
+                                   once per worker thread
+        operation (callable): called as operation(handle, target)
+        targets (list): domain group names, org dns or any other values
+                        the operation accepts
+        workers (int): maximum number of concurrent workers
+
+    Returns:
+        List of (target, result, exception), in the order of targets. One of
+        result and exception is None.
+
+    Example:
+        def factory():
+            handle = isolate_session(UcscHandle("10.10.10.10", "admin",
+                                                "password"))
+            handle.login()
+            return handle
+
+        results = fanout(factory,
+                         lambda handle, dg: vlan_create(handle, "vlan100",
+                                                        "100",
+                                                        domain_group=dg),
+                         ["root/dg1", "root/dg2", "root/dg3"],
+                         workers=4)
+        failed = [(dg, e) for dg, result, e in results if e is not None]
+    """
+    targets = list(targets)
+    results = [None] * len(targets)
+    pending = queue.Queue()
+    for item in enumerate(targets):
+        pending.put(item)
+
+    def worker():
+        handle = None
+        try:
+            while True:
+                try:
+                    index, target = pending.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    if handle is None:
+                        handle = isolate_session(handle_factory())
+                    results[index] = (target, operation(handle, target),
+                                      None)
+                except Exception as e:
+                    results[index] = (target, None, e)
+        finally:
+            if handle is not None:
+                try:
+                    handle.logout()
+                except Exception:
+                    pass
+
+    threads = [threading.Thread(target=worker)
+               for _ in range(max(1, min(workers, len(targets))))]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
@@ -0,0 +1,248 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module provides the instrumentation hooks of the ucsc_apis admin and
+network functions.
+"""
+import functools
+import inspect
+import logging
+import re
+import threading
+import time
+
+log = logging.getLogger("ucsc_apis")
+
+_hooks = []
+
+_local = threading.local()
+
+_COUNTED = ("query_dn", "query_dns", "query_classid", "query_children",
+            "add_mo", "set_mo", "remove_mo", "commit")
+
+_MO_METHODS = ("add_mo", "set_mo", "remove_mo")
+
+_SECRET = re.compile(r"pwd|passw|secret|community|^key$|_key$|token",
+                     re.IGNORECASE)
+
+REDACTED = "******"
+
+
+class CallEvent(object):
+    """
+    Record of one call of an instrumented function, passed to the hooks.
+
+    Attributes:
+        name (string): function name, e.g. "vlan_create"
+        module (string): module of the function, e.g. "ucsc_apis.network.vlan"
+        args (dict): arguments by name, handle excluded, secrets redacted
+        start (float): time.time() when the call started
+        end (float): time.time() when the call ended
+        counts (dict): number of calls of query_dn, query_dns,
+                       query_classid, query_children, add_mo, set_mo,
+                       remove_mo and commit
+                       made on the handle, including those of nested
+                       instrumented calls
+        errors (dict): number of those calls which raised an exception
+        mo_counts (dict): number of managed objects passed to add_mo,
+                          set_mo and remove_mo and of class queries, by
+                          (method, class_id)
+        parent (CallEvent): event of the instrumented call this call is
+                            nested in, None for a top level call
+        result: return value, None if an exception was raised
+        exception (Exception): exception raised by the call OR None
+    """
+
+    def __init__(self, name, module, args, parent=None):
+        self.name = name
+        self.module = module
+        self.args = args
+        self.parent = parent
+        self.start = time.time()
+        self.end = None
+        self.counts = dict((method, 0) for method in _COUNTED)
+        self.errors = dict((method, 0) for method in _COUNTED)
+        self.mo_counts = {}
+        self.result = None
+        self.exception = None
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+    @property
+    def class_id(self):
+        """
+        Class of the managed object the call is about: that of the managed
+        object returned, else of the first one written or queried by class.
+        None if there is none.
+        """
+        result = self.result
+        if isinstance(result, list) and result:
+            result = result[0]
+        if hasattr(result, "get_class_id"):
+            return result.get_class_id()
+        for method, class_id in self.mo_counts:
+            if method in _MO_METHODS:
+                return class_id
+        for method, class_id in self.mo_counts:
+            return class_id
+        return None
+
+
+class _CountingHandle(object):
+    """
+    Proxy of a UcscHandle counting the calls of the methods in _COUNTED
+    """
+
+    def __init__(self, handle, event):
+        object.__setattr__(self, "_handle", handle)
+        object.__setattr__(self, "_event", event)
+
+    def __getattr__(self, name):
+        attr = getattr(self._handle, name)
+        if name not in _COUNTED:
+            return attr
+        event = self._event
+
+        def counted(*args, **kwargs):
+            event.counts[name] += 1
+            class_id = None
+            if name == "query_classid":
+                class_id = args[0] if args else kwargs.get("class_id")
+            elif name in _MO_METHODS:
+                mo = args[0] if args else kwargs.get("mo")
+                class_id = getattr(mo, "_class_id", None)
+            if class_id is not None:
+                key = (name, class_id)
+                event.mo_counts[key] = event.mo_counts.get(key, 0) + 1
+            try:
+                return attr(*args, **kwargs)
+            except Exception:
+                event.errors[name] += 1
+                raise
+        return counted
+
+    def __setattr__(self, name, value):
+        setattr(self._handle, name, value)
+
+
+def hook_register(hook):
+    """
+    Registers a hook called with a CallEvent after every call of an
+    instrumented function.
+
+    Exceptions raised by a hook are logged and otherwise ignored.
+
+    Args:
+        hook (callable): called as hook(event)
+
+    Returns:
+        hook
+
+    Example:
+        def slow_calls(event):
+            if event.duration > 1:
+                print(event.name, event.duration, event.counts)
+
+        hook_register(slow_calls)
+    """
+    if hook not in _hooks:
+        _hooks.append(hook)
+    return hook
+
+
+def hook_unregister(hook):
+    """
+    Unregisters a hook registered with hook_register()
+
+    Args:
+        hook (callable)
+
+    Returns:
+        None
+    """
+    if hook in _hooks:
+        _hooks.remove(hook)
+
+
+def _call_args(func, args, kwargs):
+    try:
+        call_args = inspect.getcallargs(func, *args, **kwargs)
+    except TypeError:
+        call_args = dict(enumerate(args))
+        call_args.update(kwargs)
+    for name, value in list(call_args.items()):
+        if isinstance(value, dict) and name == func._ucsc_apis_varkw:
+            del call_args[name]
+            call_args.update(value)
+    call_args.pop("handle", None)
+    return _redact(call_args)
+
+
+def _redact(value):
+    """
+    Redacts the secrets of a dict of arguments, and of the dicts nested in
+    its lists and dicts, e.g. the records of users_bulk_apply()
+    """
+    if isinstance(value, dict):
+        return dict((name, REDACTED if item is not None and
+                     _SECRET.search(str(name)) else _redact(item))
+                    for name, item in value.items())
+    if isinstance(value, list):
+        return [_redact(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(_redact(item) for item in value)
+    return value
+
+
+def instrument(func):
+    """
+    Decorator making a function whose first argument is a handle visible
+    to the registered hooks. When no hook is registered, the function is
+    called directly.
+    """
+    try:
+        func._ucsc_apis_varkw = inspect.getfullargspec(func).varkw
+    except AttributeError:
+        func._ucsc_apis_varkw = inspect.getargspec(func).keywords
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _hooks:
+            return func(*args, **kwargs)
+
+        parent = getattr(_local, "event", None)
+        event = CallEvent(func.__name__, func.__module__,
+                          _call_args(func, args, kwargs), parent)
+        if args:
+            args = (_CountingHandle(args[0], event),) + args[1:]
+        elif "handle" in kwargs:
+            kwargs["handle"] = _CountingHandle(kwargs["handle"], event)
+        _local.event = event
+        try:
+            event.result = func(*args, **kwargs)
+            return event.result
+        except Exception as e:
+            event.exception = e
+            raise
+        finally:
+            event.end = time.time()
+            _local.event = parent
+            for hook in list(_hooks):
+                try:
+                    hook(event)
+                except Exception:
+                    log.exception("ucsc_apis hook %r failed" % hook)
+    return wrapper
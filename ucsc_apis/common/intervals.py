@@ -0,0 +1,175 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module provides a sorted index of integer intervals, used to check the
+address blocks of pools for overlaps and free space.
+"""
+import bisect
+
+
+def merge(intervals):
+    """
+    Merges overlapping and adjacent closed integer intervals
+
+    Args:
+        intervals (iterable): (start, end) tuples
+
+    Returns:
+        List of (start, end), sorted and disjoint
+    """
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+class IntervalIndex(object):
+    """
+    Closed integer intervals, each carrying an item, kept sorted by start.
+
+    Lookups bisect the sorted starts. Since intervals may overlap each
+    other, the running maximum of the ends is kept alongside, which bounds
+    how far back an overlap lookup has to scan. Lookups cost O(log n) plus
+    the number of intervals found as long as the intervals are mostly
+    disjoint, which address blocks are.
+
+    Args:
+        intervals (iterable): (start, end, item) tuples
+    """
+
+    def __init__(self, intervals=()):
+        self._intervals = sorted(intervals, key=lambda i: (i[0], i[1]))
+        self._starts = [i[0] for i in self._intervals]
+        self._max_ends = None
+        self._merged = None
+
+    def __len__(self):
+        return len(self._intervals)
+
+    def __iter__(self):
+        return iter(self._intervals)
+
+    def add(self, start, end, item=None):
+        """
+        Adds an interval to the index
+        """
+        pos = bisect.bisect_right(self._starts, start)
+        self._starts.insert(pos, start)
+        self._intervals.insert(pos, (start, end, item))
+        self._max_ends = None
+        self._merged = None
+
+    def _build(self):
+        if self._max_ends is not None:
+            return
+        self._max_ends = []
+        max_end = None
+        for start, end, item in self._intervals:
+            if max_end is None or end > max_end:
+                max_end = end
+            self._max_ends.append(max_end)
+        self._merged = merge(i[:2] for i in self._intervals)
+
+    def overlapping(self, start, end):
+        """
+        Finds the intervals sharing at least one value with [start, end]
+
+        Returns:
+            List of (start, end, item), sorted by start
+        """
+        self._build()
+        found = []
+        pos = bisect.bisect_right(self._starts, end) - 1
+        while pos >= 0 and self._max_ends[pos] >= start:
+            if self._intervals[pos][1] >= start:
+                found.append(self._intervals[pos])
+            pos -= 1
+        found.reverse()
+        return found
+
+    def containing(self, value):
+        """
+        Finds the intervals containing value
+
+        Returns:
+            List of (start, end, item), sorted by start
+        """
+        return self.overlapping(value, value)
+
+    def conflicts(self):
+        """
+        Finds all the pairs of overlapping intervals, in one sweep
+
+        Returns:
+            List of ((start, end, item), (start, end, item))
+        """
+        pairs = []
+        active = []
+        for interval in self._intervals:
+            active = [other for other in active if other[1] >= interval[0]]
+            for other in active:
+                pairs.append((other, interval))
+            active.append(interval)
+        return pairs
+
+    def free_ranges(self, start, end):
+        """
+        Generates the ranges of [start, end] not covered by any interval
+
+        Returns:
+            Generator of (start, end), in increasing order
+        """
+        self._build()
+        merged = self._merged
+        pos = max(self._merged_pos(start), 0)
+        cursor = start
+        while cursor <= end:
+            if pos >= len(merged) or merged[pos][0] > end:
+                yield (cursor, end)
+                return
+            lo, hi = merged[pos]
+            if hi < cursor:
+                pos += 1
+                continue
+            if lo > cursor:
+                yield (cursor, lo - 1)
+            cursor = hi + 1
+            pos += 1
+
+    def _merged_pos(self, value):
+        lo, hi = 0, len(self._merged)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._merged[mid][0] <= value:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo - 1
+
+    def find_free(self, size, start, end):
+        """
+        Finds the lowest range of size values within [start, end] not
+        covered by any interval
+
+        Returns:
+            (start, end) OR None if there is no such range
+        """
+        for free_start, free_end in self.free_ranges(start, end):
+            if free_end - free_start + 1 >= size:
+                return (free_start, free_start + size - 1)
+        return None
@@ -0,0 +1,264 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module collects metrics of the ucsc_apis admin and network functions
+and exposes them in the Prometheus text format.
+"""
+import bisect
+import os
+import threading
+
+from .hooks import hook_register, hook_unregister
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0, 30.0, 60.0)
+
+_PREFIX = "ucsc_apis_"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n") \
+        .replace('"', '\\"')
+
+
+def _labels(names, values):
+    return ",".join('%s="%s"' % (name, _escape(value))
+                    for name, value in zip(names, values))
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Histogram(object):
+    def __init__(self, buckets):
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, buckets, value):
+        self.counts[bisect.bisect_left(buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsCollector(object):
+    """
+    Hook keeping counters and latency histograms of the calls of the
+    instrumented ucsc_apis functions.
+
+    The metrics below are kept, prefixed with "ucsc_apis_":
+        calls_total{function}: calls
+        call_failures_total{function}: calls which raised an exception
+        call_duration_seconds{function}: histogram of the call latencies
+        handle_requests_total{function,method}: query_dn, query_dns,
+            query_classid, query_children, add_mo, set_mo, remove_mo and
+            commit calls made on the handle
+        handle_request_failures_total{function,method}: those which
+            raised an exception
+        mo_class_calls_total{class_id}: calls by managed object class, see
+            CallEvent.class_id
+        mo_class_duration_seconds{class_id}: histogram of the call
+            latencies by managed object class
+        mo_operations_total{class_id,method}: managed objects passed to
+            add_mo, set_mo and remove_mo and class queries
+        commits_total: commits
+        commit_failures_total: commits which raised an exception
+
+    Metrics by function and by class count nested calls as well, e.g.
+    vlan_create() calling vlan_exists(). The handle request, managed object
+    operation and commit counts are only taken from top level calls, so
+    every request is counted once.
+
+    Args:
+        buckets (tuple): upper bounds of the histogram buckets, in seconds
+
+    Example:
+        metrics = MetricsCollector().register()
+        vlan_create(handle, name="vlan100", id="100")
+        metrics.dump("/var/lib/node_exporter/ucsc_apis.prom")
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(float(bound) for bound in buckets))
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Resets all the metrics to zero
+        """
+        with self._lock:
+            self._calls = {}
+            self._failures = {}
+            self._durations = {}
+            self._requests = {}
+            self._request_failures = {}
+            self._class_calls = {}
+            self._class_durations = {}
+            self._mo_operations = {}
+            self._commits = 0
+            self._commit_failures = 0
+
+    def register(self):
+        """
+        Registers the collector as a hook, see hook_register()
+
+        Returns:
+            MetricsCollector
+        """
+        hook_register(self)
+        return self
+
+    def unregister(self):
+        """
+        Unregisters the collector, see hook_unregister()
+
+        Returns:
+            None
+        """
+        hook_unregister(self)
+
+    def __call__(self, event):
+        function = event.name
+        class_id = event.class_id
+        with self._lock:
+            self._calls[function] = self._calls.get(function, 0) + 1
+            if event.exception is not None:
+                self._failures[function] = \
+                    self._failures.get(function, 0) + 1
+            self._durations.setdefault(function, _Histogram(self.buckets)) \
+                .observe(self.buckets, event.duration)
+            if class_id is not None:
+                self._class_calls[class_id] = \
+                    self._class_calls.get(class_id, 0) + 1
+                self._class_durations.setdefault(
+                    class_id, _Histogram(self.buckets)).observe(
+                        self.buckets, event.duration)
+            if event.parent is not None:
+                return
+
+            for method, count in event.counts.items():
+                if count:
+                    key = (function, method)
+                    self._requests[key] = self._requests.get(key, 0) + count
+            for method, count in event.errors.items():
+                if count:
+                    key = (function, method)
+                    self._request_failures[key] = \
+                        self._request_failures.get(key, 0) + count
+            for key, count in event.mo_counts.items():
+                key = (key[1], key[0])
+                self._mo_operations[key] = \
+                    self._mo_operations.get(key, 0) + count
+            self._commits += event.counts["commit"]
+            self._commit_failures += event.errors["commit"]
+
+    def _counter(self, lines, name, help_text, label_names, values):
+        lines.append("# HELP %s%s %s" % (_PREFIX, name, help_text))
+        lines.append("# TYPE %s%s counter" % (_PREFIX, name))
+        for key in sorted(values):
+            label_values = key if isinstance(key, tuple) else (key,)
+            lines.append("%s%s{%s} %s" % (_PREFIX, name,
+                                          _labels(label_names, label_values),
+                                          _number(values[key])))
+
+    def _histogram(self, lines, name, help_text, label_name, values):
+        lines.append("# HELP %s%s %s" % (_PREFIX, name, help_text))
+        lines.append("# TYPE %s%s histogram" % (_PREFIX, name))
+        bounds = self.buckets + (float("inf"),)
+        for key in sorted(values):
+            histogram = values[key]
+            cumulative = 0
+            for bound, count in zip(bounds, histogram.counts):
+                cumulative += count
+                lines.append("%s%s_bucket{%s,le=\"%s\"} %d"
+                             % (_PREFIX, name,
+                                _labels((label_name,), (key,)),
+                                _number(bound), cumulative))
+            labels = _labels((label_name,), (key,))
+            lines.append("%s%s_sum{%s} %s" % (_PREFIX, name, labels,
+                                              _number(histogram.sum)))
+            lines.append("%s%s_count{%s} %d" % (_PREFIX, name, labels,
+                                                histogram.count))
+
+    def text(self):
+        """
+        Returns the metrics in the Prometheus text exposition format
+
+        Returns:
+            string
+        """
+        lines = []
+        with self._lock:
+            self._counter(lines, "calls_total",
+                          "Calls of ucsc_apis functions.",
+                          ("function",), self._calls)
+            self._counter(lines, "call_failures_total",
+                          "Calls of ucsc_apis functions which raised an "
+                          "exception.", ("function",), self._failures)
+            self._histogram(lines, "call_duration_seconds",
+                            "Latency of ucsc_apis function calls.",
+                            "function", self._durations)
+            self._counter(lines, "handle_requests_total",
+                          "Handle requests made by top level ucsc_apis "
+                          "function calls.", ("function", "method"),
+                          self._requests)
+            self._counter(lines, "handle_request_failures_total",
+                          "Handle requests made by top level ucsc_apis "
+                          "function calls which raised an exception.",
+                          ("function", "method"), self._request_failures)
+            self._counter(lines, "mo_class_calls_total",
+                          "Calls of ucsc_apis functions by managed object "
+                          "class.", ("class_id",), self._class_calls)
+            self._histogram(lines, "mo_class_duration_seconds",
+                            "Latency of ucsc_apis function calls by managed "
+                            "object class.", "class_id",
+                            self._class_durations)
+            self._counter(lines, "mo_operations_total",
+                          "Managed objects written or queried by class.",
+                          ("class_id", "method"), self._mo_operations)
+            lines.append("# HELP %scommits_total Commits." % _PREFIX)
+            lines.append("# TYPE %scommits_total counter" % _PREFIX)
+            lines.append("%scommits_total %d" % (_PREFIX, self._commits))
+            lines.append("# HELP %scommit_failures_total Commits which "
+                         "raised an exception." % _PREFIX)
+            lines.append("# TYPE %scommit_failures_total counter" % _PREFIX)
+            lines.append("%scommit_failures_total %d"
+                         % (_PREFIX, self._commit_failures))
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path):
+        """
+        Writes the metrics in the Prometheus text exposition format to a
+        file. The file is replaced atomically, so that a reader such as the
+        node_exporter textfile collector never sees a partial file.
+
+        Args:
+            path (string): file path
+
+        Returns:
+            None
+        """
+        tmp_path = "%s.%d.tmp" % (path, os.getpid())
+        with open(tmp_path, "w") as f:
+            f.write(self.text())
+        try:
+            os.replace(tmp_path, path)
+        except AttributeError:
+            if os.path.exists(path):
+                os.remove(path)
+            os.rename(tmp_path, path)
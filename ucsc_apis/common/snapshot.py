@@ -0,0 +1,115 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module provides an indexed, in-memory snapshot of a managed object
+subtree for offline evaluation of the ucsc_apis *_get/*_exists functions.
+"""
+
+
+class MoSnapshot(object):
+    """
+    Point-in-time copy of managed objects, indexed by dn, by parent dn and
+    by class id.
+
+    Args:
+        mos (list): managed objects, e.g. the result of
+                    handle.query_dn(dn, hierarchy=True)
+    """
+
+    def __init__(self, mos):
+        self._dns = {}
+        self._children = {}
+        self._classes = {}
+        for mo in mos:
+            self.add(mo)
+
+    def add(self, mo):
+        """
+        Adds or replaces a managed object in the snapshot
+        """
+        if mo.dn in self._dns:
+            self.remove(mo.dn)
+        self._dns[mo.dn] = mo
+        parent_dn = mo.dn.rpartition("/")[0]
+        self._children.setdefault(parent_dn, {})[mo.dn] = mo
+        self._classes.setdefault(mo.get_class_id(), {})[mo.dn] = mo
+
+    def remove(self, dn):
+        """
+        Removes the managed object at dn, and everything below it, from the
+        snapshot
+        """
+        mo = self._dns.pop(dn, None)
+        if mo is None:
+            return
+        self._children.get(dn.rpartition("/")[0], {}).pop(dn, None)
+        self._classes.get(mo.get_class_id(), {}).pop(dn, None)
+        for child_dn in list(self._children.pop(dn, {})):
+            self.remove(child_dn)
+
+    def __contains__(self, dn):
+        return dn in self._dns
+
+    def __len__(self):
+        return len(self._dns)
+
+    def __iter__(self):
+        return iter(self._dns.values())
+
+    def get(self, dn, default=None):
+        """
+        Gets the managed object at dn
+
+        Returns:
+            ManagedObject OR default
+        """
+        return self._dns.get(dn, default)
+
+    def children(self, dn, class_id=None):
+        """
+        Gets the direct children of dn, optionally only those of class_id
+
+        Returns:
+            List of ManagedObject
+        """
+        children = self._children.get(dn, {}).values()
+        if class_id is None:
+            return list(children)
+        return [mo for mo in children if mo.get_class_id() == class_id]
+
+    def by_class(self, class_id):
+        """
+        Gets all the managed objects of class_id, e.g. "AaaUser"
+
+        Returns:
+            List of ManagedObject
+        """
+        return list(self._classes.get(class_id, {}).values())
+
+
+def mo_snapshot(handle, dn):
+    """
+    Downloads the subtree rooted at dn with one hierarchical query
+
+    Args:
+        handle (UcscHandle)
+        dn (string): dn of the root of the subtree
+
+    Returns:
+        MoSnapshot
+
+    Example:
+        snapshot = mo_snapshot(handle, "org-root")
+    """
+    return MoSnapshot(handle.query_dn(dn, hierarchy=True) or [])
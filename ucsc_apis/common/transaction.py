@@ -0,0 +1,204 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module provides a deferred-commit transaction scope for the ucsc_apis.
+"""
+from contextlib import contextmanager
+
+_PATCHED = ("commit", "query_dn", "query_dns")
+
+
+def _staged_mo(handle, dn):
+    """
+    Looks up a dn in the commit buffer of the handle, including the children
+    of the buffered managed objects.
+
+    Returns:
+        (True/False, MO/None): whether the dn is staged and the staged MO,
+                               None if the staged MO is marked for deletion
+    """
+    tag = handle._auto_set_tag_context(None)
+    try:
+        stack = list(handle._get_commit_buf(tag).values())
+    except KeyError:
+        return (False, None)
+    while stack:
+        mo = stack.pop()
+        if mo.dn == dn:
+            return (True, None if mo.status == "deleted" else mo)
+        if dn.startswith(mo.dn + "/"):
+            if mo.status == "deleted":
+                return (True, None)
+            stack.extend(mo.child)
+    return (False, None)
+
+
+def _staged_subtree(handle, dn):
+    """
+    Collects the managed objects staged in the commit buffer of the handle
+    at or below dn.
+
+    Returns:
+        dict: dn to staged MO, or to None for a staged deletion, empty if
+              nothing is staged at or below dn
+    """
+    tag = handle._auto_set_tag_context(None)
+    try:
+        stack = list(handle._get_commit_buf(tag).values())
+    except KeyError:
+        return {}
+    staged = {}
+    while stack:
+        mo = stack.pop()
+        if mo.dn == dn or mo.dn.startswith(dn + "/"):
+            if mo.status == "deleted":
+                staged[mo.dn] = None
+                continue
+            staged[mo.dn] = mo
+            stack.extend(mo.child)
+        elif dn.startswith(mo.dn + "/"):
+            if mo.status == "deleted":
+                return {dn: None}
+            stack.extend(mo.child)
+    return staged
+
+
+def _merge_subtree(mos, staged):
+    """
+    Merges the staged managed objects into the result of a hierarchical
+    query_dn: staged objects replace the fetched ones, and staged deletions
+    drop the fetched objects along with everything below them.
+    """
+    deleted = [dn for dn, mo in staged.items() if mo is None]
+    merged = []
+    for mo in mos:
+        if mo.dn in staged:
+            continue
+        if any(mo.dn.startswith(dn + "/") for dn in deleted):
+            continue
+        merged.append(mo)
+    merged.extend(mo for mo in staged.values() if mo is not None)
+    return merged
+
+
+def in_transaction(handle):
+    """
+    Checks if a transaction is open on the handle
+
+    Args:
+        handle (UcscHandle)
+
+    Returns:
+        True/False
+    """
+    return getattr(handle, "_ucsc_apis_txn_depth", 0) > 0
+
+
+@contextmanager
+def transaction(handle):
+    """
+    Opens a deferred-commit transaction on the handle.
+
+    Within the scope every ucsc_apis function keeps staging its
+    add_mo/set_mo/remove_mo calls in the commit buffer of the handle, but
+    its handle.commit() is deferred. A single commit is issued when the scope
+    exits normally. If an exception is raised inside the scope, the staged
+    changes are discarded and the exception is re-raised.
+
+    query_dn and query_dns calls are answered from the commit buffer for
+    dns staged within the scope, so that a function can refer to a parent
+    created earlier in the same transaction. A hierarchical query_dn
+    returns the objects fetched from UCS Central merged with those staged
+    below dn.
+
+    Nested transactions on the same handle join the outermost one.
+
+    Args:
+        handle (UcscHandle)
+
+    Returns:
+        UcscHandle
+
+    Example:
+        with transaction(handle):
+            mac_pool_create(handle, "pool1", "00:25:B5:00:00:00",
+                            "00:25:B5:00:00:03")
+            vlan_create(handle, "vlan100", "100")
+    """
+    if in_transaction(handle):
+        handle._ucsc_apis_txn_depth += 1
+        try:
+            yield handle
+        finally:
+            handle._ucsc_apis_txn_depth -= 1
+        return
+
+    saved = dict((attr, handle.__dict__[attr])
+                 for attr in _PATCHED if attr in handle.__dict__)
+    real_commit = handle.commit
+    real_query_dn = handle.query_dn
+    real_query_dns = handle.query_dns
+
+    def deferred_commit(tag=None, dme="central-mgr"):
+        return None
+
+    def staged_query_dn(dn, hierarchy=False, need_response=False,
+                        dme="central-mgr"):
+        if need_response:
+            return real_query_dn(dn, hierarchy=hierarchy,
+                                 need_response=need_response, dme=dme)
+        if not hierarchy:
+            staged, mo = _staged_mo(handle, dn)
+            if staged:
+                return mo
+            return real_query_dn(dn, dme=dme)
+        staged = _staged_subtree(handle, dn)
+        if staged.get(dn, True) is None:
+            return []
+        mos = real_query_dn(dn, hierarchy=True, dme=dme) or []
+        return _merge_subtree(mos, staged) if staged else mos
+
+    def staged_query_dns(dns=[], dme="central-mgr"):
+        found = {}
+        unstaged = []
+        for dn in dns:
+            staged, mo = _staged_mo(handle, dn.strip())
+            if staged:
+                found[dn.strip()] = mo
+            else:
+                unstaged.append(dn)
+        if unstaged:
+            found.update(real_query_dns(unstaged, dme=dme))
+        return found
+
+    def restore():
+        handle._ucsc_apis_txn_depth = 0
+        for attr in _PATCHED:
+            if attr in saved:
+                handle.__dict__[attr] = saved[attr]
+            else:
+                handle.__dict__.pop(attr, None)
+
+    handle._ucsc_apis_txn_depth = 1
+    handle.commit = deferred_commit
+    handle.query_dn = staged_query_dn
+    handle.query_dns = staged_query_dns
+    try:
+        yield handle
+    except BaseException:
+        restore()
+        handle.commit_buffer_discard()
+        raise
+    restore()
+    real_commit()
@@ -17,3 +17,118 @@ This module provides common utility function for the ucsc_apis.
 
 def get_device_profile_dn(name, parent_dn="org-root"):
     return parent_dn + "/deviceprofile-" + name
+
+
+def mo_subtree_index(mos):
+    """
+    Indexes a list of managed objects by dn.
+
+    Args:
+        mos (list): managed objects, e.g. the result of
+                    handle.query_dn(dn, hierarchy=True)
+
+    Returns:
+        dict: dn to managed object
+
+    Example:
+        subtree = mo_subtree_index(handle.query_dn("org-root",
+                                                   hierarchy=True))
+    """
+    return dict((mo.dn, mo) for mo in mos)
+
+
+def query_subtree(handle, dn, subtree=None):
+    """
+    Gets the managed object at dn along with its hierarchy, indexed by dn.
+
+    The hierarchy is fetched with a single query unless a prefetched
+    subtree is given, in which case no query is made.
+
+    Args:
+        handle (UcscHandle)
+        dn (string): dn of the root of the subtree
+        subtree (list, dict or MoSnapshot): prefetched managed objects
+                                containing dn, as a list, as returned by
+                                mo_subtree_index() or as a MoSnapshot
+
+    Returns:
+        dict: dn to managed object
+    """
+    if subtree is None:
+        return mo_subtree_index(handle.query_dn(dn, hierarchy=True) or [])
+    if hasattr(subtree, "get"):
+        return subtree
+    return mo_subtree_index(subtree)
+
+
+def query_mos(handle, dns, subtree=None):
+    """
+    Gets the managed objects at dns, indexed by dn.
+
+    The managed objects are fetched with a single configResolveDns query,
+    or configResolveDn for a single dn, unless a prefetched subtree is
+    given, in which case no query is made. Unlike query_subtree(), the
+    children of the managed objects are not fetched.
+
+    Args:
+        handle (UcscHandle)
+        dns (list): dns of the managed objects
+        subtree (list, dict or MoSnapshot): prefetched managed objects, see
+                                            query_subtree()
+
+    Returns:
+        dict: dn to managed object OR None
+    """
+    if subtree is not None:
+        mos = query_subtree(handle, dns[0], subtree)
+        return dict((dn, mos.get(dn)) for dn in dns)
+    if len(dns) == 1:
+        return {dns[0]: handle.query_dn(dns[0])}
+    return handle.query_dns(dns)
+
+
+def get_mo(handle, dn, snapshot=None):
+    """
+    Gets the managed object at dn, from the snapshot when one is given.
+
+    Args:
+        handle (UcscHandle)
+        dn (string): dn of the managed object
+        snapshot (MoSnapshot): prefetched managed objects
+
+    Returns:
+        managed object OR None
+    """
+    if snapshot is not None:
+        return snapshot.get(dn)
+    return handle.query_dn(dn)
+
+
+def set_mo_changes(handle, mo, **kwargs):
+    """
+    Stages a modification of mo carrying only the properties whose requested
+    value differs from the current one. Nothing is staged when every
+    requested value already matches, so that the caller can skip the commit.
+
+    Properties requested as None are left untouched.
+
+    Args:
+        handle (UcscHandle)
+        mo (ManagedObject): managed object as fetched from UCS Central
+        **kwargs: key-value pair of managed object(MO) property and value
+
+    Returns:
+        dict: property to value, of the properties that changed
+
+    Example:
+        mo = handle.query_dn("org-root/deviceprofile-default/locale-test")
+        if set_mo_changes(handle, mo, descr="testing locale"):
+            handle.commit()
+    """
+    changes = dict((prop, value) for prop, value in kwargs.items()
+                   if value is not None and
+                   str(getattr(mo, prop, None)) != str(value))
+    if changes:
+        mo.set_prop_multiple(**changes)
+        handle.set_mo(mo)
+    return changes
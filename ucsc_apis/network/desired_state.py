@@ -0,0 +1,317 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module applies a declarative, desired-state document of network
+policies to UCS Central.
+"""
+from ucscsdk.ucscexception import UcscOperationError
+from ..common.hooks import instrument
+
+_BLOCK = {"class_id": None, "naming": ("r_from", "to")}
+
+_VNIC = {"class_id": "VnicEther", "naming": ("name",)}
+
+_ISCSI_VNIC = {"class_id": "VnicIScsiLCP", "naming": ("name",),
+               "singletons": (("VnicVlan", {"name": ""}, ("vlan_name",)),)}
+
+# Document keys, in the order they are applied. Each kind names the class
+# of its managed object, the properties which make up its rn, the nested
+# collections and the singleton children whose properties are given flat on
+# the parent entry, e.g. "prio" of a qos policy lives on its EpqosEgress.
+_KINDS = (
+    ("mcast_policies", {"class_id": "FabricMulticastPolicy",
+                        "naming": ("name",)}),
+    ("vlans", {"class_id": "FabricVlan", "naming": ("name",)}),
+    ("mac_pools", {"class_id": "MacpoolPool", "naming": ("name",),
+                   "children": (("blocks", dict(_BLOCK,
+                                                class_id="MacpoolBlock")),)}),
+    ("ip_pools", {"class_id": "IppoolPool", "naming": ("name",),
+                  "children": (("blocks", dict(_BLOCK,
+                                               class_id="IppoolBlock")),)}),
+    ("qos_policies", {"class_id": "EpqosDefinition", "naming": ("name",),
+                      "singletons": (("EpqosEgress", {"name": ""},
+                                      ("prio", "burst", "rate",
+                                       "host_control")),)}),
+    ("nwctrl_policies", {"class_id": "NwctrlDefinition", "naming": ("name",),
+                         "singletons": (("DpsecMac",
+                                         {"name": "", "descr": ""},
+                                         ("forge",)),)}),
+    ("dynamic_vnic_conn_policies", {"class_id": "VnicDynamicConPolicy",
+                                    "naming": ("name",)}),
+    ("usnic_conn_policies", {"class_id": "VnicUsnicConPolicy",
+                             "naming": ("name",)}),
+    ("vmq_conn_policies", {"class_id": "VnicVmqConPolicy",
+                           "naming": ("name",)}),
+    ("lan_conn_policies", {"class_id": "VnicLanConnPolicy",
+                           "naming": ("name",),
+                           "children": (("vnics", _VNIC),
+                                        ("iscsi_vnics", _ISCSI_VNIC))}),
+)
+
+_VLAN_CLOUDS = {"lan": "fabric/lan", "appliance": "fabric/eth-estc"}
+
+
+def _mo_class(class_id):
+    from ucscsdk import ucsccoreutils
+
+    return ucsccoreutils.load_class(class_id)
+
+
+def _split(kind, entry):
+    """
+    Splits a document entry into naming, own, singleton and nested
+    collection properties.
+    """
+    props = dict(entry)
+    try:
+        naming = dict((prop, str(props.pop(prop)))
+                      for prop in kind["naming"])
+    except KeyError as e:
+        raise UcscOperationError("network_apply",
+                                 "%s entry %s is missing '%s'"
+                                 % (kind["class_id"], entry, e.args[0]))
+    singletons = []
+    for class_id, fixed, names in kind.get("singletons", ()):
+        singletons.append((class_id, fixed,
+                           dict((name, props.pop(name))
+                                for name in names if name in props)))
+    children = []
+    for key, child_kind in kind.get("children", ()):
+        if key in props:
+            children.append((child_kind, props.pop(key)))
+    props = dict((prop, str(value)) for prop, value in props.items())
+    return naming, props, singletons, children
+
+
+def _build(kind, entry, parent):
+    """
+    Builds the managed object for an entry along with its whole subtree
+    """
+    naming, props, singletons, children = _split(kind, entry)
+    mo = _mo_class(kind["class_id"])(parent_mo_or_dn=parent, **naming)
+    mo.set_prop_multiple(**props)
+    for class_id, fixed, single_props in singletons:
+        child = _mo_class(class_id)(parent_mo_or_dn=mo)
+        child.set_prop_multiple(**fixed)
+        child.set_prop_multiple(**dict((prop, str(value)) for prop, value
+                                       in single_props.items()))
+    for child_kind, child_entries in children:
+        for child_entry in child_entries:
+            _build(child_kind, child_entry, mo)
+    return mo
+
+
+def _changed(mo, props):
+    return dict((prop, value) for prop, value in props.items()
+                if str(getattr(mo, prop, None)) != value)
+
+
+def _diff(kind, entries, parent_dn, snapshot, prune, changes):
+    """
+    Appends to changes the ("add"/"modify"/"delete", MO) operations which
+    bring the objects of a kind under parent_dn to the desired entries.
+    """
+    class_id = kind["class_id"]
+    wanted = set()
+    for entry in entries:
+        naming, props, singletons, children = _split(kind, entry)
+        mo = _mo_class(class_id)(parent_mo_or_dn=parent_dn, **naming)
+        if mo.dn in wanted:
+            raise UcscOperationError("network_apply",
+                                     "Duplicate entry for '%s'" % mo.dn)
+        wanted.add(mo.dn)
+
+        current = snapshot.get(mo.dn)
+        if current is None:
+            changes.append(("add", _build(kind, entry, parent_dn)))
+            continue
+
+        changed = _changed(current, props)
+        if changed:
+            mo.set_prop_multiple(**changed)
+            changes.append(("modify", mo))
+
+        for single_class_id, fixed, single_props in singletons:
+            single_props = dict((prop, str(value)) for prop, value
+                                in single_props.items())
+            child = _mo_class(single_class_id)(parent_mo_or_dn=mo.dn)
+            current_child = snapshot.get(child.dn)
+            if current_child is None:
+                child.set_prop_multiple(**fixed)
+                child.set_prop_multiple(**single_props)
+                changes.append(("add", child))
+                continue
+            changed = _changed(current_child, single_props)
+            if changed:
+                child.set_prop_multiple(**changed)
+                changes.append(("modify", child))
+
+        # a nested collection given in the document is authoritative
+        for child_kind, child_entries in children:
+            _diff(child_kind, child_entries, mo.dn, snapshot, True, changes)
+
+    if prune:
+        for current in snapshot.children(parent_dn, class_id):
+            if current.dn not in wanted and \
+                    getattr(current, "name", None) != "default":
+                changes.append(("delete", current))
+
+
+def _vlan_entries(vlans):
+    """
+    Groups the desired VLANs by cloud type
+    """
+    by_type = dict((vlan_type, []) for vlan_type in _VLAN_CLOUDS)
+    for entry in vlans:
+        entry = dict(entry)
+        vlan_type = entry.pop("vlan_type", "lan")
+        if vlan_type not in _VLAN_CLOUDS:
+            raise UcscOperationError("network_apply",
+                                     "Vlan Type %s does not exist"
+                                     % vlan_type)
+        by_type[vlan_type].append(entry)
+    return by_type
+
+
+@instrument
+def network_diff(handle, desired, parent_dn="org-root", domain_group="root",
+                 prune=False):
+    """
+    Computes the changes needed to bring UCS Central to the desired state.
+
+    The org subtree at parent_dn is fetched with one hierarchical query, and
+    the VLANs of the domain group, when the document has any, with one class
+    query. The diff is then computed in memory.
+
+    Only the properties given in the document are compared. An object
+    missing on UCS Central is added along with its whole subtree. Nested
+    collections given in the document, such as the blocks of a pool or the
+    vnics of a LAN connectivity policy, are authoritative: objects missing
+    from them are deleted. Top level objects of the kinds present in the
+    document are only deleted when prune is True, and objects named
+    "default" never are.
+
+    Args:
+        handle (UcscHandle)
+        desired (dict): desired state, see network_apply()
+        parent_dn (string): org dn the policies and pools live in
+        domain_group (string): full domain group name the VLANs live in
+        prune (bool): delete top level objects absent from the document
+
+    Returns:
+        List of ("add"/"modify"/"delete", ManagedObject)
+
+    Raises:
+        UcscOperationError: If the document is invalid
+    """
+    from ..common.snapshot import mo_snapshot
+    from .vlan import _domain_group_dn
+
+    unknown = set(desired) - set(key for key, kind in _KINDS)
+    if unknown:
+        raise UcscOperationError("network_apply",
+                                 "Unknown keys in document: %s"
+                                 % ", ".join(sorted(unknown)))
+
+    snapshot = mo_snapshot(handle, parent_dn)
+    domain_group_dn = _domain_group_dn(domain_group)
+    if desired.get("vlans") is not None:
+        prefix = domain_group_dn + "/fabric/"
+        filter_str = '(dn, "%s", type="re")' % prefix
+        for mo in handle.query_classid("FabricVlan", filter_str=filter_str):
+            if mo.dn.startswith(prefix):
+                snapshot.add(mo)
+
+    changes = []
+    for key, kind in _KINDS:
+        entries = desired.get(key)
+        if entries is None:
+            continue
+        if key != "vlans":
+            _diff(kind, entries, parent_dn, snapshot, prune, changes)
+            continue
+        for vlan_type, vlans in _vlan_entries(entries).items():
+            cloud_dn = domain_group_dn + "/" + _VLAN_CLOUDS[vlan_type]
+            _diff(kind, vlans, cloud_dn, snapshot, prune, changes)
+    return changes
+
+
+@instrument
+def network_apply(handle, desired, parent_dn="org-root", domain_group="root",
+                  prune=False, dry_run=False, chunk_size=500):
+    """
+    Applies a desired-state document of network policies.
+
+    The current state is read once (see network_diff()) and only the
+    minimal set of changes is written, in commits of at most chunk_size
+    operations. Re-applying an unchanged document makes no commit at all.
+
+    The document maps the keys below to lists of entries. Each entry is a
+    dict of managed object properties, named as in the corresponding
+    ucsc_apis create function, plus the nested collections listed.
+
+        mcast_policies: FabricMulticastPolicy
+        vlans: FabricVlan, "vlan_type" selects the "lan" (default) or
+               "appliance" cloud
+        mac_pools: MacpoolPool, "blocks" of MacpoolBlock
+        ip_pools: IppoolPool, "blocks" of IppoolBlock
+        qos_policies: EpqosDefinition, "prio", "burst", "rate" and
+                      "host_control" are set on its EpqosEgress
+        nwctrl_policies: NwctrlDefinition, "forge" is set on its DpsecMac
+        dynamic_vnic_conn_policies: VnicDynamicConPolicy
+        usnic_conn_policies: VnicUsnicConPolicy
+        vmq_conn_policies: VnicVmqConPolicy
+        lan_conn_policies: VnicLanConnPolicy, "vnics" of VnicEther and
+                           "iscsi_vnics" of VnicIScsiLCP, "vlan_name" of
+                           which is set on its VnicVlan
+
+    Args:
+        handle (UcscHandle)
+        desired (dict): desired state
+        parent_dn (string): org dn the policies and pools live in
+        domain_group (string): full domain group name the VLANs live in
+        prune (bool): delete top level objects absent from the document
+        dry_run (bool): compute the changes without writing them
+        chunk_size (int): maximum number of operations per commit
+
+    Returns:
+        List of ("add"/"modify"/"delete", ManagedObject): changes applied,
+        or to be applied when dry_run is True
+
+    Raises:
+        UcscOperationError: If the document is invalid
+
+    Example:
+        desired = {
+            "vlans": [{"name": "vlan100", "id": "100"}],
+            "mac_pools": [{"name": "pool1", "descr": "esx",
+                           "blocks": [{"r_from": "00:25:B5:00:00:00",
+                                       "to": "00:25:B5:00:00:FF"}]}],
+            "qos_policies": [{"name": "gold", "prio": "gold"}],
+        }
+        changes = network_apply(handle, desired)
+    """
+    changes = network_diff(handle, desired, parent_dn=parent_dn,
+                           domain_group=domain_group, prune=prune)
+    if dry_run:
+        return changes
+
+    apply_ops = {"add": lambda mo: handle.add_mo(mo, modify_present=True),
+                 "modify": handle.set_mo,
+                 "delete": handle.remove_mo}
+    for i in range(0, len(changes), chunk_size):
+        for action, mo in changes[i:i + chunk_size]:
+            apply_ops[action](mo)
+        handle.commit()
+    return changes
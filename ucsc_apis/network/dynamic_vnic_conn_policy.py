@@ -16,8 +16,10 @@ This module contains the methods required for creating Dynamic Vnic
 Connection Policy.
 """
 from ucscsdk.ucscexception import UcscOperationError
+from ..common.hooks import instrument
 
 
+@instrument
 def dynamic_vnic_conn_policy_create(handle, name, descr=None, dynamic_eth="54",
                                     adaptor_profile_name=None,
                                     protection="protected",
@@ -70,6 +72,7 @@ def dynamic_vnic_conn_policy_create(handle, name, descr=None, dynamic_eth="54",
     return mo
 
 
+@instrument
 def dynamic_vnic_conn_policy_get(handle, name, parent_dn="org-root"):
     """
     Gets Dynamic vNIC Connection Policy
@@ -89,6 +92,7 @@ def dynamic_vnic_conn_policy_get(handle, name, parent_dn="org-root"):
     return handle.query_dn(dn)
 
 
+@instrument
 def dynamic_vnic_conn_policy_exists(handle, name, parent_dn="org-root",
                                     **kwargs):
     """
@@ -114,6 +118,7 @@ def dynamic_vnic_conn_policy_exists(handle, name, parent_dn="org-root",
     return (mo_exists, mo if mo_exists else None)
 
 
+@instrument
 def dynamic_vnic_conn_policy_delete(handle, name, parent_dn="org-root"):
     """
     Deletes a Dynamic vNIC Connection Policy
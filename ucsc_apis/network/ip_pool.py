@@ -14,9 +14,207 @@
 """
 This module contains methods required for creating IP Pools.
 """
+import socket
+import struct
+
 from ucscsdk.ucscexception import UcscOperationError
+from ..common.utils import query_mos
+from ..common.hooks import instrument
+from ..common.intervals import IntervalIndex, merge
+
+
+def ip_to_int(ip):
+    """
+    Converts a dotted IPv4 address, e.g. "192.168.1.10", to an integer
+    """
+    try:
+        if str(ip).count(".") != 3:
+            raise ValueError(ip)
+        return struct.unpack("!I", socket.inet_aton(str(ip)))[0]
+    except (ValueError, socket.error):
+        raise UcscOperationError("ip_to_int", "Invalid IP address %s" % ip)
+
+
+def int_to_ip(value):
+    """
+    Converts an integer to a dotted IPv4 address, e.g. "192.168.1.10"
+    """
+    return socket.inet_ntoa(struct.pack("!I", value))
+
+
+def _netmask_to_int(subnet):
+    mask = ip_to_int(subnet)
+    host_bits = ~mask & 0xFFFFFFFF
+    if host_bits & (host_bits + 1):
+        raise UcscOperationError("ip_to_int", "Invalid subnet mask %s"
+                                 % subnet)
+    return mask
+
+
+def _block_problems(r_from, to, subnet, def_gw):
+    """
+    Checks a block on its own: its range must not be empty nor cross the
+    boundary of its subnet, and its gateway, when set, must lie in it.
+    """
+    problems = []
+    start, end, mask = ip_to_int(r_from), ip_to_int(to), \
+        _netmask_to_int(subnet)
+    if start > end:
+        problems.append("range %s-%s is empty" % (r_from, to))
+    if start & mask != end & mask:
+        problems.append("range %s-%s crosses the boundary of subnet %s/%s"
+                        % (r_from, to, int_to_ip(start & mask), subnet))
+    if def_gw and def_gw != "0.0.0.0" and \
+            ip_to_int(def_gw) & mask != start & mask:
+        problems.append("gateway %s is outside subnet %s/%s"
+                        % (def_gw, int_to_ip(start & mask), subnet))
+    return problems
+
+
+class IpBlockIndex(object):
+    """
+    Index of IPv4 address blocks, answering overlap, containment and free
+    range lookups in O(log n).
+
+    The addresses are kept as integers, see IntervalIndex.
+
+    Args:
+        blocks (list): IppoolBlock managed objects
+    """
+
+    def __init__(self, blocks=()):
+        self._index = IntervalIndex((ip_to_int(mo.r_from), ip_to_int(mo.to),
+                                     mo) for mo in blocks)
+
+    def __len__(self):
+        return len(self._index)
+
+    def add(self, mo):
+        """
+        Adds an IppoolBlock to the index
+        """
+        self._index.add(ip_to_int(mo.r_from), ip_to_int(mo.to), mo)
+
+    def overlaps(self, r_from, to):
+        """
+        Finds the blocks sharing at least one address with r_from-to
+
+        Returns:
+            List of IppoolBlock
+        """
+        return [i[2] for i in self._index.overlapping(ip_to_int(r_from),
+                                                      ip_to_int(to))]
+
+    def contains(self, ip):
+        """
+        Finds the blocks containing ip
+
+        Returns:
+            List of IppoolBlock
+        """
+        return [i[2] for i in self._index.containing(ip_to_int(ip))]
+
+    def conflicts(self):
+        """
+        Finds all the pairs of overlapping blocks, across pools and orgs
+
+        Returns:
+            List of (IppoolBlock, IppoolBlock)
+        """
+        return [(a[2], b[2]) for a, b in self._index.conflicts()]
+
+    def check(self, r_from, to, subnet, def_gw=None, dn=None):
+        """
+        Checks a block before it is added: its range must not be empty,
+        cross the boundary of its subnet or overlap another block, and its
+        gateway must lie in its subnet.
+
+        Args:
+            r_from (string): Beginning IP Address
+            to (string): Ending IP Address
+            subnet (string): Subnet mask
+            def_gw (string): default gateway
+            dn (string): dn of the block, not reported as overlapping itself
+
+        Returns:
+            List of problems, as strings, empty if the block is valid
+        """
+        problems = _block_problems(r_from, to, subnet, def_gw)
+        for mo in self.overlaps(r_from, to):
+            if mo.dn != dn:
+                problems.append("range %s-%s overlaps %s"
+                                % (r_from, to, mo.dn))
+        return problems
+
+    def problems(self):
+        """
+        Checks all the blocks of the index
+
+        Returns:
+            List of (IppoolBlock, problem string)
+        """
+        found = []
+        for start, end, mo in self._index:
+            for problem in _block_problems(mo.r_from, mo.to, mo.subnet,
+                                           mo.def_gw):
+                found.append((mo, problem))
+        for mo, other in self.conflicts():
+            found.append((mo, "range %s-%s overlaps %s"
+                          % (mo.r_from, mo.to, other.dn)))
+        return found
+
+    def free_range(self, size, network, subnet, def_gw=None):
+        """
+        Finds the lowest range of size free addresses within a subnet. The
+        network and broadcast addresses of the subnet, and def_gw when
+        given, are never part of the range.
+
+        Args:
+            size (int): number of addresses
+            network (string): any address of the subnet
+            subnet (string): Subnet mask
+            def_gw (string): default gateway of the subnet
+
+        Returns:
+            (r_from, to) OR None if there is no such range
+        """
+        mask = _netmask_to_int(subnet)
+        first = ip_to_int(network) & mask
+        last = first | (~mask & 0xFFFFFFFF)
+        if last - first > 1:
+            first, last = first + 1, last - 1
+        index = self._index
+        if def_gw and def_gw != "0.0.0.0":
+            gateway = ip_to_int(def_gw)
+            index = IntervalIndex(list(index) + [(gateway, gateway, None)])
+        found = index.find_free(size, first, last)
+        if found is None:
+            return None
+        return (int_to_ip(found[0]), int_to_ip(found[1]))
+
+
+@instrument
+def ip_block_index(handle):
+    """
+    Builds the index of the IPv4 address blocks of all the IP pools, in
+    every org, with a single class query.
+
+    Args:
+        handle (UcscHandle)
+
+    Returns:
+        IpBlockIndex
+
+    Example:
+        index = ip_block_index(handle)
+        index.problems()
+        index.check("1.1.1.1", "1.1.1.10", "255.255.255.0", "1.1.1.254")
+        index.free_range(16, "1.1.1.0", "255.255.255.0")
+    """
+    return IpBlockIndex(handle.query_classid("IppoolBlock"))
 
 
+@instrument
 def ip_pool_create(handle, name, descr=None, parent_dn="org-root", **kwargs):
     """
     Creates IP Pool
@@ -51,9 +249,11 @@ def ip_pool_create(handle, name, descr=None, parent_dn="org-root", **kwargs):
     return mo
 
 
+@instrument
 def ip_block_add(handle, ip_pool_name, r_from, to, subnet, def_gw,
                  prim_dns="0.0.0.0", sec_dns="0.0.0.0",
-                 scope="public", parent_dn="org-root", **kwargs):
+                 scope="public", parent_dn="org-root", check=False,
+                 index=None, **kwargs):
     """
     Creates IP Pool block
 
@@ -67,16 +267,27 @@ def ip_block_add(handle, ip_pool_name, r_from, to, subnet, def_gw,
         prim_dns (string): primary DNS server
         sec_dns (string): secondary DNS server
         parent_dn (string) : Dn of org
+        check (bool) : refuse a block which is empty, crosses the boundary
+                   of its subnet, has its gateway outside of it or overlaps
+                   an existing block of any IP pool
+        index (IpBlockIndex) : index of the existing blocks, see
+                   ip_block_index(), checked instead of querying them when
+                   check is True, and updated with the new block
         **kwargs: Any additional key-value pair of managed object(MO)'s
                   property and value, which are not part of regular args.
                   This should be used for future version compatibility.
     Returns:
         IppoolBlock: Managed object
     Raises:
-        UcscOperationError: If the IP Pool does not exist
+        UcscOperationError: If the IP Pool does not exist or, when check is
+                            True, the block is invalid
     Example:
         ip_block_add(handle,ip_pool_name="test_ippool", "1.1.1.1", "1.1.1.10",
                     "255.255.255.0", "1.1.1.254", parent_dn="org-root"):
+
+        index = ip_block_index(handle)
+        ip_block_add(handle,ip_pool_name="test_ippool", "1.1.1.1", "1.1.1.10",
+                    "255.255.255.0", "1.1.1.254", check=True, index=index)
     """
 
     from ucscsdk.mometa.ippool.IppoolBlock import IppoolBlock
@@ -86,7 +297,17 @@ def ip_block_add(handle, ip_pool_name, r_from, to, subnet, def_gw,
     obj = handle.query_dn(ip_pool_dn)
     if not obj:
         raise UcscOperationError("ip_block_add",
-                                 "IP pool '%s' does not exist", ip_pool_dn)
+                                 "IP pool '%s' does not exist" % ip_pool_dn)
+
+    dn = ip_pool_dn + "/block-" + r_from + "-" + to
+    if check:
+        if index is None:
+            index = ip_block_index(handle)
+        problems = index.check(r_from, to, subnet, def_gw, dn=dn)
+        if problems:
+            raise UcscOperationError("ip_block_add",
+                                     "IP block %s is invalid: %s"
+                                     % (dn, "; ".join(problems)))
 
     mo = IppoolBlock(parent_mo_or_dn=obj,
                      r_from=r_from,
@@ -101,9 +322,146 @@ def ip_block_add(handle, ip_pool_name, r_from, to, subnet, def_gw,
 
     handle.add_mo(mo, True)
     handle.commit()
+    if index is not None and dn not in \
+            [other.dn for other in index.overlaps(r_from, to)]:
+        index.add(mo)
     return mo
 
 
+_BLOCK_DEFAULTS = {"prim_dns": "0.0.0.0", "sec_dns": "0.0.0.0",
+                   "scope": "public"}
+
+
+def _ip_blocks_merge(blocks):
+    """
+    Validates block dicts and merges the overlapping and adjacent ones
+    which share all their other properties. A block left as given keeps
+    the spelling of its addresses.
+    """
+    groups = {}
+    for block in blocks:
+        block = dict(_BLOCK_DEFAULTS, **block)
+        for prop in ("r_from", "to", "subnet", "def_gw"):
+            if not block.get(prop):
+                raise UcscOperationError("ip_blocks_add",
+                                         "IP block %s is missing '%s'"
+                                         % (block, prop))
+        problems = _block_problems(block["r_from"], block["to"],
+                                   block["subnet"], block["def_gw"])
+        if problems:
+            raise UcscOperationError("ip_blocks_add",
+                                     "IP block %s-%s is invalid: %s"
+                                     % (block["r_from"], block["to"],
+                                        "; ".join(problems)))
+        r_from, to = block.pop("r_from"), block.pop("to")
+        props = tuple(sorted((prop, str(value))
+                             for prop, value in block.items()))
+        group = groups.setdefault(props, {})
+        group.setdefault((ip_to_int(r_from), ip_to_int(to)), (r_from, to))
+
+    merged = []
+    for props, given in groups.items():
+        for start, end in merge(given):
+            r_from, to = given.get((start, end),
+                                   (int_to_ip(start), int_to_ip(end)))
+            block = dict(props, r_from=r_from, to=to)
+            problems = _block_problems(r_from, to, block["subnet"],
+                                       block["def_gw"])
+            if problems:
+                raise UcscOperationError("ip_blocks_add",
+                                         "IP block %s-%s is invalid: %s"
+                                         % (r_from, to, "; ".join(problems)))
+            merged.append(block)
+    merged.sort(key=lambda block: ip_to_int(block["r_from"]))
+
+    conflicts = IntervalIndex((ip_to_int(block["r_from"]),
+                               ip_to_int(block["to"]), block)
+                              for block in merged).conflicts()
+    if conflicts:
+        a, b = conflicts[0][0][2], conflicts[0][1][2]
+        raise UcscOperationError("ip_blocks_add",
+                                 "IP blocks %s-%s and %s-%s overlap with "
+                                 "different properties"
+                                 % (a["r_from"], a["to"],
+                                    b["r_from"], b["to"]))
+    return merged
+
+
+@instrument
+def ip_blocks_add(handle, ip_pool_name, blocks, parent_dn="org-root",
+                  check=False, index=None):
+    """
+    Adds IP Pool blocks in a single commit
+
+    Every block is validated locally, and overlapping or adjacent blocks
+    sharing subnet, gateway, DNS servers and scope are merged. The IP Pool
+    is resolved once and all the blocks are committed together.
+
+    Args:
+        handle (UcscHandle)
+        ip_pool_name (string) : Name of the IP Pool
+        blocks (list of dict) : blocks, each with the "r_from", "to",
+                   "subnet" and "def_gw" keys and optionally "prim_dns",
+                   "sec_dns", "scope" or any other IppoolBlock property,
+                   see ip_block_add()
+        parent_dn (string) : Dn of org
+        check (bool) : also refuse a block overlapping an existing block
+                   of any IP pool
+        index (IpBlockIndex) : index of the existing blocks, see
+                   ip_block_index(), checked instead of querying them when
+                   check is True, and updated with the new blocks
+    Returns:
+        List of IppoolBlock: Managed objects
+    Raises:
+        UcscOperationError: If the IP Pool does not exist or a block is
+                            invalid
+    Example:
+        ip_blocks_add(handle, "test_ippool",
+                      [{"r_from": "1.1.1.1", "to": "1.1.1.10",
+                        "subnet": "255.255.255.0", "def_gw": "1.1.1.254"},
+                       {"r_from": "1.1.1.11", "to": "1.1.1.20",
+                        "subnet": "255.255.255.0", "def_gw": "1.1.1.254"}])
+    """
+    from ucscsdk.mometa.ippool.IppoolBlock import IppoolBlock
+
+    merged = _ip_blocks_merge(blocks)
+
+    ip_pool_dn = parent_dn + "/ip-pool-" + ip_pool_name
+    obj = handle.query_dn(ip_pool_dn)
+    if not obj:
+        raise UcscOperationError("ip_blocks_add",
+                                 "IP pool '%s' does not exist" % ip_pool_dn)
+
+    if check:
+        if index is None:
+            index = ip_block_index(handle)
+        for block in merged:
+            dn = "%s/block-%s-%s" % (ip_pool_dn, block["r_from"],
+                                     block["to"])
+            for mo in index.overlaps(block["r_from"], block["to"]):
+                if mo.dn != dn:
+                    raise UcscOperationError("ip_blocks_add",
+                                             "IP block %s overlaps %s"
+                                             % (dn, mo.dn))
+
+    mos = []
+    for block in merged:
+        mo = IppoolBlock(parent_mo_or_dn=obj, r_from=block.pop("r_from"),
+                         to=block.pop("to"))
+        mo.set_prop_multiple(**block)
+        handle.add_mo(mo, True)
+        mos.append(mo)
+    handle.commit()
+
+    if index is not None:
+        for mo in mos:
+            if mo.dn not in [other.dn for other in
+                             index.overlaps(mo.r_from, mo.to)]:
+                index.add(mo)
+    return mos
+
+
+@instrument
 def ip_pool_get(handle, name, parent_dn="org-root"):
     """
     Gets IP Pool if already exists
@@ -120,13 +478,16 @@ def ip_pool_get(handle, name, parent_dn="org-root"):
     return handle.query_dn(dn)
 
 
+@instrument
 def ip_pool_exists(handle, name, descr=None,
                    r_from=None, to=None, subnet=None, def_gw=None,
                    prim_dns=None, sec_dns=None,
-                   scope=None, parent_dn="org-root"):
+                   scope=None, parent_dn="org-root", subtree=None):
     """
     Checks if the given IP Pool already exists with the same params
     Note: For ip_pool exist, both "r_from" and "to" must be provided
+    The pool and its block are fetched with a single query, or looked up
+    in subtree when given.
     Args:
         handle (UcscHandle)
         name (string) : Network Control Policy Name
@@ -139,13 +500,21 @@ def ip_pool_exists(handle, name, descr=None,
         sec_dns (string): secondary DNS server
         scope (string) : public or private
         parent_dn (string) : Dn of org
+        subtree (list or dict) : prefetched MOs, e.g. the result of
+                   handle.query_dn(parent_dn, hierarchy=True) or
+                   mo_subtree_index() of it
     Returns:
         (True/False, MO/None)
     Example:
         ip_pool_exists(handle, "sample_ip_pool",
                        "192.168.1.1", "192.168.1.10")
     """
-    mo = ip_pool_get(handle, name, parent_dn)
+    dn = parent_dn + '/ip-pool-' + name
+    dns = [dn]
+    if r_from and to:
+        dns.append(dn + '/block-' + r_from + '-' + to)
+    mos = query_mos(handle, dns, subtree)
+    mo = mos.get(dn)
     if not mo:
         return (False, None)
 
@@ -155,7 +524,7 @@ def ip_pool_exists(handle, name, descr=None,
 
     if r_from and to:
         mo_1_dn = mo.dn + '/block-' + r_from + '-' + to
-        mo_1 = handle.query_dn(mo_1_dn)
+        mo_1 = mos.get(mo_1_dn)
         if not mo_1:
             return (False, None)
         args = {
@@ -170,13 +539,19 @@ def ip_pool_exists(handle, name, descr=None,
     return(True, mo)
 
 
-def ip_pool_remove(handle, name, parent_dn="org-root"):
+@instrument
+def ip_pool_remove(handle, name, parent_dn="org-root",
+                   check_impact=False, impact=None):
     """
     Removes the specified IP Pool
     Args:
         handle (UcscHandle)
         name (string) : IP Pool Name
         parent_dn (string) : Dn of the Org
+        check_impact (bool) : refuse the deletion while a policy, vnic or
+            VLAN references it, see impact_index()
+        impact (ImpactIndex) : checked instead of querying the org and
+            domain group trees when check_impact is True
     Returns:
         None
     Raises:
@@ -190,5 +565,10 @@ def ip_pool_remove(handle, name, parent_dn="org-root"):
         raise UcscOperationError("ip_pool_remove",
                                  "IP pool '%s' does not exist" % name)
 
+    if check_impact:
+        from .reference import _check_impact
+
+        _check_impact("ip_pool_remove", handle, mo.dn, impact)
+
     handle.remove_mo(mo)
     handle.commit()
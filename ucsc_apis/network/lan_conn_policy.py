@@ -15,8 +15,96 @@
 This module contains the methods required for creating LAN Connectivity Policy.
 """
 from ucscsdk.ucscexception import UcscOperationError
+from ..common.hooks import instrument
 
 
+def _vnic_ether(api, parent, name, nw_ctrl_policy_name="global-default",
+                admin_host_port="ANY", admin_vcon="any",
+                stats_policy_name="global-default", admin_cdn_name=None,
+                switch_id="A", pin_to_group_name=None, mtu="1500",
+                qos_policy_name=None, adaptor_profile_name=None,
+                cdn_source="vnic-name", ident_pool_name=None,
+                order="unspecified", nw_templ_name=None, addr="derived",
+                vlans=None, **kwargs):
+    """
+    Builds a VnicEther, along with a VnicEtherIf per VLAN, under parent
+    """
+    from ucscsdk.mometa.vnic.VnicEther import VnicEther
+    from ucscsdk.mometa.vnic.VnicEtherIf import VnicEtherIf
+
+    if cdn_source not in ['vnic-name', 'user-defined']:
+        raise UcscOperationError(api, "Invalid CDN source name")
+
+    admin_cdn_name = "" if cdn_source == "vnic-name" else admin_cdn_name
+
+    mo = VnicEther(parent_mo_or_dn=parent,
+                   name=name,
+                   nw_ctrl_policy_name=nw_ctrl_policy_name,
+                   admin_host_port=admin_host_port,
+                   admin_vcon=admin_vcon,
+                   stats_policy_name=stats_policy_name,
+                   admin_cdn_name=admin_cdn_name,
+                   switch_id=switch_id,
+                   pin_to_group_name=pin_to_group_name,
+                   mtu=mtu,
+                   qos_policy_name=qos_policy_name,
+                   adaptor_profile_name=adaptor_profile_name,
+                   ident_pool_name=ident_pool_name,
+                   order=order,
+                   nw_templ_name=nw_templ_name,
+                   cdn_source=cdn_source,
+                   addr=addr)
+
+    mo.set_prop_multiple(**kwargs)
+
+    for vlan in vlans or []:
+        if not isinstance(vlan, dict):
+            vlan = {"name": vlan}
+        VnicEtherIf(parent_mo_or_dn=mo, **vlan)
+    return mo
+
+
+def _vnic_iscsi(api, parent, name, addr="derived", admin_host_port="ANY",
+                admin_vcon="any", stats_policy_name="global-default",
+                admin_cdn_name=None, cdn_source="vnic-name", switch_id="A",
+                pin_to_group_name=None, vnic_name=None, qos_policy_name=None,
+                adaptor_profile_name="global-default", ident_pool_name=None,
+                order="unspecified", nw_templ_name=None, vlan_name="default",
+                **kwargs):
+    """
+    Builds a VnicIScsiLCP, along with its VnicVlan, under parent
+    """
+    from ucscsdk.mometa.vnic.VnicIScsiLCP import VnicIScsiLCP
+    from ucscsdk.mometa.vnic.VnicVlan import VnicVlan
+
+    if cdn_source not in ['vnic-name', 'user-defined']:
+        raise UcscOperationError(api, "Invalid CDN source name")
+
+    admin_cdn_name = "" if cdn_source == "vnic-name" else admin_cdn_name
+    mo = VnicIScsiLCP(parent_mo_or_dn=parent,
+                      addr=addr,
+                      admin_host_port=admin_host_port,
+                      admin_vcon=admin_vcon,
+                      stats_policy_name=stats_policy_name,
+                      cdn_source=cdn_source,
+                      admin_cdn_name=admin_cdn_name,
+                      switch_id=switch_id,
+                      pin_to_group_name=pin_to_group_name,
+                      vnic_name=vnic_name,
+                      qos_policy_name=qos_policy_name,
+                      adaptor_profile_name=adaptor_profile_name,
+                      ident_pool_name=ident_pool_name,
+                      order=order,
+                      nw_templ_name=nw_templ_name,
+                      name=name)
+
+    mo.set_prop_multiple(**kwargs)
+
+    VnicVlan(parent_mo_or_dn=mo, name="", vlan_name=vlan_name)
+    return mo
+
+
+@instrument
 def lan_conn_policy_create(handle, name, descr=None, parent_dn="org-root",
                            **kwargs):
     """
@@ -53,6 +141,99 @@ def lan_conn_policy_create(handle, name, descr=None, parent_dn="org-root",
     return mo
 
 
+def _check_references(api, handle, references, vnics, iscsi_vnics, org_dn):
+    from .reference import reference_index
+
+    if references is None:
+        references = reference_index(handle)
+    problems = references.check_vnics(vnics, iscsi_vnics, org_dn)
+    if problems:
+        raise UcscOperationError(api, "Unresolved references: %s"
+                                 % "; ".join("%s: %s" % (name,
+                                                         ", ".join(found))
+                                             for name, found
+                                             in sorted(problems.items())))
+
+
+@instrument
+def lan_conn_policy_build(handle, name, vnics=None, iscsi_vnics=None,
+                          descr=None, parent_dn="org-root",
+                          check_references=False, references=None,
+                          **kwargs):
+    """
+    Creates or updates a LAN Connectivity Policy along with all its vNICs,
+    their VLANs and its iSCSI vNICs
+
+    The whole subtree is built locally and sent with a single
+    add_mo(modify_present=True) commit, without any query. vNICs and VLANs
+    of an existing policy which are not in the definition are left as
+    they are.
+
+    Args:
+        handle (UcscHandle)
+        name (string) : LAN Connectivity Policy name
+        vnics (list of dict) : vnics, each a dict of the lcp_vnic_add()
+                  arguments, including "name" and optionally "vlans"
+        iscsi_vnics (list of dict) : iscsi vnics, each a dict of the
+                  lcp_iscsi_vnic_add() arguments, including "name" and
+                  optionally "vlan_name"
+        descr (string): description
+        parent_dn (string) : Dn of org
+        check_references (bool) : refuse vnics referencing policies, pools
+                  or VLANs which do not exist, see reference_index()
+        references (ReferenceIndex) : checked instead of querying the
+                  referenced classes when check_references is True
+        **kwargs: Any additional key-value pair of managed object(MO)'s
+                  property and value, which are not part of regular args.
+                  This should be used for future version compatibility.
+    Returns:
+        VnicLanConnPolicy: Managed Object
+    Raises:
+        UcscOperationError: If a vnic definition is invalid or, when
+                            check_references is True, has unresolved
+                            references
+    Example:
+        lan_conn_policy_build(
+            handle, "esx_lcp",
+            vnics=[{"name": "eth0", "switch_id": "A", "order": "1",
+                    "vlans": [{"name": "vlan100", "default_net": "yes"},
+                              "vlan200"]},
+                   {"name": "eth1", "switch_id": "B", "order": "2",
+                    "vlans": ["vlan100", "vlan200"]}],
+            iscsi_vnics=[{"name": "iscsi0", "vnic_name": "eth0",
+                          "vlan_name": "vlan300"}])
+    """
+    from ucscsdk.mometa.vnic.VnicLanConnPolicy import VnicLanConnPolicy
+
+    if check_references:
+        _check_references("lan_conn_policy_build", handle, references,
+                          vnics, iscsi_vnics, parent_dn)
+
+    mo = VnicLanConnPolicy(parent_mo_or_dn=parent_dn,
+                           name=name,
+                           descr=descr)
+
+    mo.set_prop_multiple(**kwargs)
+
+    for vnic in vnics or []:
+        vnic = dict(vnic)
+        if not vnic.get("name"):
+            raise UcscOperationError("lan_conn_policy_build",
+                                     "vnic %s is missing 'name'" % vnic)
+        _vnic_ether("lan_conn_policy_build", mo, **vnic)
+    for vnic in iscsi_vnics or []:
+        vnic = dict(vnic)
+        if not vnic.get("name"):
+            raise UcscOperationError("lan_conn_policy_build",
+                                     "iscsi vnic %s is missing 'name'" % vnic)
+        _vnic_iscsi("lan_conn_policy_build", mo, **vnic)
+
+    handle.add_mo(mo, modify_present=True)
+    handle.commit()
+    return mo
+
+
+@instrument
 def lan_conn_policy_get(handle, name, parent_dn="org-root"):
     """
     Gets the given LAN Connectivity Policy if exists
@@ -69,6 +250,7 @@ def lan_conn_policy_get(handle, name, parent_dn="org-root"):
     return handle.query_dn(dn)
 
 
+@instrument
 def lan_conn_policy_exists(handle, name, parent_dn="org-root", **kwargs):
     """
     Checks if the given LAN Connectivity Policy already exists
@@ -91,6 +273,7 @@ def lan_conn_policy_exists(handle, name, parent_dn="org-root", **kwargs):
     return (mo_exists, mo if mo_exists else None)
 
 
+@instrument
 def lan_conn_policy_delete(handle, name, parent_dn="org-root"):
     """
     Deletes a LAN Connectivity Policy
@@ -111,6 +294,7 @@ def lan_conn_policy_delete(handle, name, parent_dn="org-root"):
     handle.commit()
 
 
+@instrument
 def lcp_vnic_add(handle, name, parent_dn, nw_ctrl_policy_name="global-default",
                  admin_host_port="ANY", admin_vcon="any",
                  stats_policy_name="global-default", admin_cdn_name=None,
@@ -118,7 +302,8 @@ def lcp_vnic_add(handle, name, parent_dn, nw_ctrl_policy_name="global-default",
                  qos_policy_name=None, adaptor_profile_name=None,
                  cdn_source="vnic-name",
                  ident_pool_name=None, order="unspecified", nw_templ_name=None,
-                 addr="derived", **kwargs):
+                 addr="derived", vlans=None, check_references=False,
+                 references=None, **kwargs):
     """
     Adds vNIC to LAN Connectivity Policy
 
@@ -141,56 +326,70 @@ def lcp_vnic_add(handle, name, parent_dn, nw_ctrl_policy_name="global-default",
         order (string) : Order of the vnic
         nw_templ_name (string) : Network template name
         addr (string) : Address of the vnic
+        vlans (list) : VLANs of the vnic, as VLAN names or dicts of
+                  VnicEtherIf properties, e.g. {"name": "vlan100",
+                  "default_net": "yes"}
+        check_references (bool) : refuse policies, pools or VLANs which do
+                  not exist, see reference_index()
+        references (ReferenceIndex) : checked instead of querying the
+                  referenced classes when check_references is True
         **kwargs: Any additional key-value pair of managed object(MO)'s
                   property and value, which are not part of regular args.
                   This should be used for future version compatibility.
     Returns:
         VnicEther: Managed Object
+    Raises:
+        UcscOperationError: If the LAN connectivity policy does not exist
+                            or, when check_references is True, a reference
+                            does not resolve
 
     Example:
         lcp_vnic_add(handle, "test_vnic", "org-root/lan-conn-pol-lcp_test_pol",
                  nw_ctrl_policy_name="test_nwpol", switch_id= "A",mtu="2240",
                  adaptor_profile_name="global-SRIOV")
     """
-    from ucscsdk.mometa.vnic.VnicEther import VnicEther
-
     mo = handle.query_dn(parent_dn)
     if not mo:
         raise UcscOperationError("lcp_vnic_add",
                                  "LAN connectivity policy '%s' does not exist"
                                  % parent_dn)
 
-    if cdn_source not in ['vnic-name', 'user-defined']:
-        raise UcscOperationError("lcp_vnic_add",
-                                 "Invalid CDN source name")
-
-    admin_cdn_name = "" if cdn_source == "vnic-name" else admin_cdn_name
-
-    mo_1 = VnicEther(parent_mo_or_dn=mo,
-                     name=name,
-                     nw_ctrl_policy_name=nw_ctrl_policy_name,
-                     admin_host_port=admin_host_port,
-                     admin_vcon=admin_vcon,
-                     stats_policy_name=stats_policy_name,
-                     admin_cdn_name=admin_cdn_name,
-                     switch_id=switch_id,
-                     pin_to_group_name=pin_to_group_name,
-                     mtu=mtu,
-                     qos_policy_name=qos_policy_name,
-                     adaptor_profile_name=adaptor_profile_name,
-                     ident_pool_name=ident_pool_name,
-                     order=order,
-                     nw_templ_name=nw_templ_name,
-                     cdn_source=cdn_source,
-                     addr=addr)
-
-    mo_1.set_prop_multiple(**kwargs)
+    if check_references:
+        vnic = {"name": name, "nw_ctrl_policy_name": nw_ctrl_policy_name,
+                "stats_policy_name": stats_policy_name,
+                "pin_to_group_name": pin_to_group_name,
+                "qos_policy_name": qos_policy_name,
+                "adaptor_profile_name": adaptor_profile_name,
+                "ident_pool_name": ident_pool_name,
+                "nw_templ_name": nw_templ_name, "vlans": vlans}
+        _check_references("lcp_vnic_add", handle, references, [vnic], None,
+                          parent_dn.rpartition("/")[0])
+
+    mo_1 = _vnic_ether("lcp_vnic_add", mo, name,
+                       nw_ctrl_policy_name=nw_ctrl_policy_name,
+                       admin_host_port=admin_host_port,
+                       admin_vcon=admin_vcon,
+                       stats_policy_name=stats_policy_name,
+                       admin_cdn_name=admin_cdn_name,
+                       switch_id=switch_id,
+                       pin_to_group_name=pin_to_group_name,
+                       mtu=mtu,
+                       qos_policy_name=qos_policy_name,
+                       adaptor_profile_name=adaptor_profile_name,
+                       cdn_source=cdn_source,
+                       ident_pool_name=ident_pool_name,
+                       order=order,
+                       nw_templ_name=nw_templ_name,
+                       addr=addr,
+                       vlans=vlans,
+                       **kwargs)
 
     handle.add_mo(mo_1, modify_present=True)
     handle.commit()
     return mo_1
 
 
+@instrument
 def lcp_vnic_get(handle, name, parent_dn):
     """
     Gets the vNIC under given Lan Connectivity Policy
@@ -211,6 +410,7 @@ def lcp_vnic_get(handle, name, parent_dn):
     return handle.query_dn(dn)
 
 
+@instrument
 def lcp_vnic_exists(handle, name, parent_dn, **kwargs):
     """
     Checks if the given vNIC already exists with the same params under a
@@ -236,6 +436,7 @@ def lcp_vnic_exists(handle, name, parent_dn, **kwargs):
     return (mo_exists, mo if mo_exists else None)
 
 
+@instrument
 def lcp_vnic_delete(handle, name, parent_dn):
     """
     Remove vNIC from LAN Connectivity Policy
@@ -258,6 +459,7 @@ def lcp_vnic_delete(handle, name, parent_dn):
     handle.commit()
 
 
+@instrument
 def lcp_iscsi_vnic_add(handle, name, parent_dn, addr="derived",
                        admin_host_port="ANY",
                        admin_vcon="any", stats_policy_name="global-default",
@@ -302,46 +504,36 @@ def lcp_iscsi_vnic_add(handle, name, parent_dn, addr="derived",
                            vnic_name="vnic1",
                            adaptor_profile_name="global-SRIOV")
     """
-    from ucscsdk.mometa.vnic.VnicIScsiLCP import VnicIScsiLCP
-    from ucscsdk.mometa.vnic.VnicVlan import VnicVlan
-
     mo = handle.query_dn(parent_dn)
     if not mo:
         raise UcscOperationError("lcp_iscsi_vnic_add",
                                  "LAN connectivity policy '%s' does not exist"
                                  % parent_dn)
 
-    if cdn_source not in ['vnic-name', 'user-defined']:
-        raise UcscOperationError("lcp_iscsi_vnic_add",
-                                 "Invalid CDN source name")
-
-    admin_cdn_name = "" if cdn_source == "vnic-name" else admin_cdn_name
-    mo_1 = VnicIScsiLCP(parent_mo_or_dn=mo,
-                        addr=addr,
-                        admin_host_port=admin_host_port,
-                        admin_vcon=admin_vcon,
-                        stats_policy_name=stats_policy_name,
-                        cdn_source=cdn_source,
-                        admin_cdn_name=admin_cdn_name,
-                        switch_id=switch_id,
-                        pin_to_group_name=pin_to_group_name,
-                        vnic_name=vnic_name,
-                        qos_policy_name=qos_policy_name,
-                        adaptor_profile_name=adaptor_profile_name,
-                        ident_pool_name=ident_pool_name,
-                        order=order,
-                        nw_templ_name=nw_templ_name,
-                        name=name)
-
-    mo_1.set_prop_multiple(**kwargs)
-
-    VnicVlan(parent_mo_or_dn=mo_1, name="", vlan_name=vlan_name)
+    mo_1 = _vnic_iscsi("lcp_iscsi_vnic_add", mo, name,
+                       addr=addr,
+                       admin_host_port=admin_host_port,
+                       admin_vcon=admin_vcon,
+                       stats_policy_name=stats_policy_name,
+                       admin_cdn_name=admin_cdn_name,
+                       cdn_source=cdn_source,
+                       switch_id=switch_id,
+                       pin_to_group_name=pin_to_group_name,
+                       vnic_name=vnic_name,
+                       qos_policy_name=qos_policy_name,
+                       adaptor_profile_name=adaptor_profile_name,
+                       ident_pool_name=ident_pool_name,
+                       order=order,
+                       nw_templ_name=nw_templ_name,
+                       vlan_name=vlan_name,
+                       **kwargs)
 
     handle.add_mo(mo_1)
     handle.commit()
     return mo_1
 
 
+@instrument
 def lcp_iscsi_vnic_get(handle, name, parent_dn):
     """
     Gets iSCSI vNIC under a given Lan Connectivity Policy
@@ -362,6 +554,7 @@ def lcp_iscsi_vnic_get(handle, name, parent_dn):
     return handle.query_dn(dn)
 
 
+@instrument
 def lcp_iscsi_vnic_exists(handle, name, parent_dn, **kwargs):
     """
     Checks if the given iSCSI vNIC already exists with the same params
@@ -386,6 +579,7 @@ def lcp_iscsi_vnic_exists(handle, name, parent_dn, **kwargs):
     return (mo_exists, mo if mo_exists else None)
 
 
+@instrument
 def lcp_iscsi_vnic_delete(handle, name, parent_dn):
     """
     Remove iSCSI vNIC from LAN Connectivity Policy
@@ -14,13 +14,186 @@
 This module contains methods required for creating MAC Pools.
 """
 from ucscsdk.ucscexception import UcscOperationError
+from ..common.utils import query_mos
+from ..common.hooks import instrument
+from ..common.intervals import IntervalIndex, merge
 
 
-def mac_pool_create(handle, name, r_from, to, descr=None, parent_dn="org-root",
-                    **kwargs):
+def mac_to_int(mac):
+    """
+    Converts a MAC address, e.g. "00:25:B5:00:00:0A", to a 48 bit integer
+    """
+    digits = str(mac).replace(":", "").replace("-", "")
+    try:
+        if len(digits) != 12:
+            raise ValueError(mac)
+        return int(digits, 16)
+    except ValueError:
+        raise UcscOperationError("mac_to_int",
+                                 "Invalid MAC address %s" % mac)
+
+
+def int_to_mac(value):
+    """
+    Converts a 48 bit integer to a MAC address, e.g. "00:25:B5:00:00:0A"
+    """
+    digits = "%012X" % value
+    return ":".join(digits[i:i + 2] for i in range(0, 12, 2))
+
+
+class MacBlockIndex(object):
+    """
+    Index of MAC address blocks, answering overlap, containment and free
+    range lookups in O(log n).
+
+    The addresses are kept as 48 bit integers, see IntervalIndex.
+
+    Args:
+        blocks (list): MacpoolBlock managed objects
+    """
+
+    def __init__(self, blocks=()):
+        self._index = IntervalIndex((mac_to_int(mo.r_from),
+                                     mac_to_int(mo.to), mo)
+                                    for mo in blocks)
+
+    def __len__(self):
+        return len(self._index)
+
+    def add(self, mo):
+        """
+        Adds a MacpoolBlock to the index
+        """
+        self._index.add(mac_to_int(mo.r_from), mac_to_int(mo.to), mo)
+
+    def overlaps(self, r_from, to):
+        """
+        Finds the blocks sharing at least one address with r_from-to
+
+        Returns:
+            List of MacpoolBlock
+        """
+        return [i[2] for i in self._index.overlapping(mac_to_int(r_from),
+                                                      mac_to_int(to))]
+
+    def contains(self, mac):
+        """
+        Finds the blocks containing mac
+
+        Returns:
+            List of MacpoolBlock
+        """
+        return [i[2] for i in self._index.containing(mac_to_int(mac))]
+
+    def conflicts(self):
+        """
+        Finds all the pairs of overlapping blocks
+
+        Returns:
+            List of (MacpoolBlock, MacpoolBlock)
+        """
+        return [(a[2], b[2]) for a, b in self._index.conflicts()]
+
+    def free_range(self, size, r_from="00:25:B5:00:00:00",
+                   to="00:25:B5:FF:FF:FF"):
+        """
+        Finds the lowest range of size free addresses within r_from-to
+
+        Returns:
+            (r_from, to) OR None if there is no such range
+        """
+        found = self._index.find_free(size, mac_to_int(r_from),
+                                      mac_to_int(to))
+        if found is None:
+            return None
+        return (int_to_mac(found[0]), int_to_mac(found[1]))
+
+
+@instrument
+def mac_block_index(handle):
+    """
+    Builds the index of the MAC address blocks of all the MAC pools, in
+    every org, with a single class query.
+
+    Args:
+        handle (UcscHandle)
+
+    Returns:
+        MacBlockIndex
+
+    Example:
+        index = mac_block_index(handle)
+        index.overlaps("00:25:B5:00:00:00", "00:25:B5:00:00:FF")
+        index.conflicts()
+        index.free_range(256)
+    """
+    return MacBlockIndex(handle.query_classid("MacpoolBlock"))
+
+
+def _check_mac_overlap(api, index, r_from, to, dn):
+    overlaps = [mo for mo in index.overlaps(r_from, to) if mo.dn != dn]
+    if overlaps:
+        raise UcscOperationError(api, "MAC block %s-%s overlaps %s"
+                                 % (r_from, to,
+                                    ", ".join(mo.dn for mo in overlaps)))
+
+
+def _mac_blocks_merge(api, blocks):
+    """
+    Validates (r_from, to) blocks and merges the overlapping and adjacent
+    ones. A block left as given keeps the spelling of its addresses.
+    """
+    given = {}
+    for block in blocks:
+        if isinstance(block, dict):
+            block = (block.get("r_from"), block.get("to"))
+        r_from, to = block
+        start, end = mac_to_int(r_from), mac_to_int(to)
+        if start > end:
+            raise UcscOperationError(api, "MAC block %s-%s is empty"
+                                     % (r_from, to))
+        given.setdefault((start, end), (r_from, to))
+    return [given.get((start, end), (int_to_mac(start), int_to_mac(end)))
+            for start, end in merge(given)]
+
+
+def _mac_blocks_add(api, handle, pool, blocks, check_overlap, index):
+    """
+    Builds the MacpoolBlock children of pool, checking them against the
+    index first when check_overlap is True
+    """
+    from ucscsdk.mometa.macpool.MacpoolBlock import MacpoolBlock
+
+    blocks = _mac_blocks_merge(api, blocks)
+    if check_overlap:
+        if index is None:
+            index = mac_block_index(handle)
+        for r_from, to in blocks:
+            _check_mac_overlap(api, index, r_from, to,
+                               "%s/block-%s-%s" % (pool.dn, r_from, to))
+    return [MacpoolBlock(parent_mo_or_dn=pool, r_from=r_from, to=to)
+            for r_from, to in blocks], index
+
+
+def _mac_index_add(index, blocks):
+    if index is None:
+        return
+    for block in blocks:
+        if block.dn not in [other.dn for other in
+                            index.overlaps(block.r_from, block.to)]:
+            index.add(block)
+
+
+@instrument
+def mac_pool_create(handle, name, r_from=None, to=None, descr=None,
+                    parent_dn="org-root", check_overlap=False, index=None,
+                    blocks=None, **kwargs):
     """
     Creates MAC Pool
 
+    The pool and all its blocks are sent in a single commit. Overlapping
+    and adjacent blocks are merged first.
+
     Args:
         handle (UcscHandle)
         name (string) : Mac Pool Name
@@ -28,18 +201,45 @@ def mac_pool_create(handle, name, r_from, to, descr=None, parent_dn="org-root",
         to (string) : Ending MAC Address
         descr (string) : description
         parent_dn (string) : Dn of the Org
+        check_overlap (bool) : refuse a block overlapping an existing block
+                   of any MAC pool
+        index (MacBlockIndex) : index of the existing blocks, see
+                   mac_block_index(), checked instead of querying them when
+                   check_overlap is True, and updated with the new blocks
+        blocks (list) : additional blocks, as (r_from, to) tuples or dicts
+                   with "r_from" and "to"
         **kwargs: Any additional key-value pair of managed object(MO)'s
                   property and value, which are not part of regular args.
                   This should be used for future version compatibility.
     Returns:
-        None
+        MacpoolPool: Managed Object
+
+    Raises:
+        UcscOperationError: If the org does not exist, a block is invalid
+                            or, when check_overlap is True, a block
+                            overlaps an existing one
 
     Example:
         mac_pool_create(handle, "sample_mac_pool",
                     "00:25:B5:00:00:00", "00:25:B5:00:00:03")
+
+        mac_pool_create(handle, "sample_mac_pool",
+                    blocks=[("00:25:B5:00:00:00", "00:25:B5:00:00:0F"),
+                            ("00:25:B5:00:01:00", "00:25:B5:00:01:0F")])
+
+        index = mac_block_index(handle)
+        mac_pool_create(handle, "sample_mac_pool",
+                    "00:25:B5:00:00:00", "00:25:B5:00:00:03",
+                    check_overlap=True, index=index)
     """
     from ucscsdk.mometa.macpool.MacpoolPool import MacpoolPool
-    from ucscsdk.mometa.macpool.MacpoolBlock import MacpoolBlock
+
+    blocks = list(blocks or [])
+    if r_from or to:
+        blocks.insert(0, (r_from, to))
+    if not blocks:
+        raise UcscOperationError("mac_pool_create",
+                                 "At least one MAC block is required")
 
     obj = handle.query_dn(parent_dn)
     if not obj:
@@ -52,15 +252,61 @@ def mac_pool_create(handle, name, r_from, to, descr=None, parent_dn="org-root",
 
     mo.set_prop_multiple(**kwargs)
 
-    MacpoolBlock(parent_mo_or_dn=mo,
-                 to=to,
-                 r_from=r_from)
+    block_mos, index = _mac_blocks_add("mac_pool_create", handle, mo, blocks,
+                                       check_overlap, index)
 
     handle.add_mo(mo, modify_present=True)
     handle.commit()
+    _mac_index_add(index, block_mos)
     return mo
 
 
+@instrument
+def mac_block_add_many(handle, pool, blocks, parent_dn="org-root",
+                       check_overlap=False, index=None):
+    """
+    Adds blocks to an existing MAC Pool in a single commit. Overlapping and
+    adjacent blocks are merged first.
+
+    Args:
+        handle (UcscHandle)
+        pool (string) : Mac Pool Name
+        blocks (list) : blocks, as (r_from, to) tuples or dicts with
+                   "r_from" and "to"
+        parent_dn (string) : Dn of the Org
+        check_overlap (bool) : refuse a block overlapping an existing block
+                   of any MAC pool
+        index (MacBlockIndex) : index of the existing blocks, see
+                   mac_block_index(), checked instead of querying them when
+                   check_overlap is True, and updated with the new blocks
+    Returns:
+        List of MacpoolBlock: Managed Objects
+
+    Raises:
+        UcscOperationError: If the MAC Pool does not exist, a block is
+                            invalid or, when check_overlap is True, a block
+                            overlaps an existing one
+
+    Example:
+        mac_block_add_many(handle, "sample_mac_pool",
+                    [("00:25:B5:00:02:00", "00:25:B5:00:02:0F"),
+                     ("00:25:B5:00:02:10", "00:25:B5:00:02:1F")])
+    """
+    obj = mac_pool_get(handle, pool, parent_dn)
+    if not obj:
+        raise UcscOperationError("mac_block_add_many",
+                                 "MAC pool %s does not exist" % pool)
+
+    block_mos, index = _mac_blocks_add("mac_block_add_many", handle, obj,
+                                       blocks, check_overlap, index)
+    for block in block_mos:
+        handle.add_mo(block, modify_present=True)
+    handle.commit()
+    _mac_index_add(index, block_mos)
+    return block_mos
+
+
+@instrument
 def mac_pool_get(handle, name, parent_dn="org-root"):
     """
     Gets the MAC Pool
@@ -77,11 +323,14 @@ def mac_pool_get(handle, name, parent_dn="org-root"):
     return handle.query_dn(dn)
 
 
+@instrument
 def mac_pool_exists(handle, name, descr=None,
-                    r_from=None, to=None, parent_dn="org-root"):
+                    r_from=None, to=None, parent_dn="org-root", subtree=None):
     """
     Checks if the given MAC Pool already exists with the same params
     Note: For mac_pool exist, both "r_from" and "to" must be provided
+    The pool and its block are fetched with a single query, or looked up
+    in subtree when given.
     Args:
         handle (UcscHandle)
         name (string) : Network Control Policy Name
@@ -89,13 +338,27 @@ def mac_pool_exists(handle, name, descr=None,
         to (string) : Ending MAC Address
         descr (string) : description
         parent_dn (string) : Dn of the Org
+        subtree (list or dict) : prefetched MOs, e.g. the result of
+                   handle.query_dn(parent_dn, hierarchy=True) or
+                   mo_subtree_index() of it
     Returns:
         (True/False, MO/None)
     Example:
         bool_var = mac_pool_exists(handle, "sample_mac_pool",
                         "00:25:B5:00:00:00", "00:25:B5:00:00:03")
+
+        subtree = mo_subtree_index(handle.query_dn("org-root",
+                                                   hierarchy=True))
+        bool_var = mac_pool_exists(handle, "sample_mac_pool",
+                        "00:25:B5:00:00:00", "00:25:B5:00:00:03",
+                        subtree=subtree)
     """
-    mo = mac_pool_get(handle, name, parent_dn)
+    dn = parent_dn + '/mac-pool-' + name
+    dns = [dn]
+    if r_from and to:
+        dns.append(dn + '/block-' + r_from + '-' + to)
+    mos = query_mos(handle, dns, subtree)
+    mo = mos.get(dn)
     if not mo:
         return (False, None)
 
@@ -105,19 +368,25 @@ def mac_pool_exists(handle, name, descr=None,
 
     if r_from and to:
         mo_1_dn = mo.dn + '/block-' + r_from + '-' + to
-        mo_1 = handle.query_dn(mo_1_dn)
+        mo_1 = mos.get(mo_1_dn)
         if not mo_1:
             return (False, None)
     return (True, mo)
 
 
-def mac_pool_remove(handle, name, parent_dn="org-root"):
+@instrument
+def mac_pool_remove(handle, name, parent_dn="org-root",
+                    check_impact=False, impact=None):
     """
     Removes the specified MAC Pool
     Args:
         handle (UcscHandle)
         name (string) : MAC Pool Name
         parent_dn (string) : Dn of the Org
+        check_impact (bool) : refuse the deletion while a policy, vnic or
+            VLAN references it, see impact_index()
+        impact (ImpactIndex) : checked instead of querying the org and
+            domain group trees when check_impact is True
     Returns:
         None
     Raises:
@@ -131,5 +400,10 @@ def mac_pool_remove(handle, name, parent_dn="org-root"):
         raise UcscOperationError("mac_pool_remove",
                                  "MAC pool %s does not exist" % name)
 
+    if check_impact:
+        from .reference import _check_impact
+
+        _check_impact("mac_pool_remove", handle, mo.dn, impact)
+
     handle.remove_mo(mo)
     handle.commit()
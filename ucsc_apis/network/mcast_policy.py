@@ -15,8 +15,10 @@
 This module performs the create the mulitcast policer under the specified org
 """
 from ucscsdk.ucscexception import UcscOperationError
+from ..common.hooks import instrument
 
 
+@instrument
 def mcast_policy_create(handle, name, querier_state="disabled",
                         snooping_state="disabled",
                         querier_ip_addr="0.0.0.0",
@@ -63,6 +65,7 @@ def mcast_policy_create(handle, name, querier_state="disabled",
     return mcast_policy
 
 
+@instrument
 def mcast_policy_get(handle, name, parent_dn="org-root"):
     """
     Gets the mcast policy
@@ -82,6 +85,7 @@ def mcast_policy_get(handle, name, parent_dn="org-root"):
     return handle.query_dn(dn)
 
 
+@instrument
 def mcast_policy_exists(handle, name, parent_dn="org-root", **kwargs):
     """
     Checks if the mcast policy object exists
@@ -108,7 +112,9 @@ def mcast_policy_exists(handle, name, parent_dn="org-root", **kwargs):
     return (mo_exists, mo if mo_exists else None)
 
 
-def mcast_policy_delete(handle, name, parent_dn="org-root"):
+@instrument
+def mcast_policy_delete(handle, name, parent_dn="org-root",
+                        check_impact=False, impact=None):
     """
     Deletes a Multicast Policy
 
@@ -116,6 +122,10 @@ def mcast_policy_delete(handle, name, parent_dn="org-root"):
         handle (UcscHandle)
         name (string): Name of the policy
         parent_dn (string): Dn of org
+        check_impact (bool) : refuse the deletion while a policy, vnic or
+            VLAN references it, see impact_index()
+        impact (ImpactIndex) : checked instead of querying the org and
+            domain group trees when check_impact is True
 
     Returns:
         None
@@ -129,5 +139,10 @@ def mcast_policy_delete(handle, name, parent_dn="org-root"):
         raise UcscOperationError("mcast_policy_delete",
                                  "Mcast policy does not exist")
 
+    if check_impact:
+        from .reference import _check_impact
+
+        _check_impact("mcast_policy_delete", handle, mo.dn, impact)
+
     handle.remove_mo(mo)
     handle.commit()
@@ -15,8 +15,11 @@
 This module contains methods required for creating network control policies.
 """
 from ucscsdk.ucscexception import UcscOperationError
+from ..common.utils import query_subtree
+from ..common.hooks import instrument
 
 
+@instrument
 def nwctrl_policy_create(handle, name, descr=None, cdp="disabled",
                          mac_register_mode="only-native-vlan",
                          uplink_fail_action="link-down",
@@ -77,6 +80,7 @@ def nwctrl_policy_create(handle, name, descr=None, cdp="disabled",
     return mo
 
 
+@instrument
 def nwctrl_policy_get(handle, name, parent_dn="org-root"):
     """
     Checks if the given Network Control Policy already exists with the
@@ -96,15 +100,22 @@ def nwctrl_policy_get(handle, name, parent_dn="org-root"):
     return handle.query_dn(dn)
 
 
-def nwctrl_policy_exists(handle, name, parent_dn="org-root", **kwargs):
+@instrument
+def nwctrl_policy_exists(handle, name, parent_dn="org-root", subtree=None,
+                         **kwargs):
     """
     Checks if the given Network Control Policy already exists with the
     same params
+    The policy and its mac security object are fetched with a single query,
+    or looked up in subtree when given.
 
     Args:
         handle (UcscHandle)
         name (string) : Network Control Policy Name
         parent_dn (string) : Org Dn or Domain_group Dn
+        subtree (list or dict) : prefetched MOs, e.g. the result of
+                   handle.query_dn(parent_dn, hierarchy=True) or
+                   mo_subtree_index() of it
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
@@ -116,19 +127,21 @@ def nwctrl_policy_exists(handle, name, parent_dn="org-root", **kwargs):
                                         "link-down", "allow", "disabled",
                                         "disabled")
     """
-    mo = nwctrl_policy_get(handle, name, parent_dn)
+    dn = parent_dn + '/nwctrl-' + name
+    mos = query_subtree(handle, dn, subtree)
+    mo = mos.get(dn)
     if not mo:
         return (False, None)
 
     if "forge" in kwargs:
         mo_1_dn = mo.dn + "/mac-sec"
-        mo_1 = handle.query_dn(mo_1_dn)
+        mo_1 = mos.get(mo_1_dn)
         if not mo_1:
             raise UcscOperationError("nwctrl_policy_exists",
                                      "Mac secure object does not exist")
 
         args = {'forge': kwargs['forge']}
-        if not mo.check_prop_match(**args):
+        if not mo_1.check_prop_match(**args):
             return (False, None)
 
         kwargs.pop('forge', None)
@@ -137,13 +150,19 @@ def nwctrl_policy_exists(handle, name, parent_dn="org-root", **kwargs):
     return (mo_exists, mo if mo_exists else None)
 
 
-def nwctrl_policy_delete(handle, name, parent_dn="org-root"):
+@instrument
+def nwctrl_policy_delete(handle, name, parent_dn="org-root",
+                         check_impact=False, impact=None):
     """
     Deletes a Network Control Policy
     Args:
         handle (UcscHandle)
         name (string) : Network Control Policy Name
         parent_dn (string) : Org Dn or Domain_group Dn
+        check_impact (bool) : refuse the deletion while a policy, vnic or
+            VLAN references it, see impact_index()
+        impact (ImpactIndex) : checked instead of querying the org and
+            domain group trees when check_impact is True
     Returns:
         None
     Example:
@@ -156,5 +175,10 @@ def nwctrl_policy_delete(handle, name, parent_dn="org-root"):
         raise UcscOperationError("nwctrl_policy_delete",
                                  "Network Control policy does not exist")
 
+    if check_impact:
+        from .reference import _check_impact
+
+        _check_impact("nwctrl_policy_delete", handle, mo.dn, impact)
+
     handle.remove_mo(mo)
     handle.commit()
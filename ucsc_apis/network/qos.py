@@ -15,8 +15,11 @@
 This module contains methods required for configuring QoS.
 """
 from ucscsdk.ucscexception import UcscOperationError
+from ..common.utils import query_subtree
+from ..common.hooks import instrument
 
 
+@instrument
 def qos_policy_add(handle, name, descr=None, prio="best-effort", burst="10240",
                    rate="line-rate", host_control="none",
                    parent_dn="org-root", **kwargs):
@@ -71,6 +74,7 @@ def qos_policy_add(handle, name, descr=None, prio="best-effort", burst="10240",
     return mo
 
 
+@instrument
 def qos_policy_get(handle, name, parent_dn="org-root"):
     """
     Checks if the given qos policy already exists with the same params
@@ -89,14 +93,21 @@ def qos_policy_get(handle, name, parent_dn="org-root"):
     return handle.query_dn(dn)
 
 
-def qos_policy_exists(handle, name, parent_dn="org-root", **kwargs):
+@instrument
+def qos_policy_exists(handle, name, parent_dn="org-root", subtree=None,
+                      **kwargs):
     """
     Checks if the given qos policy already exists with the same params
+    The policy and its egress are fetched with a single query, or looked up
+    in subtree when given.
 
     Args:
         handle (UcscHandle)
         name (string) : QoS Policy Name
         parent_dn (string) :
+        subtree (list or dict) : prefetched MOs, e.g. the result of
+                   handle.query_dn(parent_dn, hierarchy=True) or
+                   mo_subtree_index() of it
         **kwargs: key-value pair of managed object(MO) property and value, Use
                   'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
                   to get all configurable properties of class
@@ -108,7 +119,9 @@ def qos_policy_exists(handle, name, parent_dn="org-root", **kwargs):
         bool_var = qos_policy_exists(handle, "sample_qos", "platinum", 10240,
                                      "line-rate", "full")
     """
-    mo = qos_policy_get(handle, name, parent_dn)
+    dn = parent_dn + '/ep-qos-' + name
+    mos = query_subtree(handle, dn, subtree)
+    mo = mos.get(dn)
 
     if not mo:
         return (False, None)
@@ -119,7 +132,7 @@ def qos_policy_exists(handle, name, parent_dn="org-root", **kwargs):
     kwargs.pop('descr', None)
 
     mo_1_dn = mo.dn + '/egress'
-    mo_1 = handle.query_dn(mo_1_dn)
+    mo_1 = mos.get(mo_1_dn)
     if not mo_1:
         raise UcscOperationError("qos_policy_exists",
                                  "Egress QoS policy does not exist")
@@ -130,7 +143,9 @@ def qos_policy_exists(handle, name, parent_dn="org-root", **kwargs):
     return (True, mo)
 
 
-def qos_policy_remove(handle, name, parent_dn="org-root"):
+@instrument
+def qos_policy_remove(handle, name, parent_dn="org-root",
+                      check_impact=False, impact=None):
     """
     Removes the specified qos policy
 
@@ -138,6 +153,10 @@ def qos_policy_remove(handle, name, parent_dn="org-root"):
         handle (UcscHandle)
         name (string) : QoS Policy Name
         parent_dn (string) : Dn of the Org in which the policy should reside
+        check_impact (bool) : refuse the deletion while a policy, vnic or
+            VLAN references it, see impact_index()
+        impact (ImpactIndex) : checked instead of querying the org and
+            domain group trees when check_impact is True
 
     Returns:
         None
@@ -155,5 +174,10 @@ def qos_policy_remove(handle, name, parent_dn="org-root"):
         raise UcscOperationError("qos_policy_remove",
                                  "Qos Policy does not exist")
 
+    if check_impact:
+        from .reference import _check_impact
+
+        _check_impact("qos_policy_remove", handle, mo.dn, impact)
+
     handle.remove_mo(mo)
     handle.commit()
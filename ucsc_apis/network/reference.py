@@ -0,0 +1,345 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module resolves the names of the policies and pools referenced by
+vNICs, following the org inheritance of UCS Central, and finds what
+references a policy, pool or VLAN before it is deleted.
+"""
+from ucscsdk.ucscexception import UcscOperationError
+from ..common.hooks import instrument
+
+# vNIC property, class of the referenced managed object and whether it is
+# looked up in the org and its ancestors ("org"), or by name in any domain
+# group ("domain_group")
+_REFERENCES = (
+    ("nw_ctrl_policy_name", "NwctrlDefinition", "org"),
+    ("qos_policy_name", "EpqosDefinition", "org"),
+    ("stats_policy_name", "StatsThresholdPolicy", "org"),
+    ("ident_pool_name", "MacpoolPool", "org"),
+    ("adaptor_profile_name", "AdaptorHostEthIfProfile", "org"),
+    ("nw_templ_name", "VnicLanConnTempl", "org"),
+    ("pin_to_group_name", "FabricLanPinGroup", "domain_group"),
+    ("vlans", "FabricVlan", "domain_group"),
+)
+
+# Classes holding references, with the referencing property and the class
+# of the referenced managed object
+_REFERRERS = (
+    ("VnicEther", "nw_ctrl_policy_name", "NwctrlDefinition"),
+    ("VnicEther", "qos_policy_name", "EpqosDefinition"),
+    ("VnicEther", "stats_policy_name", "StatsThresholdPolicy"),
+    ("VnicEther", "ident_pool_name", "MacpoolPool"),
+    ("VnicEther", "adaptor_profile_name", "AdaptorHostEthIfProfile"),
+    ("VnicEther", "nw_templ_name", "VnicLanConnTempl"),
+    ("VnicEther", "pin_to_group_name", "FabricLanPinGroup"),
+    ("VnicLanConnTempl", "nw_ctrl_policy_name", "NwctrlDefinition"),
+    ("VnicLanConnTempl", "qos_policy_name", "EpqosDefinition"),
+    ("VnicLanConnTempl", "stats_policy_name", "StatsThresholdPolicy"),
+    ("VnicLanConnTempl", "ident_pool_name", "MacpoolPool"),
+    ("VnicLanConnTempl", "pin_to_group_name", "FabricLanPinGroup"),
+    ("VnicEtherIf", "name", "FabricVlan"),
+    ("VnicIScsiLCP", "qos_policy_name", "EpqosDefinition"),
+    ("VnicIScsiLCP", "stats_policy_name", "StatsThresholdPolicy"),
+    ("VnicIScsiLCP", "ident_pool_name", "MacpoolPool"),
+    ("VnicIScsiLCP", "pin_to_group_name", "FabricLanPinGroup"),
+    ("VnicVlan", "vlan_name", "FabricVlan"),
+    ("VnicIPv4PooledIscsiAddr", "ident_pool_name", "IppoolPool"),
+    ("LsServer", "ext_ip_pool_name", "IppoolPool"),
+    ("FabricVlan", "mcast_policy_name", "FabricMulticastPolicy"),
+)
+
+# Referenced classes looked up by name in any domain group
+_DOMAIN_GROUP_SCOPED = ("FabricLanPinGroup", "FabricVlan")
+
+_ISCSI_REFERENCES = ("qos_policy_name", "stats_policy_name",
+                     "ident_pool_name", "nw_templ_name", "pin_to_group_name",
+                     "vlan_name")
+
+_PREFIX = "global-"
+
+
+def _org_ancestors(org_dn):
+    """
+    Lists org_dn and the orgs above it, nearest first
+    """
+    rns = org_dn.split("/")
+    return ["/".join(rns[:i]) for i in range(len(rns), 0, -1)]
+
+
+class ReferenceIndex(object):
+    """
+    Names of the policies and pools which vNICs may reference, by class.
+
+    Names of org scoped classes are resolved like UCS Central does: in the
+    org of the vNIC first, then in each of its ancestors up to org-root.
+    A "global-" prefix, denoting a policy defined on UCS Central, is
+    ignored, and "default" always resolves, since UCS Central falls back
+    to the default policy. Use reference_index() to build it from UCS
+    Central.
+
+    Args:
+        mos (list): managed objects of the referenced classes
+    """
+
+    def __init__(self, mos):
+        self._orgs = {}
+        self._names = {}
+        for mo in mos:
+            self.add(mo)
+
+    def add(self, mo):
+        """
+        Adds a referenced managed object to the index
+        """
+        parent_dn = mo.dn.rpartition("/")[0]
+        class_id = mo.get_class_id()
+        self._names.setdefault(class_id, {}).setdefault(mo.name, []) \
+            .append(mo)
+        self._orgs[(class_id, parent_dn, mo.name)] = mo
+
+    def resolve(self, class_id, name, org_dn="org-root"):
+        """
+        Resolves a name referenced from org_dn
+
+        Args:
+            class_id (string): class of the referenced managed object
+            name (string): referenced name
+            org_dn (string): dn of the org the reference is made from, or
+                             of any managed object below it
+
+        Returns:
+            Managed Object OR None
+        """
+        if name.startswith(_PREFIX):
+            name = name[len(_PREFIX):]
+        if class_id in _DOMAIN_GROUP_SCOPED:
+            mos = self._names.get(class_id, {}).get(name)
+            return mos[0] if mos else None
+        for dn in _org_ancestors(org_dn):
+            mo = self._orgs.get((class_id, dn, name))
+            if mo is not None:
+                return mo
+        return None
+
+    def resolve_all(self, class_id, name, org_dn="org-root"):
+        """
+        Lists the managed objects a name referenced from org_dn may
+        resolve to: the one resolve() finds for org scoped classes, and
+        every managed object of that name for the classes looked up in
+        any domain group, since the domain group a name resolves in is
+        not known
+
+        Args:
+            class_id (string): class of the referenced managed object
+            name (string): referenced name
+            org_dn (string): dn of the org the reference is made from, or
+                             of any managed object below it
+
+        Returns:
+            List of Managed Objects
+        """
+        if class_id in _DOMAIN_GROUP_SCOPED:
+            if name.startswith(_PREFIX):
+                name = name[len(_PREFIX):]
+            return list(self._names.get(class_id, {}).get(name, []))
+        mo = self.resolve(class_id, name, org_dn)
+        return [] if mo is None else [mo]
+
+    def _check(self, props, org_dn, references):
+        classes = dict((prop, class_id) for prop, class_id, scope
+                       in _REFERENCES)
+        classes["vlan_name"] = "FabricVlan"
+        problems = []
+        for prop in references:
+            names = props.get(prop)
+            if prop == "vlans":
+                names = [vlan["name"] if isinstance(vlan, dict) else vlan
+                         for vlan in names or []]
+            else:
+                names = [names]
+            for name in names:
+                if not name or name in ("default", _PREFIX + "default"):
+                    continue
+                if self.resolve(classes[prop], name, org_dn) is None:
+                    problems.append("%s '%s' does not resolve to a %s"
+                                    % (prop, name, classes[prop]))
+        return problems
+
+    def check_vnic(self, vnic, org_dn="org-root"):
+        """
+        Checks the references of a vnic
+
+        Args:
+            vnic (dict): lcp_vnic_add() arguments
+            org_dn (string): dn of the org of the LAN Connectivity Policy
+
+        Returns:
+            List of problems, as strings, empty if all the references
+            resolve
+        """
+        return self._check(vnic, org_dn,
+                           [prop for prop, class_id, scope in _REFERENCES])
+
+    def check_iscsi_vnic(self, vnic, org_dn="org-root"):
+        """
+        Checks the references of an iscsi vnic
+
+        Args:
+            vnic (dict): lcp_iscsi_vnic_add() arguments
+            org_dn (string): dn of the org of the LAN Connectivity Policy
+
+        Returns:
+            List of problems, as strings, empty if all the references
+            resolve
+        """
+        return self._check(vnic, org_dn, _ISCSI_REFERENCES)
+
+    def check_vnics(self, vnics=None, iscsi_vnics=None, org_dn="org-root"):
+        """
+        Checks the references of a batch of vnics and iscsi vnics
+
+        Returns:
+            dict: vnic name to its list of problems, for the vnics with
+                  unresolved references only
+        """
+        problems = {}
+        for vnic in vnics or []:
+            found = self.check_vnic(vnic, org_dn)
+            if found:
+                problems.setdefault(vnic.get("name"), []).extend(found)
+        for vnic in iscsi_vnics or []:
+            found = self.check_iscsi_vnic(vnic, org_dn)
+            if found:
+                problems.setdefault(vnic.get("name"), []).extend(found)
+        return problems
+
+
+@instrument
+def reference_index(handle):
+    """
+    Fetches the policies and pools which vNICs may reference, with one
+    class query per referenced class, and indexes them by name
+
+    Args:
+        handle (UcscHandle)
+
+    Returns:
+        ReferenceIndex
+
+    Example:
+        references = reference_index(handle)
+        problems = references.check_vnics(
+            [{"name": "eth0", "qos_policy_name": "gold"}],
+            org_dn="org-root/org-demo")
+    """
+    mos = []
+    for prop, class_id, scope in _REFERENCES:
+        mos.extend(handle.query_classid(class_id))
+    return ReferenceIndex(mos)
+
+
+class ImpactIndex(object):
+    """
+    Reverse index of the references to policies, pools and VLANs: maps
+    the dn of each referenced managed object to the managed objects
+    referencing it, e.g. the VnicEther objects using a QoS policy or the
+    VnicEtherIf objects carrying a VLAN.
+
+    References are resolved like ReferenceIndex does, so that a vNIC
+    only counts against the policy it actually resolves to. Names of
+    domain group scoped classes, such as VLANs, may be defined in several
+    domain groups: a reference then counts against each of them, so that
+    none is deleted while in use. References made from outside the org
+    tree, e.g. by VLANs to multicast policies, resolve from org-root. Use
+    impact_index() to build it from UCS Central.
+
+    Args:
+        mos (list): managed objects of the org and domain group trees
+    """
+
+    def __init__(self, mos):
+        mos = list(mos)
+        targets = set(target for class_id, prop, target in _REFERRERS)
+        references = ReferenceIndex(mo for mo in mos
+                                    if mo.get_class_id() in targets)
+        referrers = {}
+        for class_id, prop, target in _REFERRERS:
+            referrers.setdefault(class_id, []).append((prop, target))
+
+        self._referrers = {}
+        for mo in mos:
+            for prop, target in referrers.get(mo.get_class_id(), ()):
+                name = getattr(mo, prop, None)
+                if not name:
+                    continue
+                org_dn = mo.dn.rpartition("/")[0]
+                if not org_dn.startswith("org-root"):
+                    org_dn = "org-root"
+                for found in references.resolve_all(target, name, org_dn):
+                    self._referrers.setdefault(found.dn, []).append(
+                        (mo, prop))
+
+    def referrers(self, dn):
+        """
+        Gets the managed objects referencing the managed object at dn
+
+        Returns:
+            List of (ManagedObject, property name)
+        """
+        return list(self._referrers.get(dn, []))
+
+
+@instrument
+def impact_index(handle):
+    """
+    Downloads the org and the domain group trees, with one hierarchical
+    query each, and indexes the references to policies, pools and VLANs
+
+    Args:
+        handle (UcscHandle)
+
+    Returns:
+        ImpactIndex
+
+    Example:
+        impact = impact_index(handle)
+        impact.referrers("org-root/ep-qos-gold")
+        qos_policy_remove(handle, "gold", check_impact=True, impact=impact)
+    """
+    mos = handle.query_dn("org-root", hierarchy=True) or []
+    mos.extend(handle.query_dn("domaingroup-root", hierarchy=True) or [])
+    return ImpactIndex(mos)
+
+
+def _check_impact(api, handle, dn, impact=None):
+    """
+    Refuses the deletion of the managed object at dn while anything
+    references it
+
+    Args:
+        api (string): name of the deleting function, for the error
+        handle (UcscHandle)
+        dn (string): dn of the managed object to delete
+        impact (ImpactIndex): fetched from UCS Central if not given
+
+    Raises:
+        UcscOperationError: If the managed object is referenced
+    """
+    if impact is None:
+        impact = impact_index(handle)
+    referrers = impact.referrers(dn)
+    if referrers:
+        raise UcscOperationError(api, "%s is referenced by %s"
+                                 % (dn, ", ".join("%s (%s)" % (mo.dn, prop)
+                                                  for mo, prop in referrers)))
@@ -15,8 +15,10 @@
 This module contains the methods required for creating usnic Connection Policy.
 """
 from ucscsdk.ucscexception import UcscOperationError
+from ..common.hooks import instrument
 
 
+@instrument
 def usnic_conn_policy_create(handle, name, descr=None, usnic_count="58",
                              adaptor_profile_name="global-default",
                              parent_dn="org-root", **kwargs):
@@ -64,6 +66,7 @@ def usnic_conn_policy_create(handle, name, descr=None, usnic_count="58",
     return mo
 
 
+@instrument
 def usnic_conn_policy_get(handle, name, parent_dn="org-root"):
     """
     Gets usNIC Connection Policy
@@ -81,6 +84,7 @@ def usnic_conn_policy_get(handle, name, parent_dn="org-root"):
     return handle.query_dn(dn)
 
 
+@instrument
 def usnic_conn_policy_exists(handle, name, parent_dn="org-root", **kwargs):
     """
     Checks if the given usNIC Connection Policy already exists
@@ -104,6 +108,7 @@ def usnic_conn_policy_exists(handle, name, parent_dn="org-root", **kwargs):
     return (mo_exists, mo if mo_exists else None)
 
 
+@instrument
 def usnic_conn_policy_delete(handle, name, parent_dn="org-root"):
     """
     Deletes a usNIC Connection Policy
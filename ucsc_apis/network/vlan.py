@@ -15,12 +15,14 @@
 This module performs the Vlan related operation
 """
 from ucscsdk.ucscexception import UcscOperationError
+from ..common.hooks import instrument
 
 
+@instrument
 def vlan_create(handle, name, id, sharing="none", vlan_type="lan",
                 mcast_policy_name=None, compression_type="included",
                 default_net="no", pub_nw_name=None, domain_group="root",
-                **kwargs):
+                check_duplicate=False, index=None, **kwargs):
     """
     Creates VLAN
 
@@ -37,24 +39,48 @@ def vlan_create(handle, name, id, sharing="none", vlan_type="lan",
         pub_nw_name (string) : Name of primary vlan, applicable for isolated
                                or community vlan
         domain_group (string) : Full domain group name
+        check_duplicate (bool) : refuse an id used by another VLAN of the
+                                 domain group, before any write is sent
+        index (VlanIndex) : index returned by vlan_index(), checked instead
+                            of querying the VLANs when check_duplicate is
+                            True, and updated with the new VLAN
         **kwargs: Any additional key-value pair of managed object(MO)'s
                   property and value, which are not part of regular args.
                   This should be used for future version compatibility.
     Returns:
         FabricVlan: Managed Object
 
+    Raises:
+        UcscOperationError: If the fabric cloud does not exist or, when
+                            check_duplicate is True, the id is in use
+
     Example:
         vlan_create(handle, "none", "vlan-lab", "123",  "sample_mcast_policy",
                     "included")
+
+        index = vlan_index(handle)
+        vlan_create(handle, "vlan-lab", index.free_ids(1)[0],
+                    check_duplicate=True, index=index)
     """
     from ucscsdk.mometa.fabric.FabricVlan import FabricVlan
     from ucscsdk.utils.ucscdomain import get_domain_group_dn
 
-    domain_group_dn = get_domain_group_dn(handle, domain_group)
-
     if vlan_type != "lan" and vlan_type != "appliance":
         raise UcscOperationError("vlan_create",
                                  "Vlan Type %s does not exist" % vlan_type)
+
+    if check_duplicate:
+        if index is None:
+            index = vlan_index(handle, domain_group)
+        others = [mo.name for mo in index.get_by_id(id, vlan_type,
+                                                    domain_group)
+                  if mo.name != name]
+        if others:
+            raise UcscOperationError("vlan_create",
+                                     "VLAN id %s is already used by %s"
+                                     % (id, ", ".join(others)))
+
+    domain_group_dn = get_domain_group_dn(handle, domain_group)
     vlan_obj_dn = domain_group_dn + "/fabric/lan" if vlan_type == "lan" else \
         domain_group_dn + "/fabric/eth-estc"
     obj = handle.query_dn(vlan_obj_dn)
@@ -76,9 +102,12 @@ def vlan_create(handle, name, id, sharing="none", vlan_type="lan",
 
     handle.add_mo(vlan, modify_present=True)
     handle.commit()
+    if index is not None:
+        index.add(vlan)
     return vlan
 
 
+@instrument
 def vlan_get(handle, name, vlan_type="lan", domain_group="root"):
     """
     Gets the VLAN
@@ -105,6 +134,7 @@ def vlan_get(handle, name, vlan_type="lan", domain_group="root"):
     return handle.query_dn(dn)
 
 
+@instrument
 def vlan_exists(handle, name, vlan_type="lan", domain_group="root", **kwargs):
     """
     Checks if the given VLAN already exists with the same params
@@ -129,7 +159,9 @@ def vlan_exists(handle, name, vlan_type="lan", domain_group="root", **kwargs):
     return (mo_exists, mo if mo_exists else None)
 
 
-def vlan_delete(handle, name, vlan_type="lan", domain_group="root"):
+@instrument
+def vlan_delete(handle, name, vlan_type="lan", domain_group="root",
+                check_impact=False, impact=None):
     """
     Deletes a VLAN
     Args:
@@ -137,6 +169,10 @@ def vlan_delete(handle, name, vlan_type="lan", domain_group="root"):
         name (string) : VLAN Name
         vlan_type (string) : Type of Vlan ["lan", "appliance"]
         domain_group (string) : Full domain group name
+        check_impact (bool) : refuse the deletion while a policy, vnic or
+            VLAN references it, see impact_index()
+        impact (ImpactIndex) : checked instead of querying the org and
+            domain group trees when check_impact is True
     Returns:
         None
     Example:
@@ -147,5 +183,387 @@ def vlan_delete(handle, name, vlan_type="lan", domain_group="root"):
         raise UcscOperationError("vlan_delete",
                                  "VLAN does not exist")
 
+    if check_impact:
+        from .reference import _check_impact
+
+        _check_impact("vlan_delete", handle, mo.dn, impact)
+
     handle.remove_mo(mo)
     handle.commit()
+
+
+def _vlan_spec_parse(spec):
+    """
+    Expands a VLAN range spec into a list of (name, id) tuples.
+
+    A spec is "<name template>:<id ranges>", where the template may refer
+    to the VLAN id as {id} and the id ranges are comma separated ids or
+    "<from>-<to>" ranges, e.g. "vlan-{id}:100-199,300".
+    A list of specs is expanded in order.
+    """
+    specs = [spec] if isinstance(spec, str) else spec
+    vlans = []
+    for item in specs:
+        template, sep, ranges = item.rpartition(":")
+        if not sep or not template or not ranges:
+            raise UcscOperationError("vlan_bulk_create",
+                                     "Invalid VLAN spec '%s'" % item)
+        if "{id}" not in template:
+            raise UcscOperationError("vlan_bulk_create",
+                                     "VLAN spec '%s' must contain {id}"
+                                     % item)
+        for id_range in ranges.split(","):
+            r_from, sep, to = id_range.strip().partition("-")
+            try:
+                r_from = int(r_from)
+                to = int(to) if sep else r_from
+            except ValueError:
+                raise UcscOperationError("vlan_bulk_create",
+                                         "Invalid VLAN id range '%s'"
+                                         % id_range)
+            if r_from > to:
+                raise UcscOperationError("vlan_bulk_create",
+                                         "Invalid VLAN id range '%s'"
+                                         % id_range)
+            for vlan_id in range(r_from, to + 1):
+                vlans.append((template.replace("{id}", str(vlan_id)),
+                              str(vlan_id)))
+    return vlans
+
+
+@instrument
+def vlan_bulk_create(handle, spec, sharing="none", vlan_type="lan",
+                     mcast_policy_name=None, compression_type="included",
+                     domain_group="root", chunk_size=200, **kwargs):
+    """
+    Creates VLANs in bulk from a range spec
+
+    The domain group and the fabric cloud are resolved once, all the
+    FabricVlan objects are built locally and pushed in commits of at most
+    chunk_size objects each.
+
+    Args:
+        handle (UcscHandle)
+        spec (string or list of strings) : "<name template>:<id ranges>",
+                         the template refers to the VLAN id as {id}
+                         e.g. "vlan-{id}:100-899" or "lab{id}:10,20-29"
+        sharing (string) : Vlan sharing
+                           ["community", "isolated", "none", "primary"]
+        vlan_type (string) : Type of Vlan ["lan", "appliance"]
+        mcast_policy_name (string) : Multicast policy name
+        compression_type (string) : ["excluded", "included"]
+        domain_group (string) : Full domain group name
+        chunk_size (int) : Maximum number of VLANs per commit
+        **kwargs: Any additional key-value pair of managed object(MO)'s
+                  property and value, which are not part of regular args.
+                  This should be used for future version compatibility.
+    Returns:
+        List of FabricVlan: Managed Objects
+
+    Raises:
+        UcscOperationError: If the spec is invalid or the fabric cloud
+                            does not exist
+
+    Example:
+        vlan_bulk_create(handle, "vlan-{id}:100-899",
+                         domain_group="root/dg1")
+    """
+    from ucscsdk.mometa.fabric.FabricVlan import FabricVlan
+    from ucscsdk.utils.ucscdomain import get_domain_group_dn
+
+    if vlan_type != "lan" and vlan_type != "appliance":
+        raise UcscOperationError("vlan_bulk_create",
+                                 "Vlan Type %s does not exist" % vlan_type)
+    if chunk_size < 1:
+        raise UcscOperationError("vlan_bulk_create",
+                                 "chunk_size must be a positive integer")
+
+    vlan_specs = _vlan_spec_parse(spec)
+
+    domain_group_dn = get_domain_group_dn(handle, domain_group)
+    vlan_obj_dn = domain_group_dn + "/fabric/lan" if vlan_type == "lan" else \
+        domain_group_dn + "/fabric/eth-estc"
+    if not handle.query_dn(vlan_obj_dn):
+        raise UcscOperationError("vlan_bulk_create",
+                                 "Fabric LAN cloud %s does not exist"
+                                 % vlan_obj_dn)
+
+    vlans = []
+    for name, id in vlan_specs:
+        vlan = FabricVlan(parent_mo_or_dn=vlan_obj_dn,
+                          sharing=sharing,
+                          name=name,
+                          id=id,
+                          mcast_policy_name=mcast_policy_name,
+                          compression_type=compression_type)
+        vlan.set_prop_multiple(**kwargs)
+        vlans.append(vlan)
+
+    for i in range(0, len(vlans), chunk_size):
+        for vlan in vlans[i:i + chunk_size]:
+            handle.add_mo(vlan, modify_present=True)
+        handle.commit()
+    return vlans
+
+
+def _domain_group_dn(domain_group):
+    """
+    Converts a full domain group name such as "root/dg1" into its dn,
+    without checking that the domain group exists.
+    """
+    return "/".join("domaingroup-" + name
+                    for name in domain_group.split("/"))
+
+
+VLAN_ID_COUNT = 4096
+
+# VLAN ids which cannot be assigned: 0, the range reserved for internal use
+# by the fabric interconnects, and 4094-4095
+_RESERVED_IDS = 1 | ((1 << 4048) - (1 << 3915)) | (3 << 4094)
+
+
+def _bitmap_ids(bitmap):
+    ids = []
+    while bitmap:
+        low = bitmap & -bitmap
+        ids.append(low.bit_length() - 1)
+        bitmap ^= low
+    return ids
+
+
+class VlanIndex(object):
+    """
+    In-memory index of FabricVlan objects, keyed by domain group, cloud
+    type ("lan" or "appliance") and either VLAN name or VLAN id.
+
+    The ids in use are also kept as a 4096 bit bitmap, an integer, per
+    domain group and cloud type, which answers the free id lookups with
+    bitwise operations.
+
+    Use vlan_index() to build it from UCS Central.
+    """
+
+    _clouds = {"fabric/lan": "lan", "fabric/eth-estc": "appliance"}
+
+    def __init__(self, mos):
+        self.by_name = {}
+        self.by_id = {}
+        self.bitmaps = {}
+        for mo in mos:
+            self.add(mo)
+
+    def add(self, mo):
+        """
+        Adds a FabricVlan to the index, or replaces the one of that name
+        """
+        key = self._key(mo.dn)
+        if key is None:
+            return
+        domain_group_dn, vlan_type = key
+        old = self.by_name.get((domain_group_dn, vlan_type, mo.name))
+        if old is not None:
+            self._remove(domain_group_dn, vlan_type, old)
+        self.by_name[(domain_group_dn, vlan_type, mo.name)] = mo
+        self.by_id.setdefault((domain_group_dn, vlan_type, str(mo.id)),
+                              []).append(mo)
+        if str(mo.id).isdigit() and int(mo.id) < VLAN_ID_COUNT:
+            self.bitmaps[key] = self.bitmaps.get(key, 0) | 1 << int(mo.id)
+
+    def _remove(self, domain_group_dn, vlan_type, mo):
+        del self.by_name[(domain_group_dn, vlan_type, mo.name)]
+        id_key = (domain_group_dn, vlan_type, str(mo.id))
+        self.by_id[id_key].remove(mo)
+        if not self.by_id[id_key]:
+            del self.by_id[id_key]
+            if str(mo.id).isdigit() and int(mo.id) < VLAN_ID_COUNT:
+                self.bitmaps[(domain_group_dn, vlan_type)] &= \
+                    ~(1 << int(mo.id))
+
+    @classmethod
+    def _key(cls, dn):
+        parent_dn, _, rn = dn.rpartition("/")
+        if not rn.startswith("net-"):
+            return None
+        for cloud_rn, vlan_type in cls._clouds.items():
+            if parent_dn.endswith("/" + cloud_rn):
+                return (parent_dn[:-len(cloud_rn) - 1], vlan_type)
+        return None
+
+    def __len__(self):
+        return len(self.by_name)
+
+    def __iter__(self):
+        return iter(self.by_name.values())
+
+    def get(self, name, vlan_type="lan", domain_group="root"):
+        """
+        Gets the VLAN by name, same as vlan_get() but without a round trip
+
+        Returns:
+            FabricVlan: Managed Object OR None
+        """
+        return self.by_name.get((_domain_group_dn(domain_group), vlan_type,
+                                 name))
+
+    def get_by_id(self, id, vlan_type="lan", domain_group="root"):
+        """
+        Gets the VLANs using the given VLAN id
+
+        Returns:
+            List of FabricVlan: Managed Objects
+        """
+        return list(self.by_id.get((_domain_group_dn(domain_group),
+                                    vlan_type, str(id)), []))
+
+    def exists(self, name, vlan_type="lan", domain_group="root", **kwargs):
+        """
+        Same as vlan_exists() but answered from the index
+
+        Returns:
+            (True/False, MO/None)
+        """
+        mo = self.get(name, vlan_type, domain_group)
+        if not mo:
+            return (False, None)
+        mo_exists = mo.check_prop_match(**kwargs)
+        return (mo_exists, mo if mo_exists else None)
+
+    def _used(self, vlan_type, domain_groups):
+        if isinstance(domain_groups, str):
+            domain_groups = [domain_groups]
+        bitmap = 0
+        for domain_group in domain_groups:
+            bitmap |= self.bitmaps.get((_domain_group_dn(domain_group),
+                                        vlan_type), 0)
+        return bitmap
+
+    def id_used(self, id, vlan_type="lan", domain_group="root"):
+        """
+        Checks if a VLAN of the domain group uses the given VLAN id
+
+        Returns:
+            True/False
+        """
+        return bool(self._used(vlan_type, domain_group) >> int(id) & 1)
+
+    def id_free(self, id, vlan_type="lan", domain_group="root"):
+        """
+        Checks if the given VLAN id is neither used by a VLAN of the domain
+        group nor reserved
+
+        Returns:
+            True/False
+        """
+        return not (self._used(vlan_type, domain_group) |
+                    _RESERVED_IDS) >> int(id) & 1
+
+    def ids_used(self, domain_groups, vlan_type="lan"):
+        """
+        Gets the VLAN ids used in any of the given domain groups
+
+        Args:
+            domain_groups (string or list of strings): Full domain group
+                                                       names
+
+        Returns:
+            List of VLAN ids, as integers, sorted
+        """
+        return _bitmap_ids(self._used(vlan_type, domain_groups))
+
+    def free_ids(self, count, vlan_type="lan", domain_group="root",
+                 r_from=1, to=VLAN_ID_COUNT - 1):
+        """
+        Finds the lowest count contiguous VLAN ids, within r_from-to, which
+        are neither reserved nor used in any of the given domain groups
+
+        Args:
+            count (int): number of VLAN ids
+            vlan_type (string) : Type of Vlan ["lan", "appliance"]
+            domain_group (string or list of strings): Full domain group
+                                                      names
+            r_from (int): lowest VLAN id
+            to (int): highest VLAN id
+
+        Returns:
+            List of VLAN ids, as integers, empty if there is no such range
+        """
+        count = int(count)
+        if count < 1:
+            return []
+        to = min(int(to), VLAN_ID_COUNT - 1)
+        window = (1 << to + 1) - (1 << int(r_from))
+        free = ~(self._used(vlan_type, domain_group) | _RESERVED_IDS) & \
+            window
+        # bit i of runs is set when ids i to i + width - 1 are all free
+        runs, width = free, 1
+        while width < count:
+            shift = min(width, count - width)
+            runs &= runs >> shift
+            width += shift
+        if not runs:
+            return []
+        first = (runs & -runs).bit_length() - 1
+        return list(range(first, first + count))
+
+
+@instrument
+def vlan_index(handle, domain_group=None):
+    """
+    Fetches all the VLANs with a single class query and indexes them
+
+    Args:
+        handle (UcscHandle)
+        domain_group (string) : Full domain group name, limits the index to
+                                this domain group and its sub-groups.
+                                None indexes VLANs of all domain groups.
+
+    Returns:
+        VlanIndex
+
+    Example:
+        index = vlan_index(handle, domain_group="root/dg1")
+        mo = index.get("vlan-lab", domain_group="root/dg1")
+        mos = index.get_by_id("100", domain_group="root/dg1")
+    """
+    if domain_group is None:
+        mos = handle.query_classid("FabricVlan")
+    else:
+        prefix = _domain_group_dn(domain_group) + "/"
+        filter_str = '(dn, "%s", type="re")' % prefix
+        mos = handle.query_classid("FabricVlan", filter_str=filter_str)
+        mos = [mo for mo in mos if mo.dn.startswith(prefix)]
+    return VlanIndex(mos)
+
+
+@instrument
+def vlan_exists_many(handle, names, vlan_type="lan", domain_group="root",
+                     index=None, **kwargs):
+    """
+    Checks if the given VLANs exist with the same params, using one
+    class query for all of them
+
+    Args:
+        handle (UcscHandle)
+        names (list of strings) : VLAN Names
+        vlan_type (string) : Type of Vlan ["lan", "appliance"]
+        domain_group (string) : Full domain group name
+        index (VlanIndex) : index returned by vlan_index(), fetched
+                            from UCS Central if not given
+        **kwargs: key-value pair of managed object(MO) property and value, Use
+                  'print(ucsccoreutils.get_meta_info(<classid>).config_props)'
+                  to get all configurable properties of class
+    Returns:
+        dict: VLAN name to (True/False, MO/None)
+
+    Example:
+        index = vlan_index(handle)
+        result = vlan_exists_many(handle, ["vlan100", "vlan200"],
+                                  domain_group="root/dg1", index=index)
+    """
+    if vlan_type != "lan" and vlan_type != "appliance":
+        raise UcscOperationError("vlan_exists_many",
+                                 "Vlan Type %s does not exist" % vlan_type)
+    if index is None:
+        index = vlan_index(handle, domain_group)
+    return dict((name, index.exists(name, vlan_type, domain_group, **kwargs))
+                for name in names)
@@ -15,8 +15,10 @@
 This module contains the methods required for creating VMQ Connection Policy.
 """
 from ucscsdk.ucscexception import UcscOperationError
+from ..common.hooks import instrument
 
 
+@instrument
 def vmq_conn_policy_create(handle, name, descr=None, vmq_count="64",
                            intr_count="64", parent_dn="org-root", **kwargs):
     """
@@ -60,6 +62,7 @@ def vmq_conn_policy_create(handle, name, descr=None, vmq_count="64",
     return mo
 
 
+@instrument
 def vmq_conn_policy_get(handle, name, parent_dn="org-root"):
     """
     Checks if the given VMQ Connection Policy already exists
@@ -77,6 +80,7 @@ def vmq_conn_policy_get(handle, name, parent_dn="org-root"):
     return handle.query_dn(dn)
 
 
+@instrument
 def vmq_conn_policy_exists(handle, name, parent_dn="org-root", **kwargs):
     """
     Checks if the given VMQ Connection Policy already exists
@@ -100,6 +104,7 @@ def vmq_conn_policy_exists(handle, name, parent_dn="org-root", **kwargs):
     return (mo_exists, mo if mo_exists else None)
 
 
+@instrument
 def vmq_conn_policy_delete(handle, name, parent_dn="org-root"):
     """
     Deletes a VMQ Connection Policy